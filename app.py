@@ -1,18 +1,78 @@
 import os
 import sqlite3
+import sys
+import time
 from flask import Flask, jsonify, request, send_from_directory
 
 BASE_DIR = os.path.dirname(__file__)
 DB_PATH = os.path.join(BASE_DIR, "nm_hunts.db")
 
+# ETag / compression / metrics helpers are shared with the multi-state app
+sys.path.insert(0, os.path.join(BASE_DIR, "app"))
+import http_cache  # noqa: E402
+import metrics  # noqa: E402
+
 DRAW_YEAR = 2025
 SEASON_YEAR = 2026
 
 app = Flask(__name__, static_folder="static", static_url_path="")
 
 
+def db_version():
+    """nm_hunts.db is replaced wholesale on reload, so its stat is its version."""
+    try:
+        st = os.stat(DB_PATH)
+    except OSError:
+        return None
+    return f"{st.st_mtime_ns}-{st.st_size}"
+
+
+metrics.init_app(app)
+http_cache.init_app(
+    app,
+    get_version=db_version,
+    policies={
+        "api_draw_odds": http_cache.RESULTS,
+        "api_hunts": http_cache.REFERENCE,
+        "api_best_hunts": http_cache.RESULTS,
+        "api_bag_limits": http_cache.REFERENCE,
+    },
+    release=str(int(os.path.getmtime(__file__))),
+)
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """Reports statement time to metrics; rows are counted as they are fetched."""
+
+    def execute(self, sql, parameters=()):
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            metrics.record_sql(sql, parameters, time.perf_counter() - start, None)
+
+    def fetchone(self):
+        row = super().fetchone()
+        if row is not None:
+            metrics.record_rows(1)
+        return row
+
+    def fetchall(self):
+        rows = super().fetchall()
+        metrics.record_rows(len(rows))
+        return rows
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+
 def get_db_connection():
-    conn = sqlite3.connect(DB_PATH)
+    if metrics.INSTRUMENT_SQL:
+        conn = sqlite3.connect(DB_PATH, factory=InstrumentedConnection)
+    else:
+        conn = sqlite3.connect(DB_PATH)
     conn.row_factory = sqlite3.Row
     return conn
 
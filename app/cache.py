@@ -0,0 +1,93 @@
+"""
+In-process cache for responses that only change when a loader runs.
+
+Loaders bump the single-row data_version table (scripts/loader_utils.py).
+Each worker re-reads that counter at most once every VERSION_TTL seconds and
+drops every cached entry when it moves, so between checks a cache hit costs
+no database round trip at all.
+"""
+
+import os
+import threading
+import time
+
+import psycopg2.errors
+
+# How stale a worker's view of data_version may get (seconds)
+VERSION_TTL = float(os.environ.get("DRAWS_CACHE_VERSION_TTL", "5"))
+MAX_ENTRIES = int(os.environ.get("DRAWS_CACHE_MAX_ENTRIES", "2048"))
+
+_UNCHECKED = object()
+
+_lock = threading.Lock()
+_entries = {}               # key -> (version, value)
+_version = _UNCHECKED
+_checked_at = 0.0
+
+counters = {"hits": 0, "misses": 0, "invalidations": 0, "version_checks": 0}
+
+
+def data_version(get_conn):
+    """Current data version, or None if the data_version table is missing.
+
+    `get_conn` is only called when the cached version has expired.
+    """
+    global _version, _checked_at
+    now = time.monotonic()
+    if _version is not _UNCHECKED and now - _checked_at < VERSION_TTL:
+        return _version
+
+    conn = get_conn()
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT max(version) FROM data_version")
+        version = cur.fetchone()[0]
+    except psycopg2.errors.UndefinedTable:
+        conn.rollback()
+        version = None
+
+    with _lock:
+        counters["version_checks"] += 1
+        if version != _version:
+            if _entries:
+                counters["invalidations"] += 1
+            _entries.clear()
+            _version = version
+        _checked_at = now
+    return version
+
+
+def get_or_load(key, loader, get_conn):
+    """Return the cached value for `key`, calling `loader()` on a miss.
+
+    `key` must already be normalized (hashable, case-folded params). Without
+    a data_version table nothing is cached, since nothing would evict it.
+    """
+    version = data_version(get_conn)
+    if version is None:
+        return loader()
+
+    with _lock:
+        entry = _entries.get(key)
+        if entry is not None and entry[0] == version:
+            counters["hits"] += 1
+            return entry[1]
+        counters["misses"] += 1
+
+    value = loader()
+    with _lock:
+        if key not in _entries and len(_entries) >= MAX_ENTRIES:
+            _entries.pop(next(iter(_entries)))
+        # Tagged with the version it was read under; a concurrent bump
+        # makes it a miss on the next lookup rather than serving stale data.
+        _entries[key] = (version, value)
+    return value
+
+
+def stats():
+    with _lock:
+        return {
+            "version": None if _version is _UNCHECKED else _version,
+            "entries": len(_entries),
+            **counters,
+        }
@@ -0,0 +1,252 @@
+"""
+PostgreSQL connection pool for the multi-state app.
+
+One pool per process. gunicorn forks workers after importing the app, so the
+pool is built lazily on first use and rebuilt whenever the PID changes —
+a worker never reuses a socket it inherited from its parent.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import psycopg2
+import psycopg2.extensions
+
+import metrics
+
+DB_CONFIG = {
+    "host": os.environ.get("DRAWS_DB_HOST", "localhost"),
+    "port": os.environ.get("DRAWS_DB_PORT", "5432"),
+    "dbname": os.environ.get("DRAWS_DB_NAME", "draws"),
+    "user": os.environ.get("DRAWS_DB_USER", "draws"),
+    "password": os.environ.get("DRAWS_DB_PASS", "drawspass"),
+}
+
+POOL_MIN = int(os.environ.get("DRAWS_DB_POOL_MIN", "1"))
+POOL_MAX = int(os.environ.get("DRAWS_DB_POOL_MAX", "10"))
+# Seconds a request waits for a free connection before giving up
+POOL_TIMEOUT = float(os.environ.get("DRAWS_DB_POOL_TIMEOUT", "10"))
+# Connections idle longer than this get a SELECT 1 before being handed out
+POOL_CHECK_IDLE = float(os.environ.get("DRAWS_DB_POOL_CHECK_IDLE", "30"))
+# Connections older than this are closed and replaced on return
+POOL_MAX_LIFETIME = float(os.environ.get("DRAWS_DB_POOL_MAX_LIFETIME", "1800"))
+
+
+class InstrumentedCursor(psycopg2.extensions.cursor):
+    """Cursor that reports every statement's time and row count to metrics."""
+
+    def execute(self, query, vars=None):
+        start = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            metrics.record_sql(query, vars, time.perf_counter() - start, self.rowcount)
+
+
+class PoolTimeout(Exception):
+    """No connection became free within POOL_TIMEOUT seconds."""
+
+
+class ConnectionPool:
+    """Bounded, thread-safe pool of psycopg2 connections.
+
+    Unlike psycopg2.pool.ThreadedConnectionPool, getconn() blocks until a
+    connection is free (up to `timeout`) instead of raising immediately, and
+    the pool keeps wait/usage counters for the /api/health endpoint.
+    """
+
+    def __init__(self, minconn, maxconn, timeout=POOL_TIMEOUT, **dsn):
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.dsn = dsn
+        self.pid = os.getpid()
+        self._cond = threading.Condition()
+        self._idle = []        # [(conn, created_at, returned_at)]
+        self._born = {}        # id(conn) -> created_at, for checked-out conns
+        self._size = 0
+        self._closed = False
+        self.counters = {
+            "checkouts": 0,
+            "waits": 0,
+            "wait_seconds_total": 0.0,
+            "wait_seconds_max": 0.0,
+            "timeouts": 0,
+            "connections_opened": 0,
+            "connections_discarded": 0,
+            "health_check_failures": 0,
+        }
+        for _ in range(minconn):
+            conn = self._connect()
+            self._size += 1
+            self._idle.append((conn, time.monotonic(), time.monotonic()))
+
+    def _connect(self):
+        if metrics.INSTRUMENT_SQL:
+            conn = psycopg2.connect(cursor_factory=InstrumentedCursor, **self.dsn)
+        else:
+            conn = psycopg2.connect(**self.dsn)
+        with self._cond:
+            self.counters["connections_opened"] += 1
+        return conn
+
+    def _discard(self, conn):
+        """Close a connection and free its slot. Caller holds the lock."""
+        self._size -= 1
+        self.counters["connections_discarded"] += 1
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _healthy(self, conn, created_at, returned_at):
+        now = time.monotonic()
+        if conn.closed or now - created_at > POOL_MAX_LIFETIME:
+            return False
+        if now - returned_at < POOL_CHECK_IDLE:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except Exception:
+            with self._cond:
+                self.counters["health_check_failures"] += 1
+            return False
+
+    def getconn(self):
+        start = time.monotonic()
+        waited = False
+        conn = None
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise PoolTimeout("connection pool is closed")
+                if self._idle:
+                    conn, created_at, returned_at = self._idle.pop()
+                    break
+                if self._size < self.maxconn:
+                    # Reserve the slot now, open the socket outside the lock
+                    self._size += 1
+                    break
+                remaining = self.timeout - (time.monotonic() - start)
+                if remaining <= 0:
+                    self.counters["timeouts"] += 1
+                    raise PoolTimeout(
+                        f"no database connection free after {self.timeout:.1f}s "
+                        f"(pool max {self.maxconn})"
+                    )
+                waited = True
+                self._cond.wait(remaining)
+
+        if conn is not None and not self._healthy(conn, created_at, returned_at):
+            # Keep the slot, swap the dead connection for a new one
+            try:
+                conn.close()
+            except Exception:
+                pass
+            with self._cond:
+                self.counters["connections_discarded"] += 1
+            conn = None
+        if conn is None:
+            try:
+                conn = self._connect()
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                raise
+            created_at = time.monotonic()
+
+        elapsed = time.monotonic() - start
+        with self._cond:
+            self._born[id(conn)] = created_at
+            self.counters["checkouts"] += 1
+            if waited:
+                self.counters["waits"] += 1
+            self.counters["wait_seconds_total"] += elapsed
+            self.counters["wait_seconds_max"] = max(self.counters["wait_seconds_max"], elapsed)
+        return conn
+
+    def putconn(self, conn, discard=False):
+        # End the implicit read transaction so the session goes back to idle
+        if not conn.closed and not discard:
+            status = conn.get_transaction_status()
+            if status == psycopg2.extensions.TRANSACTION_STATUS_UNKNOWN:
+                discard = True
+            elif status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                try:
+                    conn.rollback()
+                except Exception:
+                    discard = True
+
+        with self._cond:
+            created_at = self._born.pop(id(conn), time.monotonic())
+            too_old = time.monotonic() - created_at > POOL_MAX_LIFETIME
+            if discard or conn.closed or too_old or self._closed:
+                self._discard(conn)
+            else:
+                self._idle.append((conn, created_at, time.monotonic()))
+            self._cond.notify()
+
+    def closeall(self):
+        with self._cond:
+            self._closed = True
+            while self._idle:
+                self._discard(self._idle.pop()[0])
+            self._cond.notify_all()
+
+    def stats(self):
+        with self._cond:
+            idle = len(self._idle)
+            return {
+                "pid": self.pid,
+                "min_size": self.minconn,
+                "max_size": self.maxconn,
+                "size": self._size,
+                "in_use": self._size - idle,
+                "idle": idle,
+                **self.counters,
+            }
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Return this process's pool, building a fresh one after a fork."""
+    global _pool
+    pool = _pool
+    if pool is not None and pool.pid == os.getpid():
+        return pool
+    with _pool_lock:
+        if _pool is None or _pool.pid != os.getpid():
+            # Never close an inherited pool: its sockets belong to the parent.
+            _pool = ConnectionPool(POOL_MIN, POOL_MAX, **DB_CONFIG)
+        return _pool
+
+
+def close_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None and _pool.pid == os.getpid():
+            _pool.closeall()
+        _pool = None
+
+
+@contextmanager
+def connection():
+    """Borrow a pooled connection outside of a Flask request."""
+    pool = get_pool()
+    conn = pool.getconn()
+    try:
+        yield conn
+    except Exception:
+        pool.putconn(conn, discard=conn.closed)
+        raise
+    else:
+        pool.putconn(conn)
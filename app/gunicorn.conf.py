@@ -0,0 +1,25 @@
+"""
+gunicorn settings for the multi-state app.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Each worker builds its own connection pool on first request (see db.py);
+the hooks below just make the per-worker lifecycle explicit.
+"""
+
+import os
+
+bind = os.environ.get("DRAWS_BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("DRAWS_WORKERS", "4"))
+threads = int(os.environ.get("DRAWS_THREADS", "4"))
+
+
+def post_fork(server, worker):
+    import db
+    # Drop any pool inherited from the master without closing its sockets
+    db._pool = None
+
+
+def worker_exit(server, worker):
+    import db
+    db.close_pool()
@@ -0,0 +1,108 @@
+"""
+HTTP validators, Cache-Control and compression for the JSON API.
+
+    http_cache.init_app(app, get_version, {"api_states": REFERENCE, ...})
+
+For every GET endpoint listed in `policies` the ETag is derived from the
+release, the data version and the request's query string, so a matching
+If-None-Match is answered with 304 before the view (and its SQL) runs at all.
+When `get_version()` returns None the ETag falls back to a hash of the body.
+Responses at or above COMPRESS_MIN_BYTES are brotli- or gzip-encoded,
+whichever the client prefers; brotli needs the optional `Brotli` package.
+"""
+
+import gzip
+import hashlib
+import os
+
+from flask import g, request
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+COMPRESS_MIN_BYTES = int(os.environ.get("DRAWS_COMPRESS_MIN_BYTES", "1024"))
+COMPRESS_LEVEL_GZIP = 6
+COMPRESS_LEVEL_BR = 5
+COMPRESSIBLE = {"application/json", "text/html", "text/css",
+                "text/javascript", "application/javascript", "text/plain"}
+
+# Cache-Control presets
+REFERENCE = "public, max-age=300"       # states, pools, species, ...
+RESULTS = "public, max-age=60"          # hunt lists and details
+NO_STORE = "no-store"                   # health, metrics, anything per-process
+DEFAULT = "no-cache"                    # everything else: revalidate each time
+
+
+def init_app(app, get_version, policies, release=""):
+    """Install the conditional-GET and compression hooks on `app`.
+
+    get_version: callable returning the current data version (or None).
+    policies:    {endpoint name: Cache-Control value}; only these endpoints
+                 get ETags.
+    release:     mixed into every ETag so a deploy invalidates old ones.
+    """
+
+    @app.before_request
+    def _conditional_get():
+        g.etag = None
+        if (request.method not in ("GET", "HEAD")
+                or policies.get(request.endpoint, NO_STORE) == NO_STORE):
+            return None
+        version = get_version()
+        if version is None:
+            return None
+        g.etag = _request_etag(release, version)
+        if request.if_none_match.contains_weak(g.etag):
+            resp = app.response_class(status=304)
+            resp.set_etag(g.etag, weak=True)
+            resp.headers["Cache-Control"] = policies[request.endpoint]
+            return resp
+        return None
+
+    @app.after_request
+    def _finish_response(resp):
+        policy = policies.get(request.endpoint)
+        if policy is None:
+            if request.endpoint != "static" and "Cache-Control" not in resp.headers:
+                resp.headers["Cache-Control"] = DEFAULT
+        elif resp.status_code == 200:
+            resp.headers["Cache-Control"] = policy
+            if request.method in ("GET", "HEAD") and policy != NO_STORE:
+                etag = getattr(g, "etag", None)
+                if etag:
+                    resp.set_etag(etag, weak=True)
+                elif not resp.direct_passthrough:
+                    resp.add_etag(weak=True)
+                    resp.make_conditional(request)
+        _compress(resp)
+        return resp
+
+
+def _request_etag(release, version):
+    args = sorted(request.args.items(multi=True))
+    raw = f"{release}|{version}|{request.path}|{args!r}"
+    return hashlib.sha1(raw.encode()).hexdigest()[:20]
+
+
+def _compress(resp):
+    if (resp.direct_passthrough
+            or resp.status_code < 200 or resp.status_code in (204, 304)
+            or resp.mimetype not in COMPRESSIBLE
+            or "Content-Encoding" in resp.headers):
+        return
+    resp.vary.add("Accept-Encoding")
+    data = resp.get_data()
+    if len(data) < COMPRESS_MIN_BYTES:
+        return
+
+    accept = request.accept_encodings
+    if brotli is not None and accept["br"] and accept["br"] >= accept["gzip"]:
+        body, encoding = brotli.compress(data, quality=COMPRESS_LEVEL_BR), "br"
+    elif accept["gzip"]:
+        body, encoding = gzip.compress(data, COMPRESS_LEVEL_GZIP), "gzip"
+    else:
+        return
+    resp.set_data(body)
+    resp.headers["Content-Encoding"] = encoding
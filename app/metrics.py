@@ -0,0 +1,278 @@
+"""
+Per-route request and SQL metrics, exposed in Prometheus text format.
+
+    metrics.init_app(app)       # before http_cache.init_app, see below
+
+Off unless DRAWS_METRICS=1. When off, init_app() installs nothing, /metrics
+does not exist and database cursors are the stock ones, so the only cost is
+an `if` at import time.
+
+Recorded per route (the URL rule, so /api/hunts?.. is one series):
+  draws_http_requests_total            counter   {route, method, status}
+  draws_http_request_duration_seconds  histogram {route}
+  draws_http_response_bytes            histogram {route}
+  draws_sql_statements_per_request     histogram {route}
+  draws_sql_statements_total           counter   {route}
+  draws_sql_seconds_total              counter   {route}
+  draws_sql_rows_total                 counter   {route}
+
+Each gunicorn worker keeps its own numbers. Set DRAWS_METRICS_DIR to a
+directory shared by the workers (emptied on each deploy) and every worker
+writes a snapshot there at most every FLUSH_INTERVAL seconds; /metrics then
+reports the sum across all of them.
+
+DRAWS_SLOW_QUERY_MS > 0 logs statements slower than that to the
+"draws.slow_sql" logger with their parameters replaced by type names. It
+works with metrics on or off.
+"""
+
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+
+ENABLED = os.environ.get("DRAWS_METRICS", "0") == "1"
+SLOW_QUERY_MS = float(os.environ.get("DRAWS_SLOW_QUERY_MS", "0"))
+METRICS_DIR = os.environ.get("DRAWS_METRICS_DIR")
+FLUSH_INTERVAL = 5.0
+
+# Whether database cursors should report to record_sql() at all
+INSTRUMENT_SQL = ENABLED or SLOW_QUERY_MS > 0
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+SQL_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21)
+
+HELP = {
+    "draws_http_requests_total": ("counter", "Requests served"),
+    "draws_http_request_duration_seconds": ("histogram", "Request latency"),
+    "draws_http_response_bytes": ("histogram", "Response body size as sent"),
+    "draws_sql_statements_per_request": ("histogram", "SQL statements run per request"),
+    "draws_sql_statements_total": ("counter", "SQL statements run"),
+    "draws_sql_seconds_total": ("counter", "Time spent in SQL statements"),
+    "draws_sql_rows_total": ("counter", "Rows returned or affected by SQL statements"),
+}
+
+slow_log = logging.getLogger("draws.slow_sql")
+
+_lock = threading.Lock()
+_counters = {}      # (name, labels) -> float
+_hists = {}         # (name, labels) -> [bucket counts..., +Inf count, sum]
+_last_flush = 0.0
+
+# [statements, seconds, rows] for the request running in this context
+_current = contextvars.ContextVar("draws_request_sql", default=None)
+
+
+# ─── Recording ───────────────────────────────────────────────────────
+def record_sql(query, params, seconds, rows):
+    """Called by the instrumented cursors after every statement."""
+    stats = _current.get()
+    if stats is not None:
+        stats[0] += 1
+        stats[1] += seconds
+        if rows and rows > 0:
+            stats[2] += rows
+    if SLOW_QUERY_MS and seconds * 1000 >= SLOW_QUERY_MS:
+        slow_log.warning("%.1f ms rows=%s sql=%s params=%s",
+                         seconds * 1000, rows, _one_line(query), _redact(params))
+
+
+def record_rows(n):
+    """Rows counted at fetch time, for drivers without a useful rowcount."""
+    stats = _current.get()
+    if stats is not None:
+        stats[2] += n
+
+
+def _one_line(query, limit=2000):
+    if isinstance(query, bytes):
+        query = query.decode("utf-8", "replace")
+    return " ".join(str(query).split())[:limit]
+
+
+def _redact(params):
+    if params is None:
+        return "none"
+    if isinstance(params, dict):
+        return {k: f"<{type(v).__name__}>" for k, v in params.items()}
+    try:
+        return [f"<{type(v).__name__}>" for v in params]
+    except TypeError:
+        return f"<{type(params).__name__}>"
+
+
+def _inc(name, labels, value=1.0):
+    key = (name, labels)
+    _counters[key] = _counters.get(key, 0.0) + value
+
+
+def _observe(name, labels, value, buckets):
+    key = (name, labels)
+    h = _hists.get(key)
+    if h is None:
+        h = _hists[key] = [0] * (len(buckets) + 1) + [0.0]
+    for i, bound in enumerate(buckets):
+        if value <= bound:
+            h[i] += 1
+            break
+    else:
+        h[len(buckets)] += 1
+    h[-1] += value
+
+
+# ─── Flask hooks ─────────────────────────────────────────────────────
+def init_app(app):
+    """Install the request hooks and GET /metrics on `app` (no-op when off).
+
+    Call it before http_cache.init_app: a before_request hook that returns a
+    response (a 304) stops the later ones, and the timer has to start first.
+    """
+    if not ENABLED:
+        return
+
+    from flask import g, request
+
+    @app.before_request
+    def _metrics_start():
+        g.metrics_start = time.perf_counter()
+        g.metrics_sql = [0, 0.0, 0]
+        g.metrics_token = _current.set(g.metrics_sql)
+
+    @app.after_request
+    def _metrics_response(resp):
+        g.metrics_status = resp.status_code
+        g.metrics_bytes = resp.calculate_content_length() or 0
+        return resp
+
+    @app.teardown_request
+    def _metrics_finish(exc):
+        start = g.pop("metrics_start", None)
+        if start is None:
+            return
+        _current.reset(g.pop("metrics_token"))
+        if request.endpoint == "metrics":
+            return
+        rule = request.url_rule.rule if request.url_rule else "<unmatched>"
+        status = str(g.pop("metrics_status", 500))
+        statements, sql_seconds, rows = g.pop("metrics_sql")
+        route = (("route", rule),)
+        with _lock:
+            _inc("draws_http_requests_total",
+                 (("route", rule), ("method", request.method), ("status", status)))
+            _observe("draws_http_request_duration_seconds", route,
+                     time.perf_counter() - start, LATENCY_BUCKETS)
+            _observe("draws_http_response_bytes", route,
+                     g.pop("metrics_bytes", 0), SIZE_BUCKETS)
+            _observe("draws_sql_statements_per_request", route, statements,
+                     SQL_COUNT_BUCKETS)
+            _inc("draws_sql_statements_total", route, statements)
+            _inc("draws_sql_seconds_total", route, sql_seconds)
+            _inc("draws_sql_rows_total", route, rows)
+        if METRICS_DIR:
+            _maybe_flush()
+
+    def _metrics_view():
+        if METRICS_DIR:
+            _maybe_flush(force=True)
+            counters, hists = _merge_snapshots()
+        else:
+            with _lock:
+                counters, hists = dict(_counters), {k: list(v) for k, v in _hists.items()}
+        return app.response_class(render(counters, hists),
+                                  content_type="text/plain; version=0.0.4; charset=utf-8",
+                                  headers={"Cache-Control": "no-store"})
+
+    app.add_url_rule("/metrics", "metrics", _metrics_view)
+
+
+# ─── Multi-worker snapshots ──────────────────────────────────────────
+def _snapshot():
+    with _lock:
+        return {
+            "counters": [[n, list(l), v] for (n, l), v in _counters.items()],
+            "hists": [[n, list(l), list(h)] for (n, l), h in _hists.items()],
+        }
+
+
+def _maybe_flush(force=False):
+    global _last_flush
+    now = time.monotonic()
+    if not force and now - _last_flush < FLUSH_INTERVAL:
+        return
+    _last_flush = now
+    os.makedirs(METRICS_DIR, exist_ok=True)
+    path = os.path.join(METRICS_DIR, f"worker-{os.getpid()}.json")
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(_snapshot(), f)
+    os.replace(tmp, path)
+
+
+def _merge_snapshots():
+    counters, hists = {}, {}
+    for fname in os.listdir(METRICS_DIR):
+        if not fname.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(METRICS_DIR, fname)) as f:
+                snap = json.load(f)
+        except (OSError, ValueError):
+            continue
+        for name, labels, value in snap["counters"]:
+            key = (name, tuple(map(tuple, labels)))
+            counters[key] = counters.get(key, 0.0) + value
+        for name, labels, h in snap["hists"]:
+            key = (name, tuple(map(tuple, labels)))
+            acc = hists.get(key)
+            hists[key] = list(h) if acc is None else [a + b for a, b in zip(acc, h)]
+    return counters, hists
+
+
+# ─── Exposition ──────────────────────────────────────────────────────
+_BUCKETS = {
+    "draws_http_request_duration_seconds": LATENCY_BUCKETS,
+    "draws_http_response_bytes": SIZE_BUCKETS,
+    "draws_sql_statements_per_request": SQL_COUNT_BUCKETS,
+}
+
+
+def _num(v):
+    return str(int(v)) if float(v).is_integer() else repr(float(v))
+
+
+def _fmt_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    body = ",".join('{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"'))
+                    for k, v in pairs)
+    return "{" + body + "}"
+
+
+def render(counters, hists):
+    """Prometheus text exposition format 0.0.4."""
+    out = []
+    for name, (kind, text) in HELP.items():
+        out.append(f"# HELP {name} {text}")
+        out.append(f"# TYPE {name} {kind}")
+        if kind == "counter":
+            for (n, labels), value in sorted(counters.items()):
+                if n == name:
+                    out.append(f"{name}{_fmt_labels(labels)} {_num(value)}")
+            continue
+        buckets = _BUCKETS[name]
+        for (n, labels), h in sorted(hists.items()):
+            if n != name:
+                continue
+            cumulative = 0
+            for bound, count in zip(buckets, h):
+                cumulative += count
+                out.append(f"{name}_bucket{_fmt_labels(labels, [('le', f'{bound:g}')])} {cumulative}")
+            cumulative += h[len(buckets)]
+            out.append(f"{name}_bucket{_fmt_labels(labels, [('le', '+Inf')])} {cumulative}")
+            out.append(f"{name}_sum{_fmt_labels(labels)} {_num(h[-1])}")
+            out.append(f"{name}_count{_fmt_labels(labels)} {cumulative}")
+    return "\n".join(out) + "\n"
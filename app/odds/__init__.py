@@ -0,0 +1,34 @@
+"""
+Draw-odds engines: given a hunt's demand at each point level, estimate each
+level's chance of drawing under the state's draw system.
+
+Every engine works on whole batches of hunts at once (one row per hunt,
+one column per point level) with NumPy, so a full state costs about as much
+as a single hunt. None of them touch the database; server.py and the
+precompute scripts read the demand and hand the arrays over.
+
+    bonus       weighted random draws (NV/WA squared, MT bonus)
+    preference  ranked point queues with an optional random slice (CO, CA)
+    hybrid      split queue/random draws (WY, OR 75/25; UT 50/50)
+    passes      AZ's Bonus Pass queue, then its weighted 1-2 Pass
+    choices     multi-choice applications, walked the way each state draws
+    curves      picks a state's engine and tag counts; whole-state curves
+    portfolio   best choices per application and best set of applications
+    montecarlo  seeded, batched simulation service for draws without a closed form
+"""
+
+import numpy as np
+
+
+def pad_levels(levels, width=None):
+    """Stack per-hunt {points: count} dicts into a (hunts, width) float array.
+
+    Column p holds the count at p points; levels a hunt lacks are 0.
+    """
+    if width is None:
+        width = 1 + max((max(lv) for lv in levels if lv), default=0)
+    out = np.zeros((len(levels), width))
+    for i, lv in enumerate(levels):
+        for p, n in lv.items():
+            out[i, p] = n
+    return out
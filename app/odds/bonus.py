@@ -0,0 +1,189 @@
+"""
+Weighted-random (bonus point) draw engine.
+
+In a bonus draw every applicant holds a number of entries set by their points
+and tags go out at random, one entry at a time, until the quota is gone. With
+applicant counts n[p] at each point level p, entry weights w[p] and T tags,
+the chance that an applicant at level p draws is, to a very good
+approximation for real applicant pools,
+
+    odds[p] = 1 - exp(-w[p] * t)    where    sum_p n[p] * odds[p] = T
+
+(each applicant's best random number is exponential with rate w[p]; the T
+lowest numbers win, and t is the cut-off). It is exact when every weight is
+equal. t is found by bisection for every hunt in the batch at once.
+
+Small pools, where the approximation is loosest, can be simulated exactly
+instead with simulate_weighted_draw.
+
+    levels = [{0: 566, 1: 602, 2: 516}, {0: 102, 1: 107}]   # applicants by points
+    apps = pad_levels(levels)                               # (hunts, max points + 1)
+    w = entries(np.arange(apps.shape[1]), "linear")
+    odds = weighted_draw_odds(apps, tags=[12, 3], weights=w)
+"""
+
+import numpy as np
+
+from . import montecarlo, pad_levels
+
+# Entries held by an applicant with p points
+ENTRY_RULES = {
+    "linear": lambda p: p + 1.0,                 # AZ: one extra entry per point
+    "squared": lambda p: (p + 1.0) ** 2,         # NV, WA
+    "squared_plus_one": lambda p: p * p + 1.0,   # MT permits/B licenses, UT bonus half
+}
+
+# States whose per-point reports come from a bonus draw that states.point_math
+# does not describe. MT's point_math is its NR combo-license queue, which
+# publishes no per-point results; its by-points reports are the permit and
+# B-license bonus draws.
+STATE_ENTRY_RULES = {"MT": "squared_plus_one"}
+
+BISECT_STEPS = 60
+
+# Monte Carlo: most trials per hunt, and the most keys held in memory at once
+SIM_TRIALS = 8000
+SIM_CHUNK = 1 << 22
+
+
+def entry_rule(state_code, point_math):
+    """Name of the ENTRY_RULES weighting for a state, or None if it has none."""
+    if state_code in STATE_ENTRY_RULES:
+        return STATE_ENTRY_RULES[state_code]
+    return point_math if point_math in ENTRY_RULES else None
+
+
+def entries(points, rule):
+    """Entry weight for each point level in `points` under `rule`."""
+    return ENTRY_RULES[rule](np.asarray(points, dtype=float))
+
+
+def weighted_draw_odds(applicants, tags, weights):
+    """Draw probability at every point level of every hunt.
+
+    applicants: (hunts, levels) applicant counts
+    tags:       (hunts,) tags drawn from these applicants
+    weights:    (levels,) or (hunts, levels) entries per applicant
+
+    Returns a (hunts, levels) float array. Levels without applicants still get
+    the probability an applicant there would have had.
+    """
+    n = np.asarray(applicants, dtype=float)
+    if n.ndim == 1:
+        n = n[None, :]
+    w = np.broadcast_to(np.asarray(weights, dtype=float), n.shape)
+    t_tags = np.broadcast_to(np.asarray(tags, dtype=float), n.shape[:1])
+
+    total = n.sum(axis=1)
+    full = t_tags >= total          # every applicant draws
+    empty = t_tags <= 0
+    solve = ~(full | empty)
+
+    # Bracket: sum n*(1-exp(-w t)) <= t * sum(n w) gives a lower bound, and
+    # every term is at least n*(1-exp(-w_min t)) for the upper one.
+    nw = (n * w).sum(axis=1)
+    w_min = np.where(n > 0, w, np.inf).min(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        lo = np.where(solve, t_tags / nw, 1.0)
+        hi = np.where(solve, -np.log1p(-t_tags / total) / w_min, 1.0)
+    lo, hi = np.log(lo), np.log(hi)
+
+    for _ in range(BISECT_STEPS):
+        mid = 0.5 * (lo + hi)
+        drawn = (n * -np.expm1(-w * np.exp(mid)[:, None])).sum(axis=1)
+        over = drawn > t_tags
+        hi = np.where(over, mid, hi)
+        lo = np.where(over, lo, mid)
+
+    t = np.exp(0.5 * (lo + hi))
+    odds = -np.expm1(-w * t[:, None])
+    odds[full] = 1.0
+    odds[empty] = 0.0
+    return odds
+
+
+def simulate_weighted_draw(applicants, tags, weights, trials=SIM_TRIALS, seed=0,
+                           tol=montecarlo.TOL):
+    """Monte Carlo version of weighted_draw_odds; same arguments and result.
+
+    Runs on the shared Monte Carlo service (montecarlo.py), so it is seeded
+    and repeat runs agree. Each hunt stops once its odds are within tol, or
+    after `trials` trials. Counts are rounded to whole applicants and tags.
+    """
+    n = np.rint(np.asarray(applicants, dtype=float))
+    if n.ndim == 1:
+        n = n[None, :]
+    w = np.broadcast_to(np.asarray(weights, dtype=float), n.shape)
+    t_tags = np.rint(np.broadcast_to(np.asarray(tags, dtype=float), n.shape[:1])).astype(int)
+
+    total = n.sum(axis=1)
+    full = t_tags >= total
+    odds = np.zeros(n.shape)
+    odds[full] = 1.0
+    rows = np.flatnonzero(~full & (t_tags > 0))
+    if len(rows):
+        odds[rows] = montecarlo.estimate(_weighted_draw_trials, (n[rows], w[rows], t_tags[rows]),
+                                         seed=seed, tol=tol, max_trials=trials)
+    return odds
+
+
+def _weighted_draw_trials(rng, trials, n, w, t_tags):
+    """Mean draw rate at each level over `trials` simulated draws.
+
+    Drawing entries one at a time until an applicant is hit is the same as
+    giving each applicant an exponential key with rate w and taking the T
+    lowest. Only a level's lowest T keys can win, and those are generated
+    directly as order statistics, so a trial costs levels * T numbers rather
+    than one per applicant.
+    """
+    odds = np.zeros(n.shape)
+    levels = n.shape[1]
+    # Similar quotas share a chunk, so little padding is wasted
+    rows = np.argsort(t_tags, kind="stable")
+    start = 0
+    while start < len(rows):
+        stop = start + 1
+        while (stop < len(rows)
+               and (stop - start + 1) * trials * (levels + 1) * t_tags[rows[stop]] <= SIM_CHUNK):
+            stop += 1
+        chunk = rows[start:stop]
+        k = t_tags[chunk[-1]]
+        nc, wc, tc = n[chunk], w[chunk], t_tags[chunk]
+
+        # keys[h, s, p, i]: the (i+1)-th lowest key at level p, by Renyi's
+        # representation; levels with fewer than i+1 applicants get inf.
+        # Levels empty in every row of the chunk are left out.
+        live = np.flatnonzero((nc > 0).any(axis=0))
+        rank = np.arange(k)
+        left = nc[:, live, None] - rank                          # (h, p, k)
+        with np.errstate(divide="ignore"):
+            step = np.where(left > 0, 1.0 / left, np.inf)
+        z = rng.standard_exponential((len(chunk), trials, len(live), k))
+        keys = np.cumsum(z * step[:, None], axis=3) / wc[:, None, live, None]
+
+        # Pad every row to k tags with keys that always win, so the cut-off
+        # is the k-th lowest key for the whole chunk
+        pad = np.where(rank < (k - tc)[:, None], -np.inf, np.inf)  # (h, k)
+        flat = np.concatenate([keys.reshape(len(chunk), trials, -1),
+                               np.broadcast_to(pad[:, None, :], (len(chunk), trials, k))],
+                              axis=2)
+        cut = np.partition(flat, k - 1, axis=2)[:, :, k - 1]      # (h, s)
+
+        # An empty level gets the odds one applicant there would have had
+        drawn = (-np.expm1(-wc[:, None, :] * cut[:, :, None])).mean(axis=1)
+        won = (keys <= cut[:, :, None, None]).sum(axis=3).mean(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            drawn[:, live] = np.where(nc[:, live] > 0, won / nc[:, live], drawn[:, live])
+        odds[chunk] = drawn
+        start = stop
+    return odds
+
+
+def level_odds(levels, tags, rule, width=None):
+    """weighted_draw_odds for per-hunt {points: applicants} dicts.
+
+    Returns a (hunts, width) array (default: max points + 1); row i, column p
+    is the odds for an applicant with p points in hunt i.
+    """
+    apps = pad_levels(levels, width)
+    return weighted_draw_odds(apps, tags, entries(np.arange(apps.shape[1]), rule))
@@ -0,0 +1,85 @@
+"""
+Multi-choice application engine.
+
+An application lists up to five hunts in order, and the draw walks them
+until one comes up. States walk them in one of two ways:
+
+    walk    one random number per application (lottery and bonus states:
+            NM, ID, AZ, NV, WA). When the applicant's turn comes each
+            choice is tried in order, so hunt i is still open for them
+            exactly when their number beats its cut-off. With p[i] the
+            hunt's draw odds, choice k draws with chance
+            max(0, p[k] - max(p[:k])) and the application with max(p).
+    rounds  every first choice is drawn before any second choice, and so
+            on (preference and hybrid states: CO, OR, WY, UT, CA, MT).
+            Only choice 1 competes for the full quota. Later choices only
+            see the tags the earlier rounds left, so their odds are
+            `leftover[i]` (leftover_odds), and each choice needs all of
+            the earlier ones to miss.
+
+Both have closed forms, so whole batches of orderings are scored in a few
+array operations:
+
+    odds = np.array([0.05, 0.4, 0.9])
+    plans = np.array([[0, 1, 2], [2, 1, 0]])
+    by_choice = choice_odds(plans, odds, np.array([0.0, 0.0, 1.0]), "walk")
+    by_choice.sum(axis=1)       # chance each application draws anything
+"""
+
+import itertools
+
+import numpy as np
+
+MAX_CHOICES = 5
+
+# states.draw_type -> how the state's draw walks an application's choices
+DRAW_WALKS = {
+    "lottery": "walk",
+    "bonus": "walk",
+    "preference": "rounds",
+    "hybrid": "rounds",
+}
+
+
+def leftover_odds(tags_available, applications):
+    """Draw odds as a later choice in a "rounds" draw, per hunt: the share of
+    the quota the first choices leave, max(0, tags - applications) / tags.
+    0 for a hunt without tags."""
+    tags = np.asarray(tags_available, dtype=float)
+    apps = np.asarray(applications, dtype=float)
+    left = np.clip(tags - apps, 0.0, None)
+    return np.where(tags > 0, left / np.where(tags > 0, tags, 1.0), 0.0)
+
+
+def choice_odds(plans, odds, leftover, walk):
+    """Chance that each choice of each plan is the one drawn.
+
+    plans:    (plans, choices) hunt indices in application order; -1 pads
+              a shorter plan
+    odds:     (hunts,) draw odds as a first choice
+    leftover: (hunts,) draw odds as a later choice ("rounds" only)
+    walk:     "walk" or "rounds"
+
+    Returns a (plans, choices) array; a plan's row sums to its chance of
+    drawing anything.
+    """
+    plans = np.asarray(plans)
+    used = plans >= 0
+    idx = np.where(used, plans, 0)
+    p = np.where(used, np.asarray(odds, dtype=float)[idx], 0.0)
+
+    if walk == "walk":
+        best_before = np.maximum.accumulate(p, axis=1)
+        best_before = np.concatenate([np.zeros((len(p), 1)), best_before[:, :-1]], axis=1)
+        return np.clip(p - best_before, 0.0, None)
+
+    later = np.where(used, np.asarray(leftover, dtype=float)[idx], 0.0)
+    p[:, 1:] = later[:, 1:]
+    missed = np.cumprod(1.0 - p, axis=1)
+    missed = np.concatenate([np.ones((len(p), 1)), missed[:, :-1]], axis=1)
+    return p * missed
+
+
+def orderings(n):
+    """Every ordering of n choices as a (n!, n) index array, identity first."""
+    return np.array(list(itertools.permutations(range(n))), dtype=int).reshape(-1, n)
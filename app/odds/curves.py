@@ -0,0 +1,83 @@
+"""
+Per-point odds curves for whole batches of pools, with the engine picked by
+the state's draw system.
+
+Shared by /api/odds_by_points (one hunt, on request) and the point_odds
+precompute stage (every hunt with point-level demand, ahead of time), so
+both read a state's reports the same way.
+
+    model, rule = draw_model("NV", "squared")         # ("bonus", "squared")
+    tags, random_tags = pool_tags(pools, model, "linear")
+    odds, cutoffs = level_curves(model, rule, demand, tags, random_tags, width)
+"""
+
+from . import bonus, hybrid, passes, preference
+
+# Highest point balance any curve is modelled out to
+MAX_POINTS = 60
+
+
+def draw_model(state_code, point_math):
+    """(model, rule) for a state: model is "passes", "bonus", "hybrid" or
+    "preference"; rule is the bonus ENTRY_RULES name or the hybrid
+    point_math. None when no engine fits the state's draw."""
+    if state_code in passes.STATES:
+        return "passes", passes.ENTRY_RULE
+    rule = bonus.entry_rule(state_code, point_math)
+    if rule is not None:
+        return "bonus", rule
+    if point_math in hybrid.SPLITS:
+        return "hybrid", point_math
+    if point_math == "queue_pure":
+        return "preference", None
+    return None
+
+
+def pool_tags(pools, model, point_math):
+    """Tags drawn from each pool's published applicants: (tags, random_tags).
+
+    pools is a list of per-pool row lists, each row with successes,
+    tags_available and random_tags (and, for "passes", bonus_pass_tags and
+    random_pass_tags). The tags are the reported successes when every level
+    has them, else the pool's quota less its random share. A hybrid pool
+    without a published random share is split by its point_math. A passes
+    pool takes the 1st choices drawn in each pass, where reported.
+    """
+    tags, random_tags = [], []
+    for levels in pools:
+        if model == "passes" and levels[0]["bonus_pass_tags"] is not None:
+            tags.append(levels[0]["bonus_pass_tags"])
+            random_tags.append(levels[0]["random_pass_tags"] or 0)
+            continue
+        if all(r["successes"] is not None for r in levels):
+            total = sum(r["successes"] for r in levels)
+        else:
+            total = max((levels[0]["tags_available"] or 0)
+                        - (levels[0]["random_tags"] or 0), 0)
+        if model == "passes":
+            pref, rand = passes.split_tags(total)
+            tags.append(int(pref))
+            random_tags.append(int(rand))
+        elif model == "hybrid" and levels[0]["random_tags"] is None:
+            pref, rand = hybrid.split_tags(total, point_math)
+            tags.append(int(pref))
+            random_tags.append(int(rand))
+        else:
+            tags.append(total)
+            random_tags.append(levels[0]["random_tags"] or 0)
+    return tags, random_tags
+
+
+def level_curves(model, rule, demand, tags, random_tags, width):
+    """(odds, cutoffs) for per-pool {points: applicants} dicts.
+
+    odds is a (pools, width) array; cutoffs the queue cut-off level per pool
+    (-1 if none), or None for bonus draws, which have no cut-off.
+    """
+    if model == "bonus":
+        return bonus.level_odds(demand, tags, rule, width), None
+    if model == "passes":
+        return passes.level_odds(demand, tags, random_tags, width)
+    if model == "hybrid":
+        return hybrid.level_odds(demand, tags, random_tags, rule, width)
+    return preference.level_odds(demand, tags, random_tags, width)
@@ -0,0 +1,84 @@
+"""
+Split-pool (hybrid) draw engine.
+
+A share of each hunt's tags goes down the point queue from the top, exactly
+as in the preference engine; the rest is drawn among everyone the queue left
+behind. WY and OR hold 75% back for the queue and draw the other 25%
+evenly; UT's limited-entry hunts split 50/50 and draw the second half
+weighted by bonus points (points^2 + 1 entries). MT's NR combo licenses
+split 75/25 as well, but only its permit and B-license draws are reported
+by points, and those are bonus draws (bonus.STATE_ENTRY_RULES).
+
+    apps = pad_levels([{0: 410, 3: 120, 8: 35, 12: 9}])
+    pref, rand = split_tags([20], "queue_50_50")
+    odds, cutoff = split_draw_odds(apps, pref, rand, bonus.entries(np.arange(13), "squared_plus_one"))
+
+An even random share has a closed form. A weighted one uses the bonus
+engine's closed form, except in small pools, where a few high-point
+applicants can soak up most of the tags and the approximation drifts by a
+few points; those get a seeded Monte Carlo (bonus.simulate_weighted_draw, on
+the montecarlo service).
+"""
+
+import numpy as np
+
+from . import bonus, pad_levels, preference
+
+# point_math -> (queue share of the tags, ENTRY_RULES weighting of the rest;
+# None draws it evenly)
+SPLITS = {
+    "queue_75_25": (0.75, None),                 # WY, OR
+    "queue_50_50": (0.5, "squared_plus_one"),    # UT limited entry
+}
+
+# Weighted shares drawn from at most this many applicants are simulated
+# rather than approximated
+SIM_MAX_APPLICANTS = 250
+
+
+def split_tags(tags, point_math):
+    """(queue tags, random tags) for each hunt's total tags under point_math."""
+    share, _ = SPLITS[point_math]
+    tags = np.asarray(tags, dtype=float)
+    pref = np.rint(tags * share)
+    return pref, tags - pref
+
+
+def split_draw_odds(applicants, pref_tags, random_tags, weights=None,
+                    trials=bonus.SIM_TRIALS, seed=0):
+    """Draw probability at every point level of every hunt.
+
+    applicants:  (hunts, levels) applicant counts, column p = p points
+    pref_tags:   (hunts,) tags handed out down the point queue
+    random_tags: (hunts,) tags drawn among those the queue left behind
+    weights:     (levels,) entries per applicant in the random share, or
+                 None for an even draw
+
+    Returns (odds, cutoff) as preference.queue_draw_odds does.
+    """
+    if weights is None:
+        return preference.queue_draw_odds(applicants, pref_tags, random_tags)
+
+    n = np.asarray(applicants, dtype=float)
+    if n.ndim == 1:
+        n = n[None, :]
+    rand = np.broadcast_to(np.asarray(random_tags, dtype=float), n.shape[:1])
+    q, cutoff = preference.queue_draw_odds(n, pref_tags)
+
+    # Who is left for the weighted share, and their odds in it
+    rest = n * (1.0 - q)
+    r = np.empty(n.shape)
+    sim = rest.sum(axis=1) <= SIM_MAX_APPLICANTS
+    if sim.any():
+        r[sim] = bonus.simulate_weighted_draw(rest[sim], rand[sim], weights, trials, seed)
+    if (~sim).any():
+        r[~sim] = bonus.weighted_draw_odds(rest[~sim], rand[~sim], weights)
+    return q + (1.0 - q) * r, cutoff
+
+
+def level_odds(levels, pref_tags, random_tags, point_math, width=None):
+    """split_draw_odds for per-hunt {points: applicants} dicts under point_math."""
+    apps = pad_levels(levels, width)
+    _, rule = SPLITS[point_math]
+    weights = None if rule is None else bonus.entries(np.arange(apps.shape[1]), rule)
+    return split_draw_odds(apps, pref_tags, random_tags, weights)
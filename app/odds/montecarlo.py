@@ -0,0 +1,152 @@
+"""
+Shared Monte Carlo service for draws without a closed form.
+
+A simulation is a kernel plus arrays whose first axis is one row per hunt:
+
+    def kernel(rng, trials, applicants, tags, weights):
+        ...                   # (rows, levels) mean draw rate over `trials`
+
+    odds = estimate(kernel, (applicants, tags, weights), seed=0)
+
+estimate() runs the kernel in batches of BATCH_TRIALS trials. Batch i always
+draws from child i of the seed's SeedSequence, so a result depends only on
+the inputs, seed and tolerance, never on how many processes ran it. Batches
+go out in waves of WAVE_BATCHES. After each wave a row stops once the
+standard error of every level (from the spread of its batch means) is
+within `tol`, or once it reaches max_trials. Waves large enough to pay for
+it are spread over a process pool (DRAWS_SIM_WORKERS, default every core).
+
+Results are cached in-process, keyed by the kernel, the demand arrays
+themselves, and every parameter. A reloaded snapshot hashes differently, so
+nothing needs invalidating.
+"""
+
+import atexit
+import hashlib
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+BATCH_TRIALS = 250
+WAVE_BATCHES = 4
+MAX_TRIALS = 16000
+# Largest standard error accepted on any level's odds
+TOL = 0.01
+
+WORKERS = int(os.environ.get("DRAWS_SIM_WORKERS", "0")) or os.cpu_count() or 1
+# Waves with less work than this (rows * levels * trials) run in-process
+PARALLEL_MIN_WORK = 1 << 22
+CACHE_ENTRIES = int(os.environ.get("DRAWS_SIM_CACHE_ENTRIES", "256"))
+
+_lock = threading.Lock()
+_cache = OrderedDict()      # key -> result array
+_executor = None
+
+counters = {"hits": 0, "misses": 0, "batches": 0, "trials": 0}
+
+
+def _get_executor():
+    global _executor
+    with _lock:
+        if _executor is None:
+            # spawn, not fork: the app and loaders may hold threads and
+            # database sockets that a forked child must not inherit
+            _executor = ProcessPoolExecutor(
+                max_workers=WORKERS, mp_context=multiprocessing.get_context("spawn"))
+            atexit.register(shutdown)
+        return _executor
+
+
+def shutdown():
+    """Stop the worker processes, if any were started."""
+    global _executor
+    with _lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True, cancel_futures=True)
+            _executor = None
+
+
+def _cache_key(kernel, arrays, *params):
+    h = hashlib.sha1(f"{kernel.__module__}.{kernel.__qualname__}{params!r}".encode())
+    for a in arrays:
+        a = np.ascontiguousarray(a)
+        h.update(f"{a.dtype.str}{a.shape}".encode())
+        h.update(a.data)
+    return h.hexdigest()
+
+
+def _run_batch(kernel, seed_seq, trials, arrays):
+    return kernel(np.random.default_rng(seed_seq), trials, *arrays)
+
+
+def estimate(kernel, arrays, seed=0, tol=TOL, max_trials=MAX_TRIALS,
+             batch_trials=BATCH_TRIALS, workers=None):
+    """Mean of kernel(rng, trials, *arrays) over enough trials to reach tol.
+
+    Every array is indexed by row on its first axis; the kernel returns a
+    (rows, ...) array of per-trial means. workers=1 keeps everything
+    in-process.
+    """
+    arrays = tuple(np.asarray(a) for a in arrays)
+    key = _cache_key(kernel, arrays, seed, tol, max_trials, batch_trials)
+    with _lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            counters["hits"] += 1
+            return _cache[key].copy()
+        counters["misses"] += 1
+
+    rows = len(arrays[0])
+    workers = WORKERS if workers is None else workers
+    max_batches = max(1, -(-max_trials // batch_trials))
+    streams = np.random.SeedSequence(seed).spawn(max_batches)
+
+    total = sq = None
+    done = np.zeros(rows, dtype=int)           # batches run for each row
+    active = np.arange(rows)
+    next_batch = 0
+    while len(active) and next_batch < max_batches:
+        wave = range(next_batch, min(next_batch + WAVE_BATCHES, max_batches))
+        sub = tuple(a[active] for a in arrays)
+        work = len(active) * arrays[0][0].size * batch_trials * len(wave)
+        if workers > 1 and len(wave) > 1 and work >= PARALLEL_MIN_WORK:
+            pool = _get_executor()
+            means = list(pool.map(_run_batch, [kernel] * len(wave),
+                                  [streams[b] for b in wave],
+                                  [batch_trials] * len(wave), [sub] * len(wave)))
+        else:
+            means = [_run_batch(kernel, streams[b], batch_trials, sub) for b in wave]
+        means = np.stack(means)
+        if total is None:
+            total = np.zeros((rows,) + means.shape[2:])
+            sq = np.zeros_like(total)
+        total[active] += means.sum(axis=0)
+        sq[active] += (means ** 2).sum(axis=0)
+        done[active] += len(wave)
+        next_batch += len(wave)
+        counters["batches"] += len(wave)
+        counters["trials"] += len(wave) * batch_trials * len(active)
+
+        # Standard error of the mean from the spread of the batch means
+        b = done[active].reshape((-1,) + (1,) * (total.ndim - 1))
+        mean = total[active] / b
+        var = np.clip(sq[active] / b - mean ** 2, 0.0, None) * b / np.maximum(b - 1, 1)
+        se = np.sqrt(var / b).reshape(len(active), -1).max(axis=1)
+        active = active[se > tol]
+
+    result = total / done.reshape((-1,) + (1,) * (total.ndim - 1))
+    with _lock:
+        _cache[key] = result
+        while len(_cache) > CACHE_ENTRIES:
+            _cache.popitem(last=False)
+    return result.copy()
+
+
+def stats():
+    """Cache and workload counters for this process."""
+    with _lock:
+        return {**counters, "entries": len(_cache), "workers": WORKERS}
@@ -0,0 +1,72 @@
+"""
+Multi-pass bonus draw engine (AZ).
+
+Arizona draws every hunt number in three passes:
+
+    Bonus Pass   20% of the permits go down the point queue, most points
+                 first, exactly as in the preference engine
+    1-2 Pass     the rest go to 1st and 2nd choices at random, each
+                 applicant holding points + 1 entries (the bonus engine)
+    3-4-5 Pass   whatever is left goes to 3rd through 5th choices
+
+A 1st choice competes in the first two passes, so its odds are the queue's,
+plus the weighted draw's among everyone the queue missed. The draw reports
+give the 1st choices drawn in each pass and pool (draw_results_by_pass);
+where a year has no pass data, the documented 20% split of the pool's tags
+stands in.
+
+Points are the applicant's total for the species: bonus points, plus the
+loyalty point (five straight years of applying), plus the permanent hunter
+education point. effective_points adds them up.
+
+    apps = pad_levels([{0: 566, 1: 602, 2: 516, 24: 51}])
+    odds, cutoff = pass_draw_odds(apps, bonus_tags=[2], random_tags=[17])
+"""
+
+import numpy as np
+
+from . import bonus, hybrid, pad_levels
+
+# States drawn this way
+STATES = ("AZ",)
+
+# Share of each hunt's permits in the Bonus Pass
+BONUS_PASS_SHARE = 0.2
+
+# Entries per applicant in the 1-2 Pass (bonus.ENTRY_RULES)
+ENTRY_RULE = "linear"
+
+
+def effective_points(points, loyalty=False, hunter_ed=False):
+    """Points an applicant holds in the draw: bonus + loyalty + hunter ed."""
+    return points + int(bool(loyalty)) + int(bool(hunter_ed))
+
+
+def split_tags(tags):
+    """(Bonus Pass tags, 1-2 Pass tags) from each pool's total, by the
+    documented share; AZ rounds the Bonus Pass down."""
+    tags = np.asarray(tags, dtype=float)
+    queue = np.floor(tags * BONUS_PASS_SHARE)
+    return queue, tags - queue
+
+
+def pass_draw_odds(applicants, bonus_tags, random_tags):
+    """1st-choice draw probability at every point level of every hunt.
+
+    applicants:  (hunts, levels) 1st-choice applicants, column p = p points
+    bonus_tags:  (hunts,) 1st choices drawn in the Bonus Pass
+    random_tags: (hunts,) 1st choices drawn in the 1-2 Pass
+
+    Returns (odds, cutoff) as preference.queue_draw_odds does; cutoff is
+    the lowest level the Bonus Pass reached.
+    """
+    n = np.asarray(applicants, dtype=float)
+    if n.ndim == 1:
+        n = n[None, :]
+    weights = bonus.entries(np.arange(n.shape[1]), ENTRY_RULE)
+    return hybrid.split_draw_odds(n, bonus_tags, random_tags, weights)
+
+
+def level_odds(levels, bonus_tags, random_tags, width=None):
+    """pass_draw_odds for per-hunt {points: applicants} dicts."""
+    return pass_draw_odds(pad_levels(levels, width), bonus_tags, random_tags)
@@ -0,0 +1,151 @@
+"""
+Cross-state application portfolio search.
+
+A hunter sends at most one application per state and species. Each lists up
+to the state's choices_per_app hunts and costs that state's fees. The
+portfolio is the set of applications that fits the budget and has the most
+expected value: expected tags, or expected harvest (each tag weighted by its
+hunt's success rate).
+
+Applications to different states and species are drawn independently, so
+the search splits in two. Neither step enumerates combinations:
+
+    best_plan   the best choices for one application, found exactly for
+                either way a state walks them (see choices.py)
+    knapsack    which applications to send, a 0/1 knapsack over their costs
+                in whole dollars
+
+    plan, value = best_plan(odds, leftover, worth, 3, "walk")
+    picked, total = knapsack(costs, values, budget)
+"""
+
+import numpy as np
+
+
+def _frontier(odds, worth):
+    """Indices of the hunts no other hunt beats on both odds and worth,
+    by rising odds (and so falling worth)."""
+    order = np.lexsort((-worth, -odds))
+    best_before = np.maximum.accumulate(worth[order])
+    keep = np.ones(len(order), dtype=bool)
+    keep[1:] = worth[order][1:] > best_before[:-1]
+    keep &= odds[order] > 0
+    return order[keep][::-1]
+
+
+def _best_walk(odds, worth, max_choices):
+    """Best plan when one random number walks the choices.
+
+    Choice k draws with chance p[k] - max(p[:k]), so a plan only pays
+    when its odds rise choice by choice. Swapping a hunt for one that beats
+    it on both odds and worth never loses, so only the frontier is
+    searched. The search is a DP over chains of rising odds.
+    """
+    front = _frontier(odds, worth)
+    if not len(front):
+        return [], 0.0
+    p, w = odds[front], worth[front]
+    m = len(front)
+    # gain[a, b]: what choice b adds when choice a came just before it
+    gain = w[None, :] * (p[None, :] - p[:, None])
+    gain[np.tril_indices(m)] = -np.inf
+
+    best = [w * p]
+    prev = []
+    for _ in range(1, min(max_choices, m)):
+        cand = best[-1][:, None] + gain
+        prev.append(cand.argmax(axis=0))
+        best.append(cand.max(axis=0))
+    layers = np.array(best)
+    k, end = np.unravel_index(int(layers.argmax()), layers.shape)
+
+    chain = [int(end)]
+    for j in range(k, 0, -1):
+        chain.append(int(prev[j - 1][chain[-1]]))
+    return [int(front[i]) for i in reversed(chain)], float(layers[k, end])
+
+
+def _best_rounds(odds, leftover, worth, max_choices):
+    """Best plan when every first choice is drawn before any second choice.
+
+    Later choices only draw from what the first round left: choice k with
+    chance leftover[k], if every choice before it missed. For a given set of
+    later choices the best order is by falling worth (swapping two
+    neighbours changes the value by l_a * l_b * (w_a - w_b)), so the later
+    choices are a DP over the hunts in that order, run for every possible
+    first choice at once.
+    """
+    n = len(odds)
+    slots = min(max_choices, n) - 1
+    gain = leftover * worth
+    rows = np.arange(n)
+    # tail[i, k]: best value of up to k later choices, hunt i left out. Hunts
+    # go in by rising worth, so each one added goes in front of the others.
+    tail = np.zeros((n, slots + 1))
+    heads = []
+    for x in np.lexsort((rows, worth)):
+        cand = gain[x] + (1.0 - leftover[x]) * tail[:, :-1]
+        take = (cand > tail[:, 1:]) & (rows != x)[:, None]
+        tail[:, 1:] = np.where(take, cand, tail[:, 1:])
+        heads.append((int(x), take))
+
+    value = odds * worth + (1.0 - odds) * tail[:, slots]
+    i = int(value.argmax())
+    if value[i] <= 0:
+        return [], 0.0
+    # The last hunt to improve tail[i, k] heads the k-choice tail
+    plan, k = [i], slots
+    for x, take in reversed(heads):
+        if k and take[i, k - 1]:
+            plan.append(x)
+            k -= 1
+    return plan, float(value[i])
+
+
+def best_plan(odds, leftover, worth, max_choices, walk):
+    """(hunt indices in choice order, expected value) of one application.
+
+    odds:     (hunts,) draw odds as a first choice
+    leftover: (hunts,) draw odds as a later choice ("rounds" only)
+    worth:    (hunts,) value of drawing each hunt: 1 for tags, the
+              success rate for harvest
+    walk:     "walk" or "rounds", as choices.DRAW_WALKS
+    """
+    odds = np.asarray(odds, dtype=float)
+    worth = np.asarray(worth, dtype=float)
+    if not len(odds):
+        return [], 0.0
+    if walk == "walk":
+        return _best_walk(odds, worth, max_choices)
+    return _best_rounds(odds, np.asarray(leftover, dtype=float), worth, max_choices)
+
+
+def knapsack(costs, values, budget=None):
+    """(indices of the applications to send, total value) within budget.
+
+    costs are rounded up to whole dollars. With no budget every application
+    worth anything is sent.
+    """
+    values = np.asarray(values, dtype=float)
+    if budget is None:
+        picked = np.flatnonzero(values > 0)
+        return [int(i) for i in picked], float(values[picked].sum())
+
+    costs = np.ceil(np.asarray(costs, dtype=float)).astype(int)
+    budget = int(budget)
+    best = np.zeros(budget + 1)
+    took = np.zeros((len(values), budget + 1), dtype=bool)
+    for i, (c, v) in enumerate(zip(costs, values)):
+        if v <= 0 or c > budget:
+            continue
+        cand = np.full(budget + 1, -np.inf)
+        cand[c:] = best[:budget + 1 - c] + v
+        took[i] = cand > best
+        best = np.maximum(best, cand)
+
+    picked, room = [], budget
+    for i in range(len(values) - 1, -1, -1):
+        if took[i, room]:
+            picked.append(i)
+            room -= costs[i]
+    return picked[::-1], float(best[budget])
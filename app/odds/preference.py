@@ -0,0 +1,63 @@
+"""
+Preference-point queue draw engine.
+
+Applicants are ranked by points and the preference share of the tags goes
+down the queue from the top: everyone above the cut-off level draws, the
+cut-off level draws at random among itself, nobody below does. Any random
+share (CA: 10% of deer tags, 25% of elk tags) is then drawn evenly among
+everyone the queue left behind.
+
+    apps = pad_levels([{0: 6101, 1: 213, 2: 359, 7: 2}])
+    odds, cutoff = queue_draw_odds(apps, pref_tags=[7335], random_tags=[815])
+
+Demand can be as little as the published cut-off row alone: CO's
+drawn-out-at report gives "drawn out at 5 points, 4 of 6 drawn at the final
+level", which as {5: 6} with 4 preference tags yields 1 above 5 points,
+4/6 at 5 and 0 below.
+"""
+
+import numpy as np
+
+from . import pad_levels
+
+
+def queue_draw_odds(applicants, pref_tags, random_tags=0):
+    """Draw probability at every point level of every hunt.
+
+    applicants:  (hunts, levels) applicant counts, column p = p points
+    pref_tags:   (hunts,) tags handed out down the point queue
+    random_tags: (hunts,) tags drawn at random among those left afterwards
+
+    Returns (odds, cutoff): a (hunts, levels) float array, and per hunt the
+    lowest point level that drew a preference tag (-1 if none did). Empty
+    levels get the odds an applicant there would have had.
+    """
+    n = np.asarray(applicants, dtype=float)
+    if n.ndim == 1:
+        n = n[None, :]
+    pref = np.broadcast_to(np.asarray(pref_tags, dtype=float), n.shape[:1])
+    rand = np.broadcast_to(np.asarray(random_tags, dtype=float), n.shape[:1])
+
+    # Walk the queue from the top level down
+    top = n[:, ::-1]
+    above = np.cumsum(top, axis=1) - top
+    left = np.clip(pref[:, None] - above, 0.0, None)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        q = np.where(top > 0, np.minimum(left / top, 1.0), (left > 0).astype(float))
+    q = q[:, ::-1]
+
+    total = n.sum(axis=1)
+    remaining = total - np.minimum(pref, total)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r = np.where(remaining > 0, np.minimum(rand / remaining, 1.0),
+                     (rand > 0).astype(float))
+    odds = q + (1.0 - q) * r[:, None]
+
+    drew = (n > 0) & (q > 0)
+    cutoff = np.where(drew.any(axis=1), drew.argmax(axis=1), -1)
+    return odds, cutoff
+
+
+def level_odds(levels, pref_tags, random_tags=0, width=None):
+    """queue_draw_odds for per-hunt {points: applicants} dicts."""
+    return queue_draw_odds(pad_levels(levels, width), pref_tags, random_tags)
@@ -6,9 +6,12 @@ Run from repo root or app/scripts/ — it finds nm_hunts.db relative to the repo
 import os
 import re
 import sqlite3
+import sys
 import psycopg2
 
 REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, os.path.join(REPO_ROOT, "scripts"))
+from loader_utils import finish_load  # noqa: E402
 SQLITE_PATH = os.path.join(REPO_ROOT, "nm_hunts.db")
 
 PG_HOST = os.environ.get("DRAWS_DB_HOST", "localhost")
@@ -277,6 +280,7 @@ def main():
     print(f"Inserted {hg_count} hunt_gmu links")
 
     pg.commit()
+    finish_load(pg)
     print("\n=== Migration complete ===")
 
     # Verify counts
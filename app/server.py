@@ -4,27 +4,113 @@ Connects to PostgreSQL draws database.
 """
 
 import os
-import psycopg2
+
+import numpy as np
 import psycopg2.extras
-from flask import Flask, jsonify, request, send_from_directory
+from flask import Flask, g, jsonify, request, send_from_directory
 
-app = Flask(__name__, static_folder="static", static_url_path="")
+import cache
+import db
+import http_cache
+import metrics
+from odds import choices as choices_engine
+from odds import curves, montecarlo, passes, portfolio
 
-DB_CONFIG = {
-    "host": os.environ.get("DRAWS_DB_HOST", "localhost"),
-    "port": os.environ.get("DRAWS_DB_PORT", "5432"),
-    "dbname": os.environ.get("DRAWS_DB_NAME", "draws"),
-    "user": os.environ.get("DRAWS_DB_USER", "draws"),
-    "password": os.environ.get("DRAWS_DB_PASS", "drawspass"),
-}
+app = Flask(__name__, static_folder="static", static_url_path="")
 
 # NM species code mapping: the original NM app uses 'DER' but PG uses 'MDR'
 NM_SPECIES_ALIAS = {"DER": "MDR"}
 
+# /api/hunts rows per page: the default, and the most ?limit= may ask for
+HUNTS_PAGE_SIZE = 500
+HUNTS_MAX_PAGE_SIZE = 2000
+
+# Hunt codes one /api/hunt_details request may ask for
+MAX_DETAIL_BATCH = 100
+
+# Hunts /api/recommend returns
+RECOMMEND_TOP_K = 10
+
+# Indexed by hunt_rankings.tier (high >= 25% odds, mid >= 10%, else low) and
+# note_variant (last character of the hunt code, mod 3).
+NOTE_TEMPLATES = {
+    "high": [
+        "Textbook third choice safety hunt: very high odds without giving up much in the way of opportunity.",
+        "Great safety pick. You are playing in the high odds tier here, which is exactly what you want for a third choice.",
+        "This is the kind of hunt you park in the third slot when you actually want to go hunting instead of just buying a lottery ticket.",
+    ],
+    "mid": [
+        "Nice middle of the road odds. This is a solid second choice if your first pick is a long shot.",
+        "Good candidate for a second choice: odds are respectable and the success numbers say it is worth showing up prepared.",
+        "Balanced odds for a second tier hunt. Not a gimme, but not a moonshot either.",
+    ],
+    "low": [
+        "Classic first choice tag: low odds, but the kind of hunt you swing for when you want something special.",
+        "Treat this as a swing for the fences first choice. Odds are tight enough that it should not be sitting in your third slot.",
+        "This belongs in your dream hunt bucket. Odds are slim, which is exactly what you expect for a true first choice.",
+    ],
+}
+
+# Applications /api/portfolio weighs at once
+PORTFOLIO_MAX_APPLICATIONS = 50
+# Budgets are searched in whole dollars
+PORTFOLIO_MAX_BUDGET = 100000
+
 
 def get_db():
-    conn = psycopg2.connect(**DB_CONFIG)
-    return conn
+    """Pooled connection for the current request.
+
+    The same connection is reused for every query in the request and goes
+    back to the pool in _release_db, whichever way the view exits.
+    """
+    if "db_conn" not in g:
+        g.db_conn = db.get_pool().getconn()
+    return g.db_conn
+
+
+@app.teardown_appcontext
+def _release_db(exc):
+    conn = g.pop("db_conn", None)
+    if conn is not None:
+        db.get_pool().putconn(conn, discard=conn.closed)
+
+
+@app.errorhandler(db.PoolTimeout)
+def _pool_timeout(exc):
+    return jsonify({"error": "Database busy, try again"}), 503
+
+
+# ─── Metrics (GET /metrics when DRAWS_METRICS=1) ─────────────────────
+metrics.init_app(app)
+
+
+# ─── HTTP caching ────────────────────────────────────────────────────
+# GET responses are a pure function of (release, data_version, query string),
+# so their ETags can be checked before the view runs. POST routes fall back
+# to http_cache.DEFAULT.
+CACHE_POLICIES = {
+    "api_states": http_cache.REFERENCE,
+    "api_species": http_cache.REFERENCE,
+    "api_units": http_cache.REFERENCE,
+    "api_pools": http_cache.REFERENCE,
+    "api_draw_years": http_cache.REFERENCE,
+    "api_state_bootstrap": http_cache.REFERENCE,
+    "api_bag_limits": http_cache.REFERENCE,
+    "api_hunts": http_cache.RESULTS,
+    "api_hunt_detail": http_cache.RESULTS,
+    "api_hunt_details": http_cache.RESULTS,
+    "api_points_curve": http_cache.RESULTS,
+    "api_odds_by_points": http_cache.RESULTS,
+    "api_my_odds": http_cache.RESULTS,
+    "api_health": http_cache.NO_STORE,
+}
+
+http_cache.init_app(
+    app,
+    get_version=lambda: cache.data_version(get_db),
+    policies=CACHE_POLICIES,
+    release=os.environ.get("DRAWS_RELEASE") or str(int(os.path.getmtime(__file__))),
+)
 
 
 def dict_rows(cur):
@@ -32,21 +118,18 @@ def dict_rows(cur):
     return [dict(zip(cols, row)) for row in cur.fetchall()]
 
 
-def _run_migration():
-    """Add season_label column to hunts table if it doesn't exist."""
-    try:
-        conn = get_db()
-        cur = conn.cursor()
-        cur.execute(
-            "ALTER TABLE hunts ADD COLUMN IF NOT EXISTS season_label TEXT"
-        )
-        conn.commit()
-        conn.close()
-    except Exception:
-        pass
+def _state_code_arg():
+    """state_code query param, normalized so 'nm ' and 'NM' share a cache entry."""
+    return (request.args.get("state_code") or "").strip().upper() or None
 
 
-_run_migration()
+def _effective_points(state_code, points):
+    """`points` plus the loyalty and hunter education points a state counts
+    with bonus points (AZ), flagged by ?loyalty=1&hunter_ed=1."""
+    if points is None or state_code not in passes.STATES:
+        return points
+    return passes.effective_points(points, request.args.get("loyalty", type=int),
+                                   request.args.get("hunter_ed", type=int))
 
 
 # ─── Static ──────────────────────────────────────────────────────────
@@ -55,11 +138,25 @@ def index():
     return send_from_directory(app.static_folder, "index.html")
 
 
+# ─── GET /api/health ──────────────────────────────────────────────────
+@app.route("/api/health")
+def api_health():
+    """Liveness check plus connection-pool, cache and simulation usage for this worker."""
+    cur = get_db().cursor()
+    cur.execute("SELECT 1")
+    return jsonify({"ok": True, "pool": db.get_pool().stats(), "cache": cache.stats(),
+                    "simulation": montecarlo.stats()})
+
+
 # ─── GET /api/states ──────────────────────────────────────────────────
 @app.route("/api/states")
 def api_states():
-    conn = get_db()
-    cur = conn.cursor()
+    rows = cache.get_or_load(("states",), _query_states, get_db)
+    return jsonify({"states": rows})
+
+
+def _query_states():
+    cur = get_db().cursor()
     cur.execute("""
         SELECT state_id, state_code, state_name, draw_type, point_math,
                point_math_note, choices_per_app, can_buy_points, tag_turnback,
@@ -67,20 +164,23 @@ def api_states():
                app_deadline_month, results_month, residency_req, notes
         FROM states ORDER BY state_name
     """)
-    rows = dict_rows(cur)
-    conn.close()
-    return jsonify({"states": rows})
+    return dict_rows(cur)
 
 
 # ─── GET /api/species ─────────────────────────────────────────────────
 @app.route("/api/species")
 def api_species():
-    state_code = request.args.get("state_code")
+    state_code = _state_code_arg()
     if not state_code:
         return jsonify({"error": "state_code is required"}), 400
 
-    conn = get_db()
-    cur = conn.cursor()
+    rows = cache.get_or_load(("species", state_code),
+                             lambda: _query_species(state_code), get_db)
+    return jsonify({"species": rows})
+
+
+def _query_species(state_code):
+    cur = get_db().cursor()
     cur.execute("""
         SELECT DISTINCT sp.species_id, sp.species_code, sp.common_name
         FROM species sp
@@ -89,22 +189,22 @@ def api_species():
         WHERE st.state_code = %s AND h.is_active = 1
         ORDER BY sp.common_name
     """, (state_code,))
-    rows = dict_rows(cur)
-    conn.close()
-    return jsonify({"species": rows})
+    return dict_rows(cur)
 
 
 # ─── GET /api/units ───────────────────────────────────────────────────
 @app.route("/api/units")
 def api_units():
-    state_code = request.args.get("state_code")
+    state_code = _state_code_arg()
     species_code = request.args.get("species_code")
     if not state_code:
         return jsonify({"error": "state_code is required"}), 400
 
-    conn = get_db()
-    cur = conn.cursor()
+    return jsonify({"units": _query_units(state_code, species_code)})
+
 
+def _query_units(state_code, species_code=None):
+    cur = get_db().cursor()
     sql = """
         SELECT DISTINCT g.gmu_id, g.gmu_code, g.gmu_name, g.gmu_sort_key,
                st.unit_type_label
@@ -129,7 +229,6 @@ def api_units():
     sql += " ORDER BY g.gmu_sort_key, g.gmu_code"
     cur.execute(sql, params)
     rows = dict_rows(cur)
-    conn.close()
 
     for r in rows:
         code = r["gmu_code"] or ""
@@ -141,19 +240,23 @@ def api_units():
             r["dropdown_label"] = f"{code} — {name}"
         else:
             r["dropdown_label"] = code
-
-    return jsonify({"units": rows})
+    return rows
 
 
 # ─── GET /api/pools ───────────────────────────────────────────────────
 @app.route("/api/pools")
 def api_pools():
-    state_code = request.args.get("state_code")
+    state_code = _state_code_arg()
     if not state_code:
         return jsonify({"error": "state_code is required"}), 400
 
-    conn = get_db()
-    cur = conn.cursor()
+    rows = cache.get_or_load(("pools", state_code),
+                             lambda: _query_pools(state_code), get_db)
+    return jsonify({"pools": rows})
+
+
+def _query_pools(state_code):
+    cur = get_db().cursor()
     cur.execute("""
         SELECT p.pool_id, p.pool_code, p.description, p.allocation_pct,
                p.allocation_note
@@ -162,21 +265,22 @@ def api_pools():
         WHERE st.state_code = %s
         ORDER BY p.pool_id
     """, (state_code,))
-    rows = dict_rows(cur)
-    conn.close()
-    return jsonify({"pools": rows})
+    return dict_rows(cur)
 
 
 # ─── GET /api/draw_years ─────────────────────────────────────────────
 @app.route("/api/draw_years")
 def api_draw_years():
-    state_code = request.args.get("state_code")
+    state_code = _state_code_arg()
     species_code = request.args.get("species_code")
     if not state_code:
         return jsonify({"error": "state_code is required"}), 400
 
-    conn = get_db()
-    cur = conn.cursor()
+    return jsonify({"draw_years": _query_draw_years(state_code, species_code)})
+
+
+def _query_draw_years(state_code, species_code=None):
+    cur = get_db().cursor()
     sql = """
         SELECT DISTINCT dr.draw_year
         FROM draw_results_by_pool dr
@@ -191,19 +295,55 @@ def api_draw_years():
     sql += " ORDER BY dr.draw_year DESC"
 
     cur.execute(sql, params)
-    years = [r[0] for r in cur.fetchall()]
-    conn.close()
-    return jsonify({"draw_years": years})
+    return [r[0] for r in cur.fetchall()]
+
+
+# ─── GET /api/state_bootstrap ────────────────────────────────────────
+@app.route("/api/state_bootstrap")
+def api_state_bootstrap():
+    """Everything the filter bars need when a state is picked, in one call.
+
+    Same payloads as /api/species, /api/pools, /api/draw_years and
+    /api/units (no species filter), read on one pooled connection and cached
+    per state until the next load.
+    """
+    state_code = _state_code_arg()
+    if not state_code:
+        return jsonify({"error": "state_code is required"}), 400
+
+    payload = cache.get_or_load(("state_bootstrap", state_code),
+                                lambda: _query_state_bootstrap(state_code), get_db)
+    return jsonify(payload)
+
+
+def _query_state_bootstrap(state_code):
+    return {
+        "state_code": state_code,
+        "species": _query_species(state_code),
+        "pools": _query_pools(state_code),
+        "draw_years": _query_draw_years(state_code),
+        "units": _query_units(state_code),
+    }
 
 
 # ─── GET /api/hunts ───────────────────────────────────────────────────
+
+
 @app.route("/api/hunts")
 def api_hunts():
+    """One row per hunt_code, paged by hunt_code.
+
+    Pass the response's next_cursor back as ?cursor= to get the next page;
+    next_cursor is null on the last page.
+    """
     state_code = request.args.get("state_code")
     species_code = request.args.get("species_code")
     pool_code = request.args.get("pool_code")
     gmu_code = request.args.get("gmu_code")
     draw_year = request.args.get("draw_year", type=int)
+    cursor = request.args.get("cursor")
+    limit = request.args.get("limit", HUNTS_PAGE_SIZE, type=int)
+    limit = max(1, min(limit, HUNTS_MAX_PAGE_SIZE))
 
     if not state_code:
         return jsonify({"error": "state_code is required"}), 400
@@ -211,8 +351,11 @@ def api_hunts():
     conn = get_db()
     cur = conn.cursor()
 
+    # DISTINCT ON keeps one row per hunt_code: without a pool filter a hunt
+    # joins one draw row per pool, and the lowest pool_id (the state's
+    # primary pool, as listed by /api/pools) wins.
     sql = """
-        SELECT
+        SELECT DISTINCT ON (h.hunt_code)
             h.hunt_id,
             h.hunt_code,
             COALESCE(h.hunt_code_display, h.hunt_code) AS hunt_label,
@@ -232,49 +375,40 @@ def api_hunts():
                  ELSE NULL END AS draw_odds_pct,
             dr.avg_pts_drawn,
             dr.min_pts_drawn,
-            hs.harvest_year AS latest_harvest_year,
-            hs.success_rate AS latest_success_rate,
-            hs.days_hunted,
-            latest_dates.start_date AS open_date,
-            latest_dates.end_date AS close_date,
-            latest_dates.season_year AS dates_season_year
+            hl.harvest_year AS latest_harvest_year,
+            hl.success_rate AS latest_success_rate,
+            hl.days_hunted,
+            hl.open_date,
+            hl.close_date,
+            hl.dates_season_year
         FROM hunts h
         JOIN states st ON st.state_id = h.state_id
         JOIN species sp ON sp.species_id = h.species_id
         LEFT JOIN weapon_types wt ON wt.weapon_type_id = h.weapon_type_id
         LEFT JOIN bag_limits bl ON bl.bag_limit_id = h.bag_limit_id
-        LEFT JOIN (
-            SELECT DISTINCT ON (hunt_id) hunt_id, start_date, end_date, season_year
-            FROM hunt_dates
-            ORDER BY hunt_id, season_year DESC
-        ) latest_dates ON latest_dates.hunt_id = h.hunt_id
+        LEFT JOIN hunt_latest hl ON hl.hunt_id = h.hunt_id
     """
 
-    # Draw results join
-    dr_join = """
-        LEFT JOIN draw_results_by_pool dr ON dr.hunt_id = h.hunt_id
-    """
-    params = []
+    # Draw results join: a specific year, else each pool's row from the
+    # hunt's latest draw year (precomputed in hunt_latest_draw)
+    if draw_year:
+        dr_join = """
+            LEFT JOIN draw_results_by_pool dr ON dr.hunt_id = h.hunt_id
+                AND dr.draw_year = %s
+        """
+        params = [draw_year]
+    else:
+        dr_join = """
+            LEFT JOIN hunt_latest_draw dr ON dr.hunt_id = h.hunt_id
+        """
+        params = []
 
     if pool_code:
         dr_join += " AND dr.pool_id = (SELECT pool_id FROM pools WHERE state_id = st.state_id AND pool_code = %s)"
         params.append(pool_code)
-    if draw_year:
-        dr_join += " AND dr.draw_year = %s"
-        params.append(draw_year)
 
     sql += dr_join
 
-    # Latest harvest join
-    sql += """
-        LEFT JOIN LATERAL (
-            SELECT hs1.harvest_year, hs1.success_rate, hs1.days_hunted
-            FROM harvest_stats hs1
-            WHERE hs1.hunt_id = h.hunt_id AND hs1.access_type = 'Public'
-            ORDER BY hs1.harvest_year DESC LIMIT 1
-        ) hs ON true
-    """
-
     sql += " WHERE st.state_code = %s AND h.is_active = 1"
     params.append(state_code)
 
@@ -292,20 +426,21 @@ def api_hunts():
         """
         params.append(gmu_code)
 
-    sql += " ORDER BY h.hunt_code LIMIT 500"
+    if cursor:
+        sql += " AND h.hunt_code > %s"
+        params.append(cursor)
+
+    # Fetch one extra row to learn whether another page exists
+    sql += " ORDER BY h.hunt_code, dr.pool_id NULLS LAST, h.hunt_id LIMIT %s"
+    params.append(limit + 1)
 
     cur.execute(sql, params)
     rows = dict_rows(cur)
-    conn.close()
 
-    # Deduplicate by hunt_code (can happen when no pool filter is set)
-    seen = set()
-    deduped = []
-    for r in rows:
-        if r["hunt_code"] not in seen:
-            seen.add(r["hunt_code"])
-            deduped.append(r)
-    rows = deduped
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = rows[-1]["hunt_code"]
 
     # Serialize date objects to strings
     for r in rows:
@@ -314,7 +449,7 @@ def api_hunts():
         if r.get("close_date"):
             r["close_date"] = str(r["close_date"])
 
-    return jsonify({"hunts": rows})
+    return jsonify({"hunts": rows, "next_cursor": next_cursor})
 
 
 # ─── GET /api/hunt_detail ─────────────────────────────────────────────
@@ -325,63 +460,383 @@ def api_hunt_detail():
     if not state_code or not hunt_code:
         return jsonify({"error": "state_code and hunt_code are required"}), 400
 
-    conn = get_db()
-    cur = conn.cursor()
+    hunt = _query_hunt_details(state_code, [hunt_code]).get(hunt_code)
+    if hunt is None:
+        return jsonify({"error": "Hunt not found"}), 404
+    return jsonify(hunt)
+
 
-    # Basic hunt info
+# ─── GET /api/hunt_details ────────────────────────────────────────────
+
+
+@app.route("/api/hunt_details")
+def api_hunt_details():
+    """Batch /api/hunt_detail: ?state_code=NM&hunt_codes=ELK-1-132,ELK-1-413
+
+    hunt_code may also be repeated. Results come back in request order;
+    unknown codes are listed under "not_found".
+    """
+    state_code = request.args.get("state_code")
+    hunt_codes = []
+    for raw in request.args.getlist("hunt_codes") + request.args.getlist("hunt_code"):
+        for code in raw.split(","):
+            code = code.strip()
+            if code and code not in hunt_codes:
+                hunt_codes.append(code)
+    if not state_code or not hunt_codes:
+        return jsonify({"error": "state_code and hunt_codes are required"}), 400
+    if len(hunt_codes) > MAX_DETAIL_BATCH:
+        return jsonify({"error": f"At most {MAX_DETAIL_BATCH} hunt_codes per request"}), 400
+
+    found = _query_hunt_details(state_code, hunt_codes)
+    return jsonify({
+        "hunts": [found[c] for c in hunt_codes if c in found],
+        "not_found": [c for c in hunt_codes if c not in found],
+    })
+
+
+def _query_hunt_details(state_code, hunt_codes):
+    """Hunt info with draw, harvest and season-date history for each code,
+    plus each pool's point-creep forecast (scripts/precompute.py).
+
+    One statement: each hunt row is joined to the union of its history rows,
+    tagged by part, and the lists are rebuilt here. The values keep their
+    column types, so they serialize as the separate per-part queries did.
+    Returns {hunt_code: detail}.
+    """
+    parts = (
+        ("draw_history", ("draw_year", "pool_code", "applications", "tags_available",
+                          "tags_awarded", "avg_pts_drawn", "min_pts_drawn")),
+        ("harvest_history", ("harvest_year", "access_type", "success_rate", "satisfaction",
+                             "days_hunted", "licenses_sold")),
+        ("season_dates", ("season_year", "start_date", "end_date", "hunt_name")),
+        ("point_forecasts", ("pool_code", "latest_draw_year", "years_of_history",
+                             "creep_per_year", "projected_min_pts", "projected_avg_pts",
+                             "years_to_draw")),
+    )
+    cur = get_db().cursor()
+    # The first branch of the union types every column; the others may
+    # leave theirs as a bare NULL
     cur.execute("""
         SELECT h.hunt_id, h.hunt_code,
                COALESCE(h.hunt_code_display, h.hunt_code) AS hunt_label,
                h.unit_description, h.season_type, h.tag_type, h.season_label,
                wt.weapon_code, bl.bag_code, bl.label AS bag_label,
-               bl.plain_definition AS bag_definition
+               bl.plain_definition AS bag_definition,
+               c.*
         FROM hunts h
         JOIN states st ON st.state_id = h.state_id
         LEFT JOIN weapon_types wt ON wt.weapon_type_id = h.weapon_type_id
         LEFT JOIN bag_limits bl ON bl.bag_limit_id = h.bag_limit_id
-        WHERE st.state_code = %s AND h.hunt_code = %s
-    """, (state_code, hunt_code))
-    hunt_rows = dict_rows(cur)
-    if not hunt_rows:
-        conn.close()
+        LEFT JOIN LATERAL (
+            SELECT 0 AS part, dr.draw_year AS sort_year, p.pool_code,
+                   dr.draw_year, dr.applications, dr.tags_available, dr.tags_awarded,
+                   dr.avg_pts_drawn, dr.min_pts_drawn,
+                   NULL::INTEGER AS harvest_year, NULL::TEXT AS access_type,
+                   NULL::REAL AS success_rate, NULL::REAL AS satisfaction,
+                   NULL::REAL AS days_hunted, NULL::REAL AS licenses_sold,
+                   NULL::INTEGER AS season_year, NULL::DATE AS start_date,
+                   NULL::DATE AS end_date, NULL::TEXT AS hunt_name,
+                   NULL::INTEGER AS latest_draw_year, NULL::BIGINT AS years_of_history,
+                   NULL::REAL AS creep_per_year, NULL::REAL[] AS projected_min_pts,
+                   NULL::REAL[] AS projected_avg_pts, NULL::INTEGER AS years_to_draw
+            FROM draw_results_by_pool dr
+            JOIN pools p ON p.pool_id = dr.pool_id
+            WHERE dr.hunt_id = h.hunt_id
+            UNION ALL
+            SELECT 1, harvest_year, NULL,
+                   NULL, NULL, NULL, NULL, NULL, NULL,
+                   harvest_year, access_type, success_rate, satisfaction,
+                   days_hunted, licenses_sold,
+                   NULL, NULL, NULL, NULL,
+                   NULL, NULL, NULL, NULL, NULL, NULL
+            FROM harvest_stats
+            WHERE hunt_id = h.hunt_id
+            UNION ALL
+            SELECT 2, season_year, NULL,
+                   NULL, NULL, NULL, NULL, NULL, NULL,
+                   NULL, NULL, NULL, NULL, NULL, NULL,
+                   season_year, start_date, end_date, hunt_name,
+                   NULL, NULL, NULL, NULL, NULL, NULL
+            FROM hunt_dates
+            WHERE hunt_id = h.hunt_id
+            UNION ALL
+            SELECT 3, NULL, p.pool_code,
+                   NULL, NULL, NULL, NULL, NULL, NULL,
+                   NULL, NULL, NULL, NULL, NULL, NULL,
+                   NULL, NULL, NULL, NULL,
+                   f.latest_draw_year, f.years_of_history, f.creep_per_year,
+                   f.projected_min_pts, f.projected_avg_pts, f.years_to_draw
+            FROM point_forecasts f
+            JOIN pools p ON p.pool_id = f.pool_id
+            WHERE f.hunt_id = h.hunt_id
+        ) c ON true
+        WHERE st.state_code = %s AND h.hunt_code = ANY(%s)
+        ORDER BY h.hunt_code, h.hunt_id, c.part, c.sort_year DESC, c.pool_code, c.access_type
+    """, (state_code, list(hunt_codes)))
+
+    found = {}
+    for r in dict_rows(cur):
+        hunt = found.get(r["hunt_code"])
+        if hunt is None:
+            hunt = {k: r[k] for k in ("hunt_id", "hunt_code", "hunt_label", "unit_description",
+                                      "season_type", "tag_type", "season_label", "weapon_code",
+                                      "bag_code", "bag_label", "bag_definition")}
+            hunt.update((name, []) for name, _ in parts)
+            found[r["hunt_code"]] = hunt
+        elif hunt["hunt_id"] != r["hunt_id"]:
+            continue
+        if r["part"] is not None:
+            name, cols = parts[r["part"]]
+            hunt[name].append({c: r[c] for c in cols})
+    return found
+
+
+# ─── GET /api/points_curve ───────────────────────────────────────────
+@app.route("/api/points_curve")
+def api_points_curve():
+    """Published demand at every point level of one hunt, per year and pool.
+
+    ?state_code=AZ&hunt_code=2001[&pool_code=RES][&draw_year=2024]
+
+    One read off draw_results_by_points' primary key. Only levels the state
+    published are listed; `successes` is null where it publishes none.
+    """
+    state_code = _state_code_arg()
+    hunt_code = (request.args.get("hunt_code") or "").strip()
+    pool_code = request.args.get("pool_code")
+    draw_year = request.args.get("draw_year", type=int)
+    if not state_code or not hunt_code:
+        return jsonify({"error": "state_code and hunt_code are required"}), 400
+
+    cur = get_db().cursor()
+    sql = """
+        WITH hunt AS (
+            SELECT h.hunt_id
+            FROM hunts h
+            JOIN states st ON st.state_id = h.state_id
+            WHERE st.state_code = %s AND h.hunt_code = %s
+            ORDER BY h.hunt_id
+            LIMIT 1
+        )
+        SELECT hunt.hunt_id, b.draw_year, p.pool_code,
+               b.points, b.applications, b.successes
+        FROM hunt
+        LEFT JOIN draw_results_by_points b ON b.hunt_id = hunt.hunt_id
+    """
+    params = [state_code, hunt_code]
+    if draw_year:
+        sql += " AND b.draw_year = %s"
+        params.append(draw_year)
+    if pool_code:
+        sql += " AND b.pool_id IN (SELECT pool_id FROM pools WHERE pool_code = %s)"
+        params.append(pool_code)
+    sql += """
+        LEFT JOIN pools p ON p.pool_id = b.pool_id
+        ORDER BY b.draw_year DESC, p.pool_code, b.points
+    """
+    cur.execute(sql, params)
+    rows = dict_rows(cur)
+    if not rows:
         return jsonify({"error": "Hunt not found"}), 404
-    hunt = hunt_rows[0]
-    hunt_id = hunt["hunt_id"]
 
-    # All draw years
-    cur.execute("""
-        SELECT dr.draw_year, p.pool_code, dr.applications, dr.tags_available,
-               dr.tags_awarded, dr.avg_pts_drawn, dr.min_pts_drawn
-        FROM draw_results_by_pool dr
-        JOIN pools p ON p.pool_id = dr.pool_id
-        WHERE dr.hunt_id = %s
-        ORDER BY dr.draw_year DESC, p.pool_code
-    """, (hunt_id,))
-    draw_history = dict_rows(cur)
+    curves = {}
+    for r in rows:
+        if r["points"] is None:
+            continue
+        curve = curves.setdefault((r["draw_year"], r["pool_code"]), {
+            "draw_year": r["draw_year"],
+            "pool_code": r["pool_code"],
+            "levels": [],
+        })
+        curve["levels"].append({
+            "points": r["points"],
+            "applications": r["applications"],
+            "successes": r["successes"],
+        })
 
-    # All harvest years
-    cur.execute("""
-        SELECT harvest_year, access_type, success_rate, satisfaction,
-               days_hunted, licenses_sold
-        FROM harvest_stats
-        WHERE hunt_id = %s
-        ORDER BY harvest_year DESC
-    """, (hunt_id,))
-    harvest_history = dict_rows(cur)
-
-    # Season dates
+    return jsonify({
+        "state_code": state_code,
+        "hunt_code": hunt_code,
+        "curves": list(curves.values()),
+    })
+
+
+# ─── GET /api/odds_by_points ─────────────────────────────────────────
+@app.route("/api/odds_by_points")
+def api_odds_by_points():
+    """Modelled draw odds at each point level of one hunt, per pool.
+
+    ?state_code=AZ&hunt_code=2001[&pool_code=RES][&draw_year=2024][&points=12]
+        [&loyalty=1][&hunter_ed=1]
+
+    Reads the published demand per point level (draw_results_by_points) for
+    draw_year, else the hunt's latest year that has it, and hands every pool
+    to the state's engine in one batch: the passes engine for AZ's
+    Bonus/1-2 Pass draw, the bonus engine for weighted draws, the
+    preference engine for point queues, the hybrid engine for split
+    queue/random draws (WY, OR, UT). Levels run from 0 to the highest
+    published level (or `points`, if higher); `your_odds` is the odds at
+    `points`, counting AZ's loyalty and hunter education points.
+    """
+    state_code = _state_code_arg()
+    hunt_code = (request.args.get("hunt_code") or "").strip()
+    pool_code = request.args.get("pool_code")
+    draw_year = request.args.get("draw_year", type=int)
+    points = _effective_points(state_code, request.args.get("points", type=int))
+    if not state_code or not hunt_code:
+        return jsonify({"error": "state_code and hunt_code are required"}), 400
+    if points is not None and not 0 <= points <= curves.MAX_POINTS:
+        return jsonify({"error": f"points must be between 0 and {curves.MAX_POINTS}"}), 400
+
+    cur = get_db().cursor()
+    sql = """
+        WITH hunt AS (
+            SELECT h.hunt_id, st.point_math
+            FROM hunts h
+            JOIN states st ON st.state_id = h.state_id
+            WHERE st.state_code = %s AND h.hunt_code = %s
+            ORDER BY h.hunt_id
+            LIMIT 1
+        ), yr AS (
+            SELECT COALESCE(%s, MAX(draw_year)) AS draw_year
+            FROM draw_results_by_points
+            WHERE hunt_id = (SELECT hunt_id FROM hunt)
+        )
+        SELECT hunt.point_math, yr.draw_year, p.pool_code,
+               b.points, b.applications, b.successes,
+               dr.tags_available, dr.random_tags,
+               bp.first_drawn AS bonus_pass_tags, rp.first_drawn AS random_pass_tags
+        FROM hunt
+        CROSS JOIN yr
+        LEFT JOIN draw_results_by_points b ON b.hunt_id = hunt.hunt_id
+            AND b.draw_year = yr.draw_year
+    """
+    params = [state_code, hunt_code, draw_year]
+    if pool_code:
+        sql += " AND b.pool_id IN (SELECT pool_id FROM pools WHERE pool_code = %s)"
+        params.append(pool_code)
+    sql += """
+        LEFT JOIN pools p ON p.pool_id = b.pool_id
+        LEFT JOIN draw_results_by_pool dr ON dr.hunt_id = b.hunt_id
+            AND dr.draw_year = b.draw_year AND dr.pool_id = b.pool_id
+        LEFT JOIN draw_results_by_pass bp ON bp.hunt_id = b.hunt_id
+            AND bp.draw_year = b.draw_year AND bp.pool_id = b.pool_id AND bp.draw_pass = 'bonus'
+        LEFT JOIN draw_results_by_pass rp ON rp.hunt_id = b.hunt_id
+            AND rp.draw_year = b.draw_year AND rp.pool_id = b.pool_id AND rp.draw_pass = '1-2'
+        ORDER BY b.pool_id, b.points
+    """
+    cur.execute(sql, params)
+    rows = dict_rows(cur)
+    if not rows:
+        return jsonify({"error": "Hunt not found"}), 404
+
+    point_math = rows[0]["point_math"]
+    model = curves.draw_model(state_code, point_math)
+    if model is None:
+        return jsonify({"error": f"No point-level draw model for {state_code}"}), 400
+    model, rule = model
+
+    pools = {}
+    for r in rows:
+        if r["pool_code"] is not None:
+            pools.setdefault(r["pool_code"], []).append(r)
+
+    demand = [{r["points"]: r["applications"] for r in levels} for levels in pools.values()]
+    width = 1 + max([p for lv in demand for p in lv] + [points or 0])
+    tags, random_tags = curves.pool_tags(list(pools.values()), model, point_math)
+    odds, cutoffs = curves.level_curves(model, rule, demand, tags, random_tags, width)
+
+    result = []
+    for i, (code, levels) in enumerate(pools.items()):
+        by_points = {r["points"]: r for r in levels}
+        pool = {
+            "pool_code": code,
+            "applications": sum(r["applications"] for r in levels),
+            "tags": tags[i],
+            "levels": [{
+                "points": p,
+                "applications": by_points[p]["applications"] if p in by_points else None,
+                "successes": by_points[p]["successes"] if p in by_points else None,
+                "odds": round(float(odds[i, p]), 4),
+            } for p in range(width)],
+        }
+        if cutoffs is not None:
+            pool["random_tags"] = random_tags[i]
+            pool["cutoff_points"] = int(cutoffs[i]) if cutoffs[i] >= 0 else None
+        if points is not None:
+            pool["your_odds"] = round(float(odds[i, points]), 4)
+        result.append(pool)
+
+    return jsonify({
+        "state_code": state_code,
+        "hunt_code": hunt_code,
+        "draw_year": rows[0]["draw_year"] if pools else None,
+        "model": model,
+        "entry_rule": rule if model in ("bonus", "passes") else None,
+        "points": points,
+        "pools": result,
+    })
+
+
+# ─── GET /api/my_odds ────────────────────────────────────────────────
+@app.route("/api/my_odds")
+def api_my_odds():
+    """One hunter's odds at every active hunt of a species, best first.
+
+    ?state_code=CO&species_code=ELK&points=12[&pool_code=RES]
+        [&loyalty=1][&hunter_ed=1]
+
+    Reads the precomputed point_odds curve element for `points` (see
+    scripts/precompute.py), so a whole state costs one indexed read. Hunts
+    without point-level data fall back to the latest year's overall odds
+    (tags awarded per application) and say so in `basis`. In AZ the
+    loyalty and hunter education flags add their points to `points`.
+    """
+    state_code = _state_code_arg()
+    species_code = request.args.get("species_code")
+    pool_code = request.args.get("pool_code", "RES")
+    points = _effective_points(state_code, request.args.get("points", type=int))
+    if not state_code or not species_code or points is None:
+        return jsonify({"error": "state_code, species_code and points are required"}), 400
+    if not 0 <= points <= curves.MAX_POINTS:
+        return jsonify({"error": f"points must be between 0 and {curves.MAX_POINTS}"}), 400
+
+    cur = get_db().cursor()
     cur.execute("""
-        SELECT season_year, start_date, end_date, hunt_name
-        FROM hunt_dates WHERE hunt_id = %s
-        ORDER BY season_year DESC
-    """, (hunt_id,))
-    dates = dict_rows(cur)
-
-    conn.close()
-    hunt["draw_history"] = draw_history
-    hunt["harvest_history"] = harvest_history
-    hunt["season_dates"] = dates
-    return jsonify(hunt)
+        SELECT h.hunt_code,
+               COALESCE(h.hunt_code_display, h.hunt_code) AS hunt_label,
+               h.unit_description,
+               CASE WHEN po.hunt_id IS NOT NULL THEN 'points'
+                    WHEN hd.applications > 0 THEN 'overall' END AS basis,
+               COALESCE(po.draw_year, hd.draw_year) AS draw_year,
+               po.model, po.cutoff_points,
+               CASE WHEN po.hunt_id IS NOT NULL
+                        THEN po.odds[LEAST(%s, array_length(po.odds, 1) - 1) + 1]
+                    WHEN hd.applications > 0
+                        THEN LEAST(CAST(COALESCE(hd.tags_awarded, 0) AS REAL) / hd.applications, 1)
+               END AS odds
+        FROM hunts h
+        JOIN states st ON st.state_id = h.state_id
+        JOIN species sp ON sp.species_id = h.species_id
+        JOIN pools p ON p.state_id = st.state_id AND p.pool_code = %s
+        LEFT JOIN point_odds po ON po.hunt_id = h.hunt_id AND po.pool_id = p.pool_id
+        LEFT JOIN hunt_latest_draw hd ON hd.hunt_id = h.hunt_id AND hd.pool_id = p.pool_id
+        WHERE st.state_code = %s AND sp.species_code = %s AND h.is_active = 1
+        ORDER BY odds DESC NULLS LAST, h.hunt_code
+    """, (points, pool_code, state_code, species_code))
+    hunts = dict_rows(cur)
+    for r in hunts:
+        if r["odds"] is not None:
+            r["odds"] = round(float(r["odds"]), 4)
+
+    return jsonify({
+        "state_code": state_code,
+        "species_code": species_code,
+        "pool_code": pool_code,
+        "points": points,
+        "hunts": hunts,
+    })
 
 
 # ─── POST /api/recommend ─────────────────────────────────────────────
@@ -400,139 +855,75 @@ def api_recommend():
     conn = get_db()
     cur = conn.cursor()
 
+    # Candidates are pre-scored and pre-flagged in hunt_rankings (see
+    # scripts/precompute.py), so this is a top-K read off a partial index.
+    # Next season's projected cut-off comes from point_forecasts.
     sql = """
-        SELECT h.hunt_code, h.unit_description,
+        SELECT r.hunt_code, h.unit_description,
                COALESCE(h.hunt_code_display, h.hunt_code) AS hunt_label,
                sp.common_name AS species_name,
                bl.bag_code,
                wt.weapon_code,
-               dr.applications, dr.tags_awarded,
-               hs.success_rate, hs.harvest_year,
-               hd.hunt_name
-        FROM hunts h
-        JOIN states st ON st.state_id = h.state_id
-        JOIN species sp ON sp.species_id = h.species_id
+               hl.hunt_name,
+               r.draw_odds, r.success_rate, r.harvest_year,
+               r.score, r.tier, r.note_variant,
+               pf.projected_min_pts[1] AS projected_min_pts,
+               pf.years_to_draw
+        FROM hunt_rankings r
+        JOIN states st ON st.state_id = r.state_id
+        JOIN species sp ON sp.species_id = r.species_id
+        JOIN pools p ON p.pool_id = r.pool_id
+        JOIN hunts h ON h.hunt_id = r.hunt_id
         LEFT JOIN weapon_types wt ON wt.weapon_type_id = h.weapon_type_id
         LEFT JOIN bag_limits bl ON bl.bag_limit_id = h.bag_limit_id
-        LEFT JOIN draw_results_by_pool dr ON dr.hunt_id = h.hunt_id
-            AND dr.pool_id = (SELECT pool_id FROM pools WHERE state_id = st.state_id AND pool_code = %s)
+        LEFT JOIN hunt_latest hl ON hl.hunt_id = r.hunt_id
+        LEFT JOIN point_forecasts pf ON pf.hunt_id = r.hunt_id AND pf.pool_id = r.pool_id
+        WHERE st.state_code = %s AND sp.species_code = %s AND p.pool_code = %s
+          AND NOT r.is_youth AND NOT r.is_mobility
     """
-    params = [pool_code]
+    params = [state_code, species_code, pool_code]
 
     if draw_year:
-        sql += " AND dr.draw_year = %s"
+        sql += " AND r.draw_year = %s"
         params.append(draw_year)
     else:
-        sql += " AND dr.draw_year = (SELECT MAX(draw_year) FROM draw_results_by_pool WHERE hunt_id = h.hunt_id)"
-
-    sql += """
-        LEFT JOIN LATERAL (
-            SELECT hs1.success_rate, hs1.harvest_year
-            FROM harvest_stats hs1
-            WHERE hs1.hunt_id = h.hunt_id AND hs1.access_type = 'Public'
-            ORDER BY hs1.harvest_year DESC LIMIT 1
-        ) hs ON true
-        LEFT JOIN LATERAL (
-            SELECT hd1.hunt_name
-            FROM hunt_dates hd1
-            WHERE hd1.hunt_id = h.hunt_id
-            ORDER BY hd1.season_year DESC LIMIT 1
-        ) hd ON true
-        WHERE st.state_code = %s AND sp.species_code = %s AND h.is_active = 1
-    """
-    params.extend([state_code, species_code])
+        sql += " AND r.is_latest"
 
     if gmu_code:
         sql += """
-            AND h.hunt_id IN (
+            AND r.hunt_id IN (
                 SELECT hg.hunt_id FROM hunt_gmus hg
                 JOIN gmus g ON g.gmu_id = hg.gmu_id
-                WHERE g.state_id = st.state_id AND g.gmu_code = %s
+                WHERE g.state_id = r.state_id AND g.gmu_code = %s
             )
         """
         params.append(gmu_code)
 
-    # Exclude youth and mobility impaired
-    sql += """
-        AND (h.unit_description IS NULL
-             OR (LOWER(h.unit_description) NOT LIKE '%%youth%%'
-                 AND LOWER(h.unit_description) NOT LIKE '%%mobility%%'))
-        AND (hd.hunt_name IS NULL
-             OR (LOWER(hd.hunt_name) NOT LIKE '%%youth%%'
-                 AND LOWER(hd.hunt_name) NOT LIKE '%%mobility%%'))
-    """
+    sql += " ORDER BY r.score DESC, r.draw_odds DESC, r.hunt_code LIMIT %s"
+    params.append(RECOMMEND_TOP_K)
 
     cur.execute(sql, params)
-    rows = dict_rows(cur)
-    conn.close()
-
-    scored = []
-    for r in rows:
-        apps = r["applications"]
-        awarded = r["tags_awarded"]
-        sr = r["success_rate"]
-        if not apps or not awarded or sr is None:
-            continue
-        odds = awarded / apps
-        if odds <= 0:
-            continue
-
-        # NM scoring: score = draw_odds * 0.4 + success * 0.6
-        score = (odds * 100) * 0.4 + sr * 0.6
-        note = _classify_note(odds, r["hunt_code"])
-
-        scored.append({
-            "hunt_code": r["hunt_code"],
-            "hunt_label": r["hunt_label"],
-            "unit_description": r["unit_description"],
-            "hunt_name": r["hunt_name"],
-            "species_name": r["species_name"],
-            "bag_code": r["bag_code"],
-            "weapon_code": r["weapon_code"],
-            "draw_odds": odds,
-            "success_rate": sr,
-            "harvest_year": r["harvest_year"],
-            "score": score,
-            "note": note,
-        })
-
-    scored.sort(key=lambda x: (x["score"], x["draw_odds"]), reverse=True)
-    return jsonify({"results": scored[:10], "pool_code": pool_code})
+    results = []
+    for r in dict_rows(cur):
+        r["note"] = NOTE_TEMPLATES[r.pop("tier")][r.pop("note_variant")]
+        results.append(r)
 
-
-def _classify_note(odds, hunt_code):
-    if odds >= 0.25:
-        tier = "high"
-    elif odds >= 0.10:
-        tier = "mid"
-    else:
-        tier = "low"
-
-    idx = ord(hunt_code[-1]) % 3
-
-    templates = {
-        "high": [
-            "Textbook third choice safety hunt: very high odds without giving up much in the way of opportunity.",
-            "Great safety pick. You are playing in the high odds tier here, which is exactly what you want for a third choice.",
-            "This is the kind of hunt you park in the third slot when you actually want to go hunting instead of just buying a lottery ticket.",
-        ],
-        "mid": [
-            "Nice middle of the road odds. This is a solid second choice if your first pick is a long shot.",
-            "Good candidate for a second choice: odds are respectable and the success numbers say it is worth showing up prepared.",
-            "Balanced odds for a second tier hunt. Not a gimme, but not a moonshot either.",
-        ],
-        "low": [
-            "Classic first choice tag: low odds, but the kind of hunt you swing for when you want something special.",
-            "Treat this as a swing for the fences first choice. Odds are tight enough that it should not be sitting in your third slot.",
-            "This belongs in your dream hunt bucket. Odds are slim, which is exactly what you expect for a true first choice.",
-        ],
-    }
-    return templates[tier][idx]
+    return jsonify({"results": results, "pool_code": pool_code})
 
 
 # ─── POST /api/application_plan ───────────────────────────────────────
 @app.route("/api/application_plan", methods=["POST"])
 def api_application_plan():
+    """Draw odds for an ordered list of hunt choices.
+
+    {"state_code", "species_code", "pool_code", "choices": [hunt_code, ...]}
+
+    Takes 1 to the state's choices_per_app choices and walks them the way
+    its draw does (odds/choices.py). Each choice reports the hunt's own odds
+    (`p`) and the chance this choice is the one drawn (`p_choice`). Every
+    other ordering of the same hunts is scored too; `best_order` is the
+    first that beats the one given, if any does.
+    """
     data = request.get_json(silent=True) or {}
     state_code = data.get("state_code")
     species_code = data.get("species_code")
@@ -541,19 +932,29 @@ def api_application_plan():
 
     if not state_code or not species_code:
         return jsonify({"error": "state_code and species_code are required"}), 400
-    if len(choices) != 3:
-        return jsonify({"error": "Exactly three choices are required"}), 400
+    # A blank choice would shift the later ones up a slot
+    if not isinstance(choices, list) or not all(isinstance(c, str) and c for c in choices):
+        return jsonify({"error": "choices must be hunt codes in order, with no blanks"}), 400
 
     conn = get_db()
     cur = conn.cursor()
+    cur.execute("SELECT choices_per_app, draw_type FROM states WHERE state_code = %s",
+                (state_code,))
+    state = cur.fetchone()
+    if not state:
+        return jsonify({"error": "State not found"}), 404
+    max_choices = min(state[0] or 1, choices_engine.MAX_CHOICES)
+    walk = choices_engine.DRAW_WALKS.get(state[1], "walk")
+    if not 1 <= len(choices) <= max_choices:
+        return jsonify({"error": f"{state_code} takes 1 to {max_choices} choices"}), 400
+    if len(set(choices)) != len(choices):
+        return jsonify({"error": "Each hunt can only be chosen once"}), 400
 
-    # For NM legacy: use draw_results table with pivoted columns
-    # For normalized: use draw_results_by_pool
     placeholders = ",".join(["%s"] * len(choices))
 
     sql = f"""
         SELECT h.hunt_code, sp.common_name AS species_name,
-               dr.applications, dr.tags_awarded
+               dr.applications, dr.tags_awarded, dr.tags_available
         FROM hunts h
         JOIN states st ON st.state_id = h.state_id
         JOIN species sp ON sp.species_id = h.species_id
@@ -565,82 +966,99 @@ def api_application_plan():
     """
     cur.execute(sql, [pool_code, state_code, species_code, *choices])
     rows = dict_rows(cur)
-    conn.close()
 
     odds_map = {}
     species_name = None
     for r in rows:
         apps = r["applications"]
         awarded = r["tags_awarded"]
-        p = awarded / apps if apps and awarded else None
+        # Later-choice draws can push awarded past applications
+        p = min(awarded / apps, 1.0) if apps and awarded else None
         odds_map[r["hunt_code"]] = {
             "applications": apps,
             "tags_awarded": awarded,
             "p": p,
+            # Share of the tags still on the table once every first choice
+            # was drawn
+            "leftover": float(choices_engine.leftover_odds(r["tags_available"] or 0,
+                                                           apps or 0)),
         }
         species_name = r["species_name"]
 
+    probs = [odds_map[c]["p"] if c in odds_map else None for c in choices]
+    odds = np.array([p or 0.0 for p in probs])
+    leftover = np.array([odds_map[c]["leftover"] if c in odds_map else 0.0 for c in choices])
+    plans = choices_engine.orderings(len(choices))
+    by_choice = choices_engine.choice_odds(plans, odds, leftover, walk)
+    totals = by_choice.sum(axis=1)
+
     choice_details = []
-    probs = []
-    for idx, code in enumerate(choices, start=1):
-        rec = odds_map.get(code)
-        if not rec:
-            choice_details.append({
-                "choice_number": idx, "hunt_code": code,
-                "applications": None, "tags_awarded": None, "p": None,
-            })
-            probs.append(None)
-        else:
-            choice_details.append({
-                "choice_number": idx, "hunt_code": code,
-                "applications": rec["applications"],
-                "tags_awarded": rec["tags_awarded"],
-                "p": rec["p"],
-            })
-            probs.append(rec["p"])
-
-    p1, p2, p3 = probs
+    for idx, code in enumerate(choices):
+        rec = odds_map.get(code, {})
+        choice_details.append({
+            "choice_number": idx + 1, "hunt_code": code,
+            "applications": rec.get("applications"),
+            "tags_awarded": rec.get("tags_awarded"),
+            "p": rec.get("p"),
+            "p_choice": round(float(by_choice[0, idx]), 4) if code in odds_map else None,
+        })
+
     eps = 0.005
-    logical = (
-        p1 is not None and p2 is not None and p3 is not None
-        and p1 <= p2 + eps and p2 <= p3 + eps
-    )
+    logical = all(p is not None for p in probs) and all(
+        a <= b + eps for a, b in zip(probs, probs[1:]))
 
-    valid_probs = [p for p in probs if p is not None and p > 0]
-    application_odds = max(valid_probs) if valid_probs else None
+    application_odds = float(totals[0]) if any(p for p in probs) else None
     one_in_n = round(1.0 / application_odds) if application_odds and application_odds > 0 else None
 
-    advice = _build_advice(state_code, species_code, logical, p1, p2, p3, eps)
+    # argmax keeps the given order (row 0) on ties
+    best = int(np.argmax(totals))
+    best_order = None
+    if totals[best] > totals[0] + 1e-9:
+        best_order = {
+            "choices": [choices[i] for i in plans[best]],
+            "application_odds": float(totals[best]),
+        }
+
+    advice = _build_advice(state_code, species_code, logical, probs, eps, walk)
 
     return jsonify({
         "state_code": state_code,
         "pool_code": pool_code,
         "species_code": species_code,
         "species_name": species_name,
+        "draw_walk": walk,
         "choices": choice_details,
         "logical_order": logical,
         "application_odds": application_odds,
         "one_in_n": one_in_n,
+        "best_order": best_order,
         "advice": advice,
     })
 
 
-def _build_advice(state_code, species_code, logical, p1, p2, p3, eps):
+_ORDINALS = ["first", "second", "third", "fourth", "fifth"]
+
+
+def _build_advice(state_code, species_code, logical, probs, eps, walk):
     parts = []
     if not logical:
         parts.append(
-            "Your three hunts are not ordered from hardest to easiest to draw in your pool."
+            "Your hunts are not ordered from hardest to easiest to draw in your pool."
         )
-        if p1 is not None and p2 is not None and p1 > p2 + eps:
-            parts.append(
-                "Your first choice has better odds than your second choice, "
-                "so in practical terms you will almost never see that second choice tag."
-            )
-        if p2 is not None and p3 is not None and p2 > p3 + eps:
-            parts.append(
-                "Your second choice has better odds than your third choice, "
-                "so the third choice is not acting as a true safety hunt."
-            )
+        for i, (a, b) in enumerate(zip(probs, probs[1:])):
+            if a is None or b is None or a <= b + eps:
+                continue
+            this, nxt = _ORDINALS[i], _ORDINALS[i + 1]
+            if i + 2 == len(probs):
+                parts.append(
+                    f"Your {this} choice has better odds than your {nxt} choice, "
+                    f"so the {nxt} choice is not acting as a true safety hunt."
+                )
+            else:
+                parts.append(
+                    f"Your {this} choice has better odds than your {nxt} choice, "
+                    f"so in practical terms you will almost never see that {nxt} choice tag."
+                )
         # NM-specific advice
         if state_code == "NM":
             if species_code in ("ELK", "MDR"):
@@ -676,6 +1094,14 @@ def _build_advice(state_code, species_code, logical, p1, p2, p3, eps):
                 "the hunt with the highest odds on your list is what really sets your overall "
                 "chance of drawing something."
             )
+        elif walk == "rounds":
+            parts.append(
+                "Your application is logically ordered: toughest hunt first, easiest last."
+            )
+            parts.append(
+                "Every first choice is drawn before any second choice, so later choices only "
+                "pick up leftover tags. Your first choice sets most of your chance of drawing."
+            )
         else:
             parts.append(
                 "Your application is logically ordered: toughest hunt first, easiest last."
@@ -688,12 +1114,177 @@ def _build_advice(state_code, species_code, logical, p1, p2, p3, eps):
     return " ".join(parts) if parts else None
 
 
+# ─── POST /api/portfolio ─────────────────────────────────────────────
+@app.route("/api/portfolio", methods=["POST"])
+def api_portfolio():
+    """Which applications to send across states, and what to put on each.
+
+    {"home_state": "CO", "objective": "tags" | "harvest", "budget": 1500,
+     "weapon_codes": ["RIFLE"],
+     "applications": [{"state_code", "species_code", "points", "cost"}, ...]}
+
+    Each application entry is a state and species the hunter could apply
+    for, their point balance there and what applying costs them (fees
+    differ by residency and year and are not loaded, so the caller sends
+    them); AZ entries may add "loyalty" and "hunter_ed" flags. Odds are the
+    same per-point odds /api/my_odds reads, in the resident pool for
+    home_state and the nonresident pool elsewhere.
+    Harvest weights each tag by the hunt's success rate. Each application's
+    choices and the set sent within budget are both searched exactly
+    (odds/portfolio.py).
+    """
+    data = request.get_json(silent=True) or {}
+    home_state = data.get("home_state") or ""
+    objective = data.get("objective", "tags")
+    budget = data.get("budget")
+    weapon_codes = data.get("weapon_codes") or None
+    apps = data.get("applications") or []
+
+    if not isinstance(home_state, str):
+        return jsonify({"error": "home_state must be a state code"}), 400
+    home_state = home_state.strip().upper() or None
+    if objective not in ("tags", "harvest"):
+        return jsonify({"error": "objective must be 'tags' or 'harvest'"}), 400
+    if weapon_codes is not None and not (
+            isinstance(weapon_codes, list) and all(isinstance(w, str) for w in weapon_codes)):
+        return jsonify({"error": "weapon_codes must be a list of weapon codes"}), 400
+    if not isinstance(apps, list) or not apps or len(apps) > PORTFOLIO_MAX_APPLICATIONS:
+        return jsonify({"error": f"applications takes 1 to {PORTFOLIO_MAX_APPLICATIONS} entries"}), 400
+    # JSON true/false arrive as bools, which isinstance counts as ints
+    if budget is not None and not (isinstance(budget, (int, float)) and not isinstance(budget, bool)
+                                   and 0 <= budget <= PORTFOLIO_MAX_BUDGET):
+        return jsonify({"error": f"budget must be between 0 and {PORTFOLIO_MAX_BUDGET}"}), 400
+
+    keys, points, costs = [], [], []
+    for a in apps:
+        if not (isinstance(a, dict) and isinstance(a.get("state_code"), str)
+                and isinstance(a.get("species_code"), str)):
+            return jsonify({"error": "Each application needs state_code and species_code"}), 400
+        key = (a["state_code"].strip().upper(), a["species_code"])
+        pts, cost = a.get("points", 0), a.get("cost")
+        if not key[0] or not key[1]:
+            return jsonify({"error": "Each application needs state_code and species_code"}), 400
+        if key in keys:
+            return jsonify({"error": f"{key[0]} {key[1]} is listed twice"}), 400
+        if isinstance(pts, int) and not isinstance(pts, bool) and key[0] in passes.STATES:
+            pts = passes.effective_points(pts, a.get("loyalty"), a.get("hunter_ed"))
+        if not isinstance(pts, int) or isinstance(pts, bool) or not 0 <= pts <= curves.MAX_POINTS:
+            return jsonify({"error": f"points must be between 0 and {curves.MAX_POINTS}"}), 400
+        if not isinstance(cost, (int, float)) or isinstance(cost, bool) or cost < 0:
+            return jsonify({"error": "Each application needs a cost of 0 or more"}), 400
+        keys.append(key)
+        points.append(pts)
+        costs.append(cost)
+
+    cur = get_db().cursor()
+    cur.execute("""
+        SELECT state_code, choices_per_app, draw_type FROM states
+        WHERE state_code = ANY(%s)
+    """, (list({k[0] for k in keys}),))
+    states = {r[0]: (min(r[1] or 1, choices_engine.MAX_CHOICES),
+                     choices_engine.DRAW_WALKS.get(r[2], "walk")) for r in cur.fetchall()}
+
+    # Every candidate hunt of every application in one read; youth and
+    # mobility hunts are left out as in /api/recommend
+    cur.execute("""
+        WITH req (app, state_code, species_code, points) AS (
+            SELECT * FROM unnest(%s::int[], %s::text[], %s::text[], %s::int[])
+        )
+        SELECT req.app, h.hunt_code,
+               COALESCE(h.hunt_code_display, h.hunt_code) AS hunt_label,
+               h.unit_description, wt.weapon_code,
+               CASE WHEN po.hunt_id IS NOT NULL
+                        THEN po.odds[LEAST(req.points, array_length(po.odds, 1) - 1) + 1]
+                    ELSE LEAST(CAST(COALESCE(hd.tags_awarded, 0) AS REAL) / hd.applications, 1)
+               END AS odds,
+               hd.tags_available, hd.applications,
+               hl.success_rate
+        FROM req
+        JOIN states st ON st.state_code = req.state_code
+        JOIN species sp ON sp.species_code = req.species_code
+        JOIN hunts h ON h.state_id = st.state_id AND h.species_id = sp.species_id
+            AND h.is_active = 1
+        JOIN pools p ON p.state_id = st.state_id
+            AND p.pool_code = CASE WHEN st.state_code = %s THEN 'RES' ELSE 'NR' END
+        JOIN hunt_latest_draw hd ON hd.hunt_id = h.hunt_id AND hd.pool_id = p.pool_id
+        LEFT JOIN point_odds po ON po.hunt_id = h.hunt_id AND po.pool_id = p.pool_id
+        LEFT JOIN hunt_latest hl ON hl.hunt_id = h.hunt_id
+        LEFT JOIN weapon_types wt ON wt.weapon_type_id = h.weapon_type_id
+        WHERE hd.applications > 0
+          AND (%s::text[] IS NULL OR wt.weapon_code = ANY(%s::text[]))
+          AND NOT LOWER(COALESCE(h.unit_description, '') || ' ' || COALESCE(hl.hunt_name, ''))
+                  ~ '(youth|mobility)'
+    """, (list(range(len(keys))), [k[0] for k in keys], [k[1] for k in keys], points,
+          home_state, weapon_codes, weapon_codes))
+    hunts = [[] for _ in keys]
+    for r in dict_rows(cur):
+        hunts[r.pop("app")].append(r)
+
+    plans, values = [], []
+    for (state_code, _), rows in zip(keys, hunts):
+        max_choices, walk = states.get(state_code, (1, "walk"))
+        odds = np.array([float(r["odds"] or 0) for r in rows])
+        leftover = choices_engine.leftover_odds([r["tags_available"] or 0 for r in rows],
+                                                [r["applications"] for r in rows])
+        if objective == "harvest":
+            worth = np.array([(r["success_rate"] or 0) / 100.0 for r in rows])
+        else:
+            worth = np.ones(len(rows))
+        plan, value = portfolio.best_plan(odds, leftover, worth, max_choices, walk)
+        by_choice = choices_engine.choice_odds(np.array([plan], dtype=int).reshape(1, -1),
+                                               odds, leftover, walk)[0]
+        plans.append({
+            "draw_walk": walk,
+            "candidates": len(rows),
+            "choices": [{
+                "choice_number": n + 1,
+                "hunt_code": rows[i]["hunt_code"],
+                "hunt_label": rows[i]["hunt_label"],
+                "unit_description": rows[i]["unit_description"],
+                "weapon_code": rows[i]["weapon_code"],
+                "p": round(float(odds[i]), 4),
+                "p_choice": round(float(by_choice[n]), 4),
+                "success_rate": rows[i]["success_rate"],
+            } for n, i in enumerate(plan)],
+            "application_odds": round(float(by_choice.sum()), 4),
+            "expected_value": round(value, 4),
+        })
+        values.append(value)
+
+    picked, total = portfolio.knapsack(costs, values, budget)
+    picked = set(picked)
+    applications = []
+    for i, ((state_code, species_code), plan) in enumerate(zip(keys, plans)):
+        applications.append({
+            "state_code": state_code,
+            "species_code": species_code,
+            "points": points[i],
+            "cost": costs[i],
+            "apply": i in picked,
+            **plan,
+        })
+
+    return jsonify({
+        "home_state": home_state,
+        "objective": objective,
+        "budget": budget,
+        "total_cost": sum(costs[i] for i in picked),
+        "expected_value": round(total, 4),
+        "applications": applications,
+    })
+
+
 # ─── GET /api/bag_limits ──────────────────────────────────────────────
 @app.route("/api/bag_limits")
 def api_bag_limits():
-    state_code = request.args.get("state_code")
-    conn = get_db()
-    cur = conn.cursor()
+    state_code = _state_code_arg()
+    rows = cache.get_or_load(("bag_limits", state_code),
+                             lambda: _query_bag_limits(state_code), get_db)
+    return jsonify({"bag_limits": rows})
+
+
+def _query_bag_limits(state_code):
+    cur = get_db().cursor()
 
     if state_code:
         cur.execute("""
@@ -706,103 +1297,7 @@ def api_bag_limits():
         """, (state_code,))
     else:
         cur.execute("SELECT bag_code, label, plain_definition FROM bag_limits ORDER BY bag_code")
-
-    rows = dict_rows(cur)
-    conn.close()
-    return jsonify({"bag_limits": rows})
-
-
-def _compute_season_labels_nm():
-    """Compute season_label for NM hunts based on weapon, bag, and date data."""
-    from collections import defaultdict
-    try:
-        conn = get_db()
-        cur = conn.cursor()
-
-        cur.execute("""
-            SELECT h.hunt_id, h.hunt_code, wt.weapon_code, bl.bag_code,
-                   bl.label AS bag_label, hd.start_date, hd.hunt_name,
-                   array_agg(DISTINCT g.gmu_code) AS gmu_codes
-            FROM hunts h
-            JOIN states st ON st.state_id = h.state_id
-            LEFT JOIN weapon_types wt ON wt.weapon_type_id = h.weapon_type_id
-            LEFT JOIN bag_limits bl ON bl.bag_limit_id = h.bag_limit_id
-            LEFT JOIN (
-                SELECT DISTINCT ON (hunt_id) hunt_id, start_date, hunt_name
-                FROM hunt_dates ORDER BY hunt_id, season_year DESC
-            ) hd ON hd.hunt_id = h.hunt_id
-            LEFT JOIN hunt_gmus hg ON hg.hunt_id = h.hunt_id
-            LEFT JOIN gmus g ON g.gmu_id = hg.gmu_id
-            WHERE st.state_code = 'NM' AND h.is_active = 1
-            GROUP BY h.hunt_id, h.hunt_code, wt.weapon_code, bl.bag_code,
-                     bl.label, hd.start_date, hd.hunt_name
-            ORDER BY h.hunt_code
-        """)
-        rows = dict_rows(cur)
-
-        def sex_label(bag_code, bag_label):
-            bc = (bag_code or "").upper()
-            bl_lower = (bag_label or "").lower()
-            if bc == "A" or "antlerless" in bl_lower:
-                return "Antlerless"
-            if "cow" in bl_lower:
-                return "Cow"
-            if "either sex" in bl_lower or bc == "ES":
-                return "Either Sex"
-            if "mature bull" in bl_lower or bc == "MB":
-                return "Bull"
-            if "spike" in bl_lower:
-                return "Spike"
-            if "fork" in bl_lower:
-                return "Fork Antlered"
-            if "doe" in bl_lower:
-                return "Doe"
-            if "buck" in bl_lower:
-                return "Buck"
-            if "ram" in bl_lower:
-                return "Ram"
-            if "ewe" in bl_lower:
-                return "Ewe"
-            return bag_code
-
-        weapon_map = {
-            "RIFLE": "Rifle", "ARCHERY": "Archery", "MUZZ": "Muzzleloader",
-            "ANY": "Any Weapon", "SRW": "Short-Range", "SHOTGUN": "Shotgun",
-        }
-
-        groups = defaultdict(list)
-        hunt_info = {}
-        for r in rows:
-            sex = sex_label(r["bag_code"], r["bag_label"])
-            weapon = weapon_map.get((r["weapon_code"] or "").upper(), r["weapon_code"])
-            gmus = tuple(sorted(r["gmu_codes"] or []))
-            hunt_info[r["hunt_id"]] = {"sex": sex, "weapon": weapon}
-            groups[(gmus, r["weapon_code"], sex)].append(r)
-
-        ordinals = ["First", "Second", "Third", "Fourth", "Fifth", "Sixth"]
-        for key, group_rows in groups.items():
-            group_rows.sort(key=lambda x: (str(x["start_date"] or "9999"), x["hunt_code"]))
-            for idx, r in enumerate(group_rows):
-                info = hunt_info[r["hunt_id"]]
-                parts = []
-                if len(group_rows) > 1 and idx < len(ordinals):
-                    parts.append(ordinals[idx])
-                if info["weapon"]:
-                    parts.append(info["weapon"])
-                if info["sex"]:
-                    parts.append(info["sex"])
-                label = " ".join(parts) if parts else None
-                cur.execute("UPDATE hunts SET season_label = %s WHERE hunt_id = %s",
-                            (label, r["hunt_id"]))
-
-        conn.commit()
-        conn.close()
-    except Exception:
-        import traceback
-        traceback.print_exc()
-
-
-_compute_season_labels_nm()
+    return dict_rows(cur)
 
 
 if __name__ == "__main__":
@@ -100,7 +100,7 @@ INSERT INTO states (
 ) VALUES
 
 ('NM', 'New Mexico', 'lottery', NULL, 'Pure random draw. No points system. Three pools: resident, nonresident, outfitter.',
- 1, 0, 0, 0, NULL,
+ 3, 0, 0, 0, NULL,
  'Unit', '6% NR + 10% outfitter of total tags per hunt', NULL, 'Physical presence with intent to remain',
  0, 0, 0,
  'March', 'April', 'Existing app. Points system not applicable.'),
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Throughput of the shared Monte Carlo service (app/odds/montecarlo.py), in
+simulated draws per second per core. A simulated draw is one hunt's whole
+draw played out once. No database needed; demand is synthetic and seeded:
+
+    python scripts/bench_montecarlo.py [--hunts 400] [--trials 4000] [--workers 1 4 8]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+from odds import bonus, montecarlo  # noqa: E402
+
+
+def synthetic_demand(hunts, levels, seed=0):
+    """Small weighted pools like UT's bonus half: (applicants, weights, tags)."""
+    rng = np.random.default_rng(seed)
+    apps = rng.integers(0, 25, (hunts, levels)) * (rng.random((hunts, levels)) > 0.5)
+    apps[:, 0] += 1
+    tags = np.minimum(rng.integers(1, 15, hunts), apps.sum(axis=1) - 1).clip(1)
+    weights = np.broadcast_to(bonus.entries(np.arange(levels), "squared_plus_one"), apps.shape)
+    return apps.astype(float), weights, tags
+
+
+def run(apps, weights, tags, trials, workers):
+    """(seconds, result) for a fixed number of trials; tol=0 never stops early."""
+    montecarlo._cache.clear()
+    start = time.perf_counter()
+    odds = montecarlo.estimate(bonus._weighted_draw_trials, (apps, weights, tags),
+                               tol=0.0, max_trials=trials, workers=workers)
+    return time.perf_counter() - start, odds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--hunts", type=int, default=400)
+    parser.add_argument("--levels", type=int, default=25)
+    parser.add_argument("--trials", type=int, default=4000)
+    parser.add_argument("--workers", type=int, nargs="+",
+                        default=sorted({1, montecarlo.WORKERS}))
+    args = parser.parse_args()
+
+    apps, weights, tags = synthetic_demand(args.hunts, args.levels)
+    draws = args.hunts * args.trials
+    print(f"{args.hunts} hunts x {args.levels} levels x {args.trials} trials "
+          f"({draws:,} simulated draws)")
+
+    # Warm the worker pool so process start-up is not timed
+    if max(args.workers) > 1:
+        montecarlo.WORKERS = max(args.workers)
+        run(apps, weights, tags, montecarlo.BATCH_TRIALS * montecarlo.WAVE_BATCHES,
+            max(args.workers))
+
+    baseline = None
+    print(f"{'workers':>8} {'seconds':>9} {'draws/s':>12} {'draws/s/core':>13}  same result")
+    for workers in args.workers:
+        montecarlo.WORKERS = workers
+        seconds, odds = run(apps, weights, tags, args.trials, workers)
+        if baseline is None:
+            baseline = odds
+        print(f"{workers:>8} {seconds:>9.2f} {draws / seconds:>12,.0f} "
+              f"{draws / seconds / workers:>13,.0f}  {np.array_equal(odds, baseline)}")
+    montecarlo.shutdown()
+
+
+if __name__ == '__main__':
+    main()
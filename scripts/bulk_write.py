@@ -0,0 +1,174 @@
+"""
+Set-based writes for the loaders.
+
+A loader collects its rows in Python, then writes them in one call instead
+of one INSERT per row:
+
+    counts = bulk_write.merge(cur, 'harvest_stats', HARVEST_KEY, columns, rows)
+    print(f"  harvest_stats: {counts}")
+
+merge() streams the rows with COPY into a temporary staging table shaped like
+the target. A single INSERT ... ON CONFLICT on the target's UNIQUE key then
+merges them. A conflicting row is rewritten only if a value would actually
+change, so the counts come out as fix_harvest_2024.py reports them:
+inserted (new), updated (changed), unchanged (already correct).
+
+Within one batch a key's last row wins, as it did with one upsert per row.
+With update=() nothing is ever overwritten (ON CONFLICT DO NOTHING) and the
+first row wins. exprs= replaces the plain EXCLUDED.column assignment for
+columns that merge with the stored value:
+
+    exprs={'min_pts_drawn': 'COALESCE(EXCLUDED.min_pts_drawn, '
+                            'draw_results_by_pool.min_pts_drawn)'}
+
+update_rows() is the UPDATE-only counterpart, for rows that must already
+exist.
+"""
+
+from collections import namedtuple
+
+from loader_utils import timed
+
+# UNIQUE keys of the tables the loaders write
+DRAW_POOL_KEY = ('hunt_id', 'draw_year', 'pool_id')
+HARVEST_KEY = ('hunt_id', 'harvest_year', 'access_type')
+HUNT_DATES_KEY = ('hunt_id', 'season_year')
+POINTS_KEY = ('hunt_id', 'draw_year', 'pool_id', 'points')
+PASS_KEY = ('hunt_id', 'draw_year', 'pool_id', 'draw_pass')
+
+
+class Counts(namedtuple('Counts', 'inserted updated unchanged')):
+    __slots__ = ()
+
+    def __str__(self):
+        return (f"{self.inserted} inserted, {self.updated} updated, "
+                f"{self.unchanged} unchanged")
+
+
+def _copy_value(value):
+    """One field of COPY's text format."""
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    text = value.isoformat() if hasattr(value, 'isoformat') else str(value)
+    return (text.replace('\\', '\\\\').replace('\t', '\\t')
+            .replace('\n', '\\n').replace('\r', '\\r'))
+
+
+class _Rows:
+    """File-like COPY source that renders rows as they are read."""
+
+    def __init__(self, rows):
+        self._lines = ('\t'.join(map(_copy_value, row)) + '\n' for row in rows)
+        self._buf = ''
+
+    def read(self, size=-1):
+        while size < 0 or len(self._buf) < size:
+            line = next(self._lines, None)
+            if line is None:
+                break
+            self._buf += line
+        if size < 0:
+            size = len(self._buf)
+        chunk, self._buf = self._buf[:size], self._buf[size:]
+        return chunk
+
+
+def _dedupe(key, columns, rows, keep='last'):
+    """rows with one row per key (the key columns present in `columns`)."""
+    idx = [columns.index(c) for c in key if c in columns]
+    kept = {}
+    for row in rows:
+        k = tuple(row[i] for i in idx)
+        if keep == 'last' or k not in kept:
+            kept[k] = row
+    return list(kept.values())
+
+
+def _stage(cur, table, columns, rows):
+    """COPY rows into a fresh staging table; returns its name."""
+    stage = f"_stage_{table}"
+    cols = ', '.join(columns)
+    cur.execute(f"DROP TABLE IF EXISTS {stage}")
+    # Same column types as the target; _row keeps the batch's order
+    cur.execute(f"CREATE TEMP TABLE {stage} AS SELECT {cols} FROM {table} WITH NO DATA")
+    cur.execute(f"ALTER TABLE {stage} ADD COLUMN _row serial")
+    cur.copy_expert(f"COPY {stage} ({cols}) FROM STDIN", _Rows(rows))
+    return stage
+
+
+@timed('write')
+def merge(cur, table, key, columns, rows, update=None, exprs=None):
+    """Upsert rows (tuples in `columns` order) into table on its UNIQUE key.
+
+    update: columns to overwrite on conflict (default every non-key column;
+            () inserts new keys only)
+    exprs:  {column: SQL} replacing EXCLUDED.column for those columns
+
+    Runs in the caller's transaction. Returns Counts.
+    """
+    columns = list(columns)
+    if update is None:
+        update = [c for c in columns if c not in key]
+    rows = _dedupe(key, columns, rows, keep='last' if update else 'first')
+    if not rows:
+        return Counts(0, 0, 0)
+
+    stage = _stage(cur, table, columns, rows)
+    sets = {c: (exprs or {}).get(c, f"EXCLUDED.{c}") for c in update}
+    if sets:
+        conflict = (
+            "DO UPDATE SET " + ", ".join(f"{c} = {e}" for c, e in sets.items())
+            + f" WHERE ({', '.join(f'{table}.{c}' for c in sets)})"
+            + f" IS DISTINCT FROM ({', '.join(sets.values())})")
+    else:
+        conflict = "DO NOTHING"
+    cols = ', '.join(columns)
+    cur.execute(f"""
+        WITH merged AS (
+            INSERT INTO {table} ({cols})
+            SELECT {cols} FROM {stage} ORDER BY _row
+            ON CONFLICT ({', '.join(key)}) {conflict}
+            RETURNING (xmax = 0) AS inserted
+        )
+        SELECT count(*) FILTER (WHERE inserted), count(*) FILTER (WHERE NOT inserted)
+        FROM merged
+    """)
+    inserted, updated = cur.fetchone()
+    cur.execute(f"DROP TABLE {stage}")
+    return Counts(inserted, updated, len(rows) - inserted - updated)
+
+
+@timed('write')
+def update_rows(cur, table, key, columns, rows, exprs=None):
+    """UPDATE existing rows of table from rows (tuples in `columns` order,
+    key columns included). Rows with no match are skipped and not counted.
+
+    exprs: {column: SQL} as in merge(); EXCLUDED names the new row
+
+    Returns Counts (inserted is always 0).
+    """
+    columns = list(columns)
+    rows = _dedupe(key, columns, rows)
+    if not rows:
+        return Counts(0, 0, 0)
+
+    stage = _stage(cur, table, columns, rows)
+    sets = {c: (exprs or {}).get(c, f"EXCLUDED.{c}") for c in columns if c not in key}
+    match = ' AND '.join(f"{table}.{c} = EXCLUDED.{c}" for c in key)
+    cur.execute(f"""
+        WITH changed AS (
+            UPDATE {table} SET {', '.join(f'{c} = {e}' for c, e in sets.items())}
+            FROM {stage} AS EXCLUDED
+            WHERE {match}
+              AND ({', '.join(f'{table}.{c}' for c in sets)})
+                  IS DISTINCT FROM ({', '.join(sets.values())})
+            RETURNING 1
+        )
+        SELECT (SELECT count(*) FROM changed),
+               (SELECT count(*) FROM {stage} AS EXCLUDED JOIN {table} ON {match})
+    """)
+    updated, matched = cur.fetchone()
+    cur.execute(f"DROP TABLE {stage}")
+    return Counts(0, updated, matched - updated)
@@ -1,13 +1,14 @@
 #!/usr/bin/env python3
 """Parse UT big game PDF proclamation and load hunt dates into the database."""
 
+import os
 import re
-import pdfplumber
-import psycopg2
 from datetime import date
 
-PDF_PATH = "/Users/openclaw/Documents/GraysonsDrawOdds/UT/proclamations/2026/UT_big_game_app_guidebook_2026.pdf"
-DB_PARAMS = dict(host="localhost", port=5432, dbname="draws", user="draws", password="drawspass")
+from loader_utils import BASE_DIR, connect, finish_load
+import pdf_cache
+
+PDF_PATH = os.path.join(BASE_DIR, "UT/proclamations/2026/UT_big_game_app_guidebook_2026.pdf")
 SEASON_YEAR = 2026
 
 HUNT_CODE_RE = re.compile(r'^[DEPMGRSBC][A-Z]\d{4}$')
@@ -66,7 +67,7 @@ def extract_hunt_dates_from_pdf(pdf_path):
     """Extract all (hunt_code, start_date, end_date) tuples from the PDF."""
     results = []
 
-    with pdfplumber.open(pdf_path) as pdf:
+    with pdf_cache.open(pdf_path) as pdf:
         for page in pdf.pages:
             tables = page.extract_tables()
             if not tables:
@@ -106,6 +107,9 @@ def extract_hunt_dates_from_pdf(pdf_path):
 
 
 def main():
+    if not os.path.exists(PDF_PATH):
+        print(f"  SKIP (missing): {os.path.relpath(PDF_PATH, BASE_DIR)}")
+        return
     print(f"Parsing PDF: {PDF_PATH}")
     hunt_dates = extract_hunt_dates_from_pdf(PDF_PATH)
 
@@ -117,7 +121,7 @@ def main():
     unique_codes = set(seen.keys())
     print(f"Total hunt codes found in PDF: {len(unique_codes)}")
 
-    conn = psycopg2.connect(**DB_PARAMS)
+    conn = connect()
     cur = conn.cursor()
 
     # Look up hunt_ids for all codes
@@ -150,6 +154,7 @@ def main():
 
     conn.commit()
     cur.close()
+    finish_load(conn)
     conn.close()
 
     print(f"Total matched to DB: {matched}")
@@ -1,34 +1,124 @@
 #!/usr/bin/env python3
 """
-Master loader: runs OR, NV, ID loaders in sequence, then verifies.
+Master loader: runs every state's loaders, states in parallel, then verifies.
+
+    python scripts/load_all.py                  # every state in LOADERS
+    python scripts/load_all.py AZ WY            # just these
+    python scripts/load_all.py --workers 2 --full
+
+LOADERS maps each state to its loader modules (scripts/load_*.py, each with a
+main()), run in that order. States share no rows, so they load side by side
+in a pool of --workers processes (default DRAWS_LOAD_WORKERS, else every
+core). Within a worker every loader of the state shares one connection
+(loader_utils.connect), and the state commits once its last loader is done;
+a state that fails rolls back on its own while the others carry on. The
+precompute stage and the data_version bump, which each loader run by hand
+does itself, run once at the end.
+
+Only load_az, load_co, load_ut and load_wy load incrementally (manifest.py):
+they stop early when their state's raw files are unchanged, skip the
+unchanged files whose rows stand alone, and retract the rows a removed or
+modified file no longer produces. The others rerun in full every time: CA and
+MT (load_mt) first delete the state's rows and rebuild them, while ID, NM,
+NV, OR, fix_ut_dates and load_wy_demand_reports only upsert, so a row whose
+source is gone stays until removed by hand. --full reruns the four
+incremental loaders even when nothing changed.
+
+A state's output is printed as one block when it finishes, followed by a
+timing report: seconds per loader and per stage (parse, write, commit) for
+each state, the precompute, and the wall time against the states' total.
 """
 
-import subprocess
-import sys
+import argparse
+import importlib
+import io
+import multiprocessing
 import os
-import psycopg2
-
-SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
-DB_CONFIG = {
-    'host': 'localhost', 'port': 5432,
-    'dbname': 'draws', 'user': 'draws', 'password': 'drawspass'
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import redirect_stderr, redirect_stdout
+
+import loader_utils
+from loader_utils import connect, finish_load, timed
+
+# State -> loader modules, in run order. WA has no loader yet.
+LOADERS = {
+    'AZ': ['load_az'],
+    'CA': ['load_ca'],
+    'CO': ['load_co'],
+    'ID': ['load_id'],
+    'MT': ['load_mt', 'load_mt_draw_stats', 'load_mt_by_points'],
+    'NM': ['load_nm'],
+    'NV': ['load_nv'],
+    'OR': ['load_or'],
+    'UT': ['load_ut', 'fix_ut_dates'],
+    'WY': ['load_wy', 'load_wy_demand_reports'],
 }
 
-
-def run_loader(script_name):
-    path = os.path.join(SCRIPTS_DIR, script_name)
+WORKERS = int(os.environ.get('DRAWS_LOAD_WORKERS', '0')) or os.cpu_count() or 1
+
+# Stages timed inside the loaders (loader_utils.timed), shown under them
+SUB_STAGES = ('parse', 'write')
+
+
+def load_state(state_code):
+    """Run one state's loaders in this worker as a single transaction.
+
+    Returns (state_code, ok, output, timings), timings being (stage, seconds)
+    pairs: one per loader that ran, then parse, write and commit.
+    """
+    loader_utils.STAGE_SECONDS.clear()
+    timings = []
+    out = io.StringIO()
+    ok = False
+    with redirect_stdout(out), redirect_stderr(out):
+        try:
+            loader_utils.begin_state()
+            for name in LOADERS[state_code]:
+                start = time.perf_counter()
+                try:
+                    importlib.import_module(name).main()
+                finally:
+                    timings.append((name, time.perf_counter() - start))
+            with timed('commit'):
+                loader_utils.end_state(commit=True)
+            ok = True
+        except (Exception, SystemExit):
+            traceback.print_exc()
+            loader_utils.end_state(commit=False)
+    timings += [(stage, loader_utils.STAGE_SECONDS[stage])
+                for stage in SUB_STAGES + ('commit',) if stage in loader_utils.STAGE_SECONDS]
+    return state_code, ok, out.getvalue(), timings
+
+
+def state_seconds(timings):
+    return sum(secs for stage, secs in timings if stage not in SUB_STAGES)
+
+
+def report(states, results, precompute_secs, wall_secs, workers):
     print(f"\n{'='*60}")
-    print(f"  Running {script_name}")
+    print("  TIMINGS")
     print(f"{'='*60}")
-    result = subprocess.run([sys.executable, path], capture_output=False)
-    if result.returncode != 0:
-        print(f"  ERROR: {script_name} exited with code {result.returncode}")
-        return False
-    return True
-
-
-def verify():
-    conn = psycopg2.connect(**DB_CONFIG)
+    print(f"\n  {'State':<8} {'Stage':<28} {'Seconds':>8}")
+    print(f"  {'-'*46}")
+    for state in states:
+        ok, timings = results[state]
+        for stage, secs in timings:
+            label = f"  {stage}" if stage in SUB_STAGES else stage
+            print(f"  {state:<8} {label:<28} {secs:>8.1f}")
+        status = 'total' if ok else 'total (FAILED)'
+        print(f"  {state:<8} {status:<28} {state_seconds(timings):>8.1f}")
+    if precompute_secs is not None:
+        print(f"  {'':<8} {'precompute':<28} {precompute_secs:>8.1f}")
+    serial = sum(state_seconds(results[s][1]) for s in states) + (precompute_secs or 0)
+    print(f"\n  Wall time {wall_secs:.1f}s with {workers} workers "
+          f"({serial:.1f}s of loading in all)")
+
+
+def verify(states):
+    conn = connect()
     cur = conn.cursor()
 
     print(f"\n{'='*60}")
@@ -49,9 +139,9 @@ def verify():
         LEFT JOIN draw_results_by_pool dr ON dr.hunt_id = h.hunt_id
         LEFT JOIN harvest_stats hs ON hs.hunt_id = h.hunt_id
         LEFT JOIN hunt_dates hd ON hd.hunt_id = h.hunt_id
-        WHERE s.state_code IN ('OR', 'NV', 'ID')
+        WHERE s.state_code = ANY(%s)
         GROUP BY s.state_code ORDER BY s.state_code
-    """)
+    """, (states,))
     print(f"\n  {'State':<8} {'Hunts':<8} {'GMUs':<8} {'Draw':<8} {'Harvest':<10} {'Dates':<8}")
     print(f"  {'-'*50}")
     for row in cur.fetchall():
@@ -61,9 +151,9 @@ def verify():
     cur.execute("""
         SELECT s.state_code, h.hunt_code, COUNT(*)
         FROM hunts h JOIN states s ON s.state_id = h.state_id
-        WHERE s.state_code IN ('OR', 'NV', 'ID')
+        WHERE s.state_code = ANY(%s)
         GROUP BY s.state_code, h.hunt_code HAVING COUNT(*) > 1
-    """)
+    """, (states,))
     dupes = cur.fetchall()
     if dupes:
         print(f"\n  WARNING: Duplicate hunt codes found:")
@@ -76,20 +166,61 @@ def verify():
 
 
 def main():
-    ok = True
-    for script in ['load_or.py', 'load_nv.py', 'load_id.py']:
-        if not run_loader(script):
-            ok = False
-            print(f"\n  Stopping due to error in {script}")
-            break
-
-    verify()
-
-    if ok:
-        print("\nAll loaders completed successfully.")
-    else:
-        print("\nSome loaders failed. Check output above.")
+    parser = argparse.ArgumentParser(description="Load the states' draw data in parallel.")
+    parser.add_argument('states', nargs='*', metavar='STATE',
+                        help='state codes to load (default: every state in LOADERS)')
+    parser.add_argument('--workers', type=int, default=WORKERS,
+                        help=f'states loaded at once (default {WORKERS})')
+    parser.add_argument('--full', action='store_true',
+                        help='rerun the incremental loaders (AZ, CO, UT, WY) even when '
+                             'their raw files are unchanged')
+    args = parser.parse_args()
+
+    states = [s.upper() for s in args.states] or list(LOADERS)
+    unknown = [s for s in states if s not in LOADERS]
+    if unknown:
+        parser.error(f"no loaders registered for {', '.join(unknown)}")
+    workers = max(1, min(args.workers, len(states)))
+
+    # The workers inherit these: states run in parallel, so each one parses
+    # its PDFs serially unless DRAWS_PARSE_WORKERS says otherwise
+    if args.full:
+        os.environ['DRAWS_FULL_LOAD'] = '1'
+    os.environ.setdefault('DRAWS_PARSE_WORKERS', '1')
+
+    start = time.perf_counter()
+    print(f"Loading {', '.join(states)} with {workers} workers")
+    results = {}
+    ctx = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+        futures = [pool.submit(load_state, state) for state in states]
+        for future in as_completed(futures):
+            state, ok, output, timings = future.result()
+            results[state] = (ok, timings)
+            print(f"\n{'='*60}")
+            print(f"  {state}: {'done' if ok else 'FAILED'} in {state_seconds(timings):.1f}s")
+            print(f"{'='*60}")
+            print(output, end='')
+            sys.stdout.flush()
+
+    failed = [s for s in states if not results[s][0]]
+    precompute_secs = None
+    if len(failed) < len(states):
+        print(f"\n{'='*60}")
+        print("  PRECOMPUTE")
+        print(f"{'='*60}")
+        conn = connect()
+        finish_load(conn)
+        conn.close()
+        precompute_secs = loader_utils.STAGE_SECONDS['precompute']
+
+    report(states, results, precompute_secs, time.perf_counter() - start, workers)
+    verify(states)
+
+    if failed:
+        print(f"\nLoaders failed for {', '.join(failed)} (rolled back). Check output above.")
         sys.exit(1)
+    print("\nAll loaders completed successfully.")
 
 
 if __name__ == '__main__':
@@ -3,7 +3,8 @@
 Arizona data loader: hunts, GMUs, draw results, harvest stats, hunt dates.
 
 Sources:
-  - 2024/2025 Elk/Pronghorn and Fall draw reports (Bonus, 1-2, 3-4-5 passes)
+  - 2024/2025 Elk/Pronghorn and Fall draw reports (Bonus, 1-2, 3-4-5 passes),
+    kept pass by pass in draw_results_by_pass
   - 2024/2025 Bonus Point Reports
   - 2024/2025 Elk and Deer Harvest Summaries
   - AZ/proclamations/2026/AZ_hunt_dates_2026.csv
@@ -12,15 +13,15 @@ Sources:
 import os
 import re
 import csv
-import pdfplumber
 import psycopg2
+import psycopg2.extras
 from collections import defaultdict
 
-BASE_DIR = "/Users/openclaw/Documents/GraysonsDrawOdds"
-DB_CONFIG = {
-    'host': 'localhost', 'port': 5432,
-    'dbname': 'draws', 'user': 'draws', 'password': 'drawspass'
-}
+from loader_utils import BASE_DIR, connect, ensure_pools, finish_load, upsert_points
+import bulk_write
+import manifest
+import parse_pool
+import pdf_cache
 
 
 def parse_az_draw_report(filepath):
@@ -30,7 +31,7 @@ def parse_az_draw_report(filepath):
     hunts = {}
     current_hunt = None
 
-    with pdfplumber.open(filepath) as pdf:
+    with pdf_cache.open(filepath) as pdf:
         for page in pdf.pages:
             text = page.extract_text()
             if not text:
@@ -98,13 +99,82 @@ def parse_az_draw_report(filepath):
     return hunts
 
 
+# Draw report columns by pass, left to right after the row label. The
+# reports leave zero cells blank, so values are placed by their x position.
+# second_first (between 2nd choices drawn and permits issued) is not stored.
+PASS_COLUMNS = {
+    'bonus': ['authorized', 'available', 'choice_apps', 'other_apps', 'all_apps',
+              'first_drawn', 'second_drawn', 'second_first', 'issued', 'grand_total',
+              'unissued'],
+    '1-2':   ['authorized', 'available', 'choice_apps', 'other_apps', 'all_apps',
+              'first_drawn', 'second_drawn', 'second_first', 'issued', 'grand_total',
+              'unissued'],
+    '3-4-5': ['authorized', 'available', 'choice_apps', 'other_apps', 'all_apps',
+              'issued', 'grand_total', 'unissued'],
+}
+PASS_POOLS = {'Res': 'RES', 'NonRes': 'NR'}
+
+
+def parse_az_pass_report(filepath, draw_pass):
+    """Parse one pass of an AZ draw report (Bonus, 1-2 or 3-4-5 Pass).
+
+    Returns dict: hunt_code -> {pool_code: {column: value}} with the columns
+    in PASS_COLUMNS[draw_pass]. choice_apps is 1st choice applicants (3rd
+    choice in the 3-4-5 Pass), first_drawn 1st choices drawn (None in the
+    3-4-5 Pass), issued the permits issued in this pass. available is the
+    pool's row, so NR shows its cap where the report gives one.
+    """
+    columns = PASS_COLUMNS[draw_pass]
+    rows = []           # (hunt_code, label, words)
+    current_hunt = None
+
+    with pdf_cache.open(filepath) as pdf:
+        for page in pdf.pages:
+            lines = defaultdict(list)
+            for w in page.extract_words():
+                lines[round(w['top'])].append(w)
+            for top in sorted(lines):
+                words = sorted(lines[top], key=lambda w: w['x0'])
+                label = words[0]['text']
+                if label.isdigit() and len(label) == 4 and len(words) <= 4:
+                    current_hunt = label
+                elif current_hunt is not None and label in ('All', 'Res', 'NonRes'):
+                    rows.append((current_hunt, label, words[1:]))
+
+    # Right edges of the numeric columns, from a complete All row (the only
+    # row that can fill every column)
+    anchors = next(([w['x1'] for w in words] for _, label, words in rows
+                    if label == 'All' and len(words) == len(columns)), None)
+    if anchors is None:
+        return {}
+
+    hunts = defaultdict(dict)
+    for hunt_code, label, words in rows:
+        if label == 'All':
+            continue
+        row = dict.fromkeys(columns, 0)
+        for w in words:
+            col = min(range(len(anchors)), key=lambda i: abs(anchors[i] - w['x1']))
+            try:
+                row[columns[col]] = int(w['text'].replace(',', ''))
+            except ValueError:
+                pass
+        if draw_pass == '3-4-5':
+            row['first_drawn'] = None
+        hunts[hunt_code][PASS_POOLS[label]] = row
+
+    return dict(hunts)
+
+
 def parse_az_bonus_point_report(filepath):
     """Parse AZ bonus point report for min_pts_drawn per hunt.
-    Returns dict: hunt_code -> {min_pts_drawn, max_pts_held}.
+    Returns dict: hunt_code -> {min_pts_drawn, max_pts_held, levels}.
+    levels: points -> (res_apps_1st, nr_apps_1st, res_issued, nr_issued),
+    issued = permits issued through the Bonus + 1-2 Pass.
     """
-    hunt_pts = defaultdict(lambda: {'min_pts_drawn': None, 'max_pts_held': 0})
+    hunt_pts = defaultdict(lambda: {'min_pts_drawn': None, 'max_pts_held': 0, 'levels': {}})
 
-    with pdfplumber.open(filepath) as pdf:
+    with pdf_cache.open(filepath) as pdf:
         for page in pdf.pages:
             text = page.extract_text()
             if not text:
@@ -139,6 +209,9 @@ def parse_az_bonus_point_report(filepath):
                     # The last group of 3 numbers = "Permits Issued Bonus + 1-2 Pass" Total, Res, NonRes
                     # Check if total permits issued (at any pass) > 0
                     nums = [int(p) for p in parts[2:] if p.isdigit()]
+                    # First 3 are 1st choice applicants (total, res, nr)
+                    if len(nums) == 15:
+                        hunt_pts[hunt_code]['levels'][pts] = (nums[1], nums[2], nums[-2], nums[-1])
                     # Last 3 are bonus+1-2 pass issued (total, res, nr)
                     if len(nums) >= 6:
                         issued_total = nums[-3]  # Total issued at bonus+1-2 pass
@@ -156,7 +229,7 @@ def parse_az_harvest_summary(filepath, species):
     Returns list of dicts with hunt_code, hunters, total_harvest, success_rate, days.
     """
     rows = []
-    with pdfplumber.open(filepath) as pdf:
+    with pdf_cache.open(filepath) as pdf:
         for page in pdf.pages:
             text = page.extract_text()
             if not text:
@@ -268,7 +341,12 @@ def infer_az_weapon(hunt_code, notes=''):
 
 
 def main():
-    conn = psycopg2.connect(**DB_CONFIG)
+    conn = connect()
+    load = manifest.Load(conn, 'AZ', BASE_DIR, __file__)
+    if not load.changed:
+        print("AZ sources unchanged since the last load; nothing to do")
+        conn.close()
+        return
     cur = conn.cursor()
 
     cur.execute("SELECT state_id FROM states WHERE state_code='AZ'")
@@ -278,19 +356,12 @@ def main():
     species_map = {r[1]: r[0] for r in cur.fetchall()}
 
     # Create AZ pools
-    for pool_code, desc, pct, note in [
+    pool_map = ensure_pools(cur, az_id, [
         ('RES', 'Resident pool', 90.0, '~90% of tags'),
         ('NR', 'Nonresident pool', 10.0, '~10% of tags'),
-    ]:
-        cur.execute("""
-            INSERT INTO pools (state_id, pool_code, description, allocation_pct, allocation_note)
-            VALUES (%s, %s, %s, %s, %s)
-            ON CONFLICT (state_id, pool_code) DO NOTHING
-        """, (az_id, pool_code, desc, pct, note))
+    ])
     conn.commit()
 
-    cur.execute("SELECT pool_id, pool_code FROM pools WHERE state_id = %s", (az_id,))
-    pool_map = {r[1]: r[0] for r in cur.fetchall()}
 
     # ── Parse draw reports (use 1-2 Pass as primary for applicant counts) ────
     draw_data = {}  # hunt_code -> {authorized, res_apps, nr_apps, res_drawn, nr_drawn}
@@ -329,7 +400,9 @@ def main():
     }
 
     all_draw = {}  # (hunt_code, year) -> data
+    draw_paths = {}  # (hunt_code, year) -> report it came from
 
+    report_sources = []     # (year, filepath)
     for year, groups in draw_file_sets.items():
         for group, files in groups.items():
             for relpath in files:
@@ -337,27 +410,42 @@ def main():
                 if not os.path.exists(filepath):
                     print(f"  SKIP (missing): {relpath}")
                     continue
-                hunts = parse_az_draw_report(filepath)
-                print(f"  {os.path.basename(relpath)}: {len(hunts)} hunts parsed")
-                for hc, data in hunts.items():
-                    if data['authorized'] == 0 and data['res_apps_1st'] == 0 and data['nr_apps_1st'] == 0:
-                        continue
-                    key = (hc, year)
-                    all_draw[key] = data
+                report_sources.append((year, filepath))
+
+    parsed = parse_pool.parse_files(parse_az_draw_report, [fp for _, fp in report_sources])
+    for (year, filepath), hunts in zip(report_sources, parsed):
+        print(f"  {os.path.basename(filepath)}: {len(hunts)} hunts parsed")
+        for hc, data in hunts.items():
+            if data['authorized'] == 0 and data['res_apps_1st'] == 0 and data['nr_apps_1st'] == 0:
+                continue
+            key = (hc, year)
+            all_draw[key] = data
+            draw_paths[key] = filepath
 
     print(f"\n  Total draw data entries: {len(all_draw)}")
 
     # ── Parse bonus point reports ────────────────────────────────────────────
     bp_data = {}
+    bp_levels = {}  # (hunt_code, year) -> {points: (res_apps, nr_apps, res_issued, nr_issued)}
+    bp_paths = {}   # (hunt_code, year) -> report the levels came from
+    bp_files = []
     for fn in ['2024-Elk-Pronghorn-Bonus-Point-Report.pdf', '2025-Elk-Pronghorn-Bonus-Point-Report.pdf',
                '2024-Fall-Bonus-Point-Report.pdf', '2025-Fall-Bonus-Point-Report.pdf']:
-        filepath = os.path.join(BASE_DIR, 'AZ/raw_data', fn)
-        if not os.path.exists(filepath):
+        if not os.path.exists(os.path.join(BASE_DIR, 'AZ/raw_data', fn)):
             print(f"  SKIP (missing): {fn}")
             continue
-        pts = parse_az_bonus_point_report(filepath)
+        bp_files.append(fn)
+
+    parsed = parse_pool.parse_files(parse_az_bonus_point_report,
+                                    [os.path.join(BASE_DIR, 'AZ/raw_data', fn) for fn in bp_files])
+    for fn, pts in zip(bp_files, parsed):
         print(f"  {fn}: {len(pts)} hunts with bonus point data")
         bp_data.update(pts)
+        year = int(fn[:4])
+        for hc, bp in pts.items():
+            if bp['levels']:
+                bp_levels[(hc, year)] = bp['levels']
+                bp_paths[(hc, year)] = os.path.join(BASE_DIR, 'AZ/raw_data', fn)
 
     # ── Collect all unique hunt codes ────────────────────────────────────────
     proc_csv = os.path.join(BASE_DIR, 'AZ/proclamations/2026/AZ_hunt_dates_2026.csv')
@@ -445,7 +533,8 @@ def main():
     print(f"  Inserted {len(hunt_id_map)} hunts")
 
     # ── Insert draw results ──────────────────────────────────────────────────
-    draw_count = 0
+    draw_rows = []
+    draw_row_paths = []
     for (hcode, year), data in all_draw.items():
         if hcode not in hunt_id_map:
             continue
@@ -457,43 +546,105 @@ def main():
 
         # Resident pool
         if data['res_apps_1st'] > 0 or data['res_drawn'] > 0:
-            cur.execute("""
-                INSERT INTO draw_results_by_pool
-                    (hunt_id, draw_year, pool_id, applications, tags_available,
-                     tags_awarded, min_pts_drawn, max_pts_held)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                ON CONFLICT (hunt_id, draw_year, pool_id) DO UPDATE SET
-                    applications = EXCLUDED.applications,
-                    tags_available = EXCLUDED.tags_available,
-                    tags_awarded = EXCLUDED.tags_awarded,
-                    min_pts_drawn = COALESCE(EXCLUDED.min_pts_drawn, draw_results_by_pool.min_pts_drawn),
-                    max_pts_held = COALESCE(EXCLUDED.max_pts_held, draw_results_by_pool.max_pts_held)
-            """, (hunt_id, year, pool_map['RES'], data['res_apps_1st'],
-                  data['authorized'], data['res_drawn'], min_pts, max_pts))
-            draw_count += 1
+            draw_rows.append((hunt_id, year, pool_map['RES'], data['res_apps_1st'],
+                              data['authorized'], data['res_drawn'], min_pts, max_pts))
+            draw_row_paths.append(draw_paths[(hcode, year)])
 
         # Nonresident pool
         if data['nr_apps_1st'] > 0 or data['nr_drawn'] > 0:
-            cur.execute("""
-                INSERT INTO draw_results_by_pool
-                    (hunt_id, draw_year, pool_id, applications, tags_available,
-                     tags_awarded, min_pts_drawn, max_pts_held)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                ON CONFLICT (hunt_id, draw_year, pool_id) DO UPDATE SET
-                    applications = EXCLUDED.applications,
-                    tags_available = EXCLUDED.tags_available,
-                    tags_awarded = EXCLUDED.tags_awarded,
-                    min_pts_drawn = COALESCE(EXCLUDED.min_pts_drawn, draw_results_by_pool.min_pts_drawn),
-                    max_pts_held = COALESCE(EXCLUDED.max_pts_held, draw_results_by_pool.max_pts_held)
-            """, (hunt_id, year, pool_map['NR'], data['nr_apps_1st'],
-                  data['authorized'], data['nr_drawn'], min_pts, max_pts))
-            draw_count += 1
+            draw_rows.append((hunt_id, year, pool_map['NR'], data['nr_apps_1st'],
+                              data['authorized'], data['nr_drawn'], min_pts, max_pts))
+            draw_row_paths.append(draw_paths[(hcode, year)])
+
+    draw_columns = ('hunt_id', 'draw_year', 'pool_id', 'applications', 'tags_available',
+                    'tags_awarded', 'min_pts_drawn', 'max_pts_held')
+    draw_counts = bulk_write.merge(
+        cur, 'draw_results_by_pool', bulk_write.DRAW_POOL_KEY, draw_columns, draw_rows,
+        exprs={
+            'min_pts_drawn': 'COALESCE(EXCLUDED.min_pts_drawn, draw_results_by_pool.min_pts_drawn)',
+            'max_pts_held': 'COALESCE(EXCLUDED.max_pts_held, draw_results_by_pool.max_pts_held)',
+        })
+    load.track('draw_results_by_pool', bulk_write.DRAW_POOL_KEY, draw_columns, draw_rows,
+               draw_row_paths)
+    conn.commit()
+    print(f"  Draw result rows: {draw_counts}")
+
+    # ── Insert point-level demand (1st choice applicants per bonus point) ───
+    point_rows = []
+    point_row_paths = []
+    for (hcode, year), levels in bp_levels.items():
+        if hcode not in hunt_id_map:
+            continue
+        hunt_id = hunt_id_map[hcode]
+        for pts, (res_apps, nr_apps, res_issued, nr_issued) in levels.items():
+            for pool_code, apps, issued in [('RES', res_apps, res_issued),
+                                            ('NR', nr_apps, nr_issued)]:
+                if apps == 0 and issued == 0:
+                    continue
+                point_rows.append((hunt_id, year, pool_map[pool_code], pts, apps, issued))
+                point_row_paths.append(bp_paths[(hcode, year)])
+
+    points_count = upsert_points(cur, point_rows)
+    load.track('draw_results_by_points', bulk_write.POINTS_KEY,
+               ('hunt_id', 'draw_year', 'pool_id', 'points', 'applications', 'successes'),
+               point_rows, point_row_paths)
+    conn.commit()
+    print(f"  Inserted {points_count} point-level rows")
 
+    # ── Insert pass-level results (Bonus, 1-2 and 3-4-5 Pass) ───────────────
+    pass_files = {
+        2024: ['2024-Elk-Pronghorn-Draw-Report-{}.pdf', '2024-Fall-Draw-Report-{}.pdf'],
+        2025: ['2025-Elk-Pronghorn-Draw-Report-{}.pdf', '2025-Fall-Draw-{}.pdf'],
+    }
+    pass_names = {'bonus': 'Bonus-Pass', '1-2': '1-2-Pass', '3-4-5': '3-4-5-Pass'}
+    pass_sources = []       # (year, draw_pass, filepath)
+    for year, patterns in pass_files.items():
+        for pattern in patterns:
+            for draw_pass, name in pass_names.items():
+                fn = pattern.format(name)
+                filepath = os.path.join(BASE_DIR, 'AZ/raw_data', fn)
+                if not os.path.exists(filepath):
+                    print(f"  SKIP (missing): {fn}")
+                    continue
+                if not load.needs(filepath):
+                    print(f"  {fn}: unchanged")
+                    continue
+                pass_sources.append((year, draw_pass, filepath))
+
+    parsed = parse_pool.parse_jobs(parse_az_pass_report,
+                                   [(fp, (draw_pass,)) for _, draw_pass, fp in pass_sources])
+    pass_rows = []
+    pass_row_paths = []
+    for (year, draw_pass, filepath), report in zip(pass_sources, parsed):
+        for hcode, pools in report.items():
+            if hcode not in hunt_id_map:
+                continue
+            for pool_code, r in pools.items():
+                pass_rows.append((hunt_id_map[hcode], year, pool_map[pool_code], draw_pass,
+                                  r['available'], r['choice_apps'], r['other_apps'],
+                                  r['first_drawn'], r['issued']))
+                pass_row_paths.append(filepath)
+
+    psycopg2.extras.execute_values(cur, """
+        INSERT INTO draw_results_by_pass
+            (hunt_id, draw_year, pool_id, draw_pass, tags_available,
+             choice_applications, other_applications, first_drawn, tags_issued)
+        VALUES %s
+        ON CONFLICT (hunt_id, draw_year, pool_id, draw_pass) DO UPDATE SET
+            tags_available = EXCLUDED.tags_available,
+            choice_applications = EXCLUDED.choice_applications,
+            other_applications = EXCLUDED.other_applications,
+            first_drawn = EXCLUDED.first_drawn,
+            tags_issued = EXCLUDED.tags_issued
+    """, pass_rows, page_size=5000)
+    load.track('draw_results_by_pass', bulk_write.PASS_KEY,
+               ('hunt_id', 'draw_year', 'pool_id', 'draw_pass'), pass_rows, pass_row_paths)
     conn.commit()
-    print(f"  Inserted {draw_count} draw result rows")
+    print(f"  Inserted {len(pass_rows)} pass-level rows")
 
     # ── Load harvest data ────────────────────────────────────────────────────
-    harvest_count = 0
+    harvest_rows = []
+    harvest_row_paths = []
     harvest_sources = [
         ('AZ/raw_data/2024-AZ-Elk-Harvest-Summary.pdf', 2024, 'ELK'),
         ('AZ/raw_data/2025-AZ-Elk-Harvest-Summary.pdf', 2025, 'ELK'),
@@ -506,6 +657,9 @@ def main():
         if not os.path.exists(filepath):
             print(f"  SKIP harvest (missing): {relpath}")
             continue
+        if not load.needs(filepath):
+            print(f"  {os.path.basename(relpath)}: unchanged")
+            continue
 
         rows = parse_az_harvest_summary(filepath, sp_code)
         print(f"  {os.path.basename(relpath)}: {len(rows)} harvest rows parsed")
@@ -514,27 +668,23 @@ def main():
             if r['hunt_code'] not in hunt_id_map:
                 continue
             hunt_id = hunt_id_map[r['hunt_code']]
-            cur.execute("""
-                INSERT INTO harvest_stats
-                    (hunt_id, harvest_year, success_rate, days_hunted,
-                     licenses_sold, harvest_count)
-                VALUES (%s, %s, %s, %s, %s, %s)
-                ON CONFLICT (hunt_id, harvest_year, access_type) DO UPDATE SET
-                    success_rate = EXCLUDED.success_rate,
-                    days_hunted = EXCLUDED.days_hunted,
-                    licenses_sold = EXCLUDED.licenses_sold,
-                    harvest_count = EXCLUDED.harvest_count
-            """, (hunt_id, year, r['success_rate'], r['days_hunted'],
-                  r['hunters'], r['total_harvest']))
-            harvest_count += 1
-
+            harvest_rows.append((hunt_id, year, 'Public', r['success_rate'],
+                                 r['days_hunted'], r['hunters'], r['total_harvest']))
+            harvest_row_paths.append(filepath)
+
+    harvest_columns = ('hunt_id', 'harvest_year', 'access_type', 'success_rate',
+                       'days_hunted', 'licenses_sold', 'harvest_count')
+    harvest_counts = bulk_write.merge(
+        cur, 'harvest_stats', bulk_write.HARVEST_KEY, harvest_columns, harvest_rows)
+    load.track('harvest_stats', bulk_write.HARVEST_KEY, harvest_columns, harvest_rows,
+               harvest_row_paths)
     conn.commit()
-    print(f"  Inserted {harvest_count} harvest rows")
+    print(f"  Harvest rows: {harvest_counts}")
 
     # ── Load hunt dates ──────────────────────────────────────────────────────
-    dates_loaded = 0
+    date_rows = []
     dates_unmatched = 0
-    if os.path.exists(proc_csv):
+    if os.path.exists(proc_csv) and load.needs(proc_csv):
         with open(proc_csv) as f:
             reader = csv.DictReader(f)
             for row in reader:
@@ -546,18 +696,15 @@ def main():
                     if not start or not end:
                         continue
                     notes = row.get('notes', '').strip()
-                    cur.execute("""
-                        INSERT INTO hunt_dates (hunt_id, season_year, start_date, end_date, notes)
-                        VALUES (%s, 2026, %s, %s, %s)
-                        ON CONFLICT (hunt_id, season_year) DO UPDATE SET
-                            start_date = EXCLUDED.start_date,
-                            end_date = EXCLUDED.end_date,
-                            notes = EXCLUDED.notes
-                    """, (hunt_id, start, end, notes))
-                    dates_loaded += 1
+                    date_rows.append((hunt_id, 2026, start, end, notes))
                 else:
                     dates_unmatched += 1
-        conn.commit()
+    date_columns = ('hunt_id', 'season_year', 'start_date', 'end_date', 'notes')
+    date_counts = bulk_write.merge(
+        cur, 'hunt_dates', bulk_write.HUNT_DATES_KEY, date_columns, date_rows)
+    load.track('hunt_dates', bulk_write.HUNT_DATES_KEY, date_columns, date_rows, proc_csv)
+    load.finish()
+    conn.commit()
 
     # ── Summary ──────────────────────────────────────────────────────────────
     print("\n=== AZ LOAD SUMMARY ===")
@@ -574,8 +721,9 @@ def main():
     cur.execute("""SELECT COUNT(*) FROM hunt_dates hd
                    JOIN hunts h ON h.hunt_id = hd.hunt_id WHERE h.state_id = %s""", (az_id,))
     print(f"  Hunt dates:   {cur.fetchone()[0]}")
-    print(f"  Dates loaded: {dates_loaded}, unmatched: {dates_unmatched}")
+    print(f"  Dates loaded: {date_counts}; unmatched: {dates_unmatched}")
 
+    finish_load(conn)
     conn.close()
     print("\nAZ load complete.")
 
@@ -19,24 +19,11 @@ CA draw system:
 import os
 import re
 import csv
-import pdfplumber
-import psycopg2
-
-BASE_DIR = "/Users/openclaw/Documents/GraysonsDrawOdds"
-DB_CONFIG = {
-    'host': 'localhost', 'port': 5432,
-    'dbname': 'draws', 'user': 'draws', 'password': 'drawspass'
-}
 
-
-def safe_int(val):
-    if val is None:
-        return 0
-    s = str(val).strip().replace(',', '').replace('\n', '')
-    if s in ('', 'N/A', '-', '–', 'None'):
-        return 0
-    m = re.match(r'^(\d+)', s)
-    return int(m.group(1)) if m else 0
+from loader_utils import (BASE_DIR, connect, ensure_pools, finish_load, safe_int,
+                          upsert_points)
+import parse_pool
+import pdf_cache
 
 
 def safe_pct(val):
@@ -90,11 +77,12 @@ ELK_DRAW_FILES = {
 }
 
 
-def parse_draw_pdf(filepath):
+def parse_draw_pdf(filepath, pages=None):
     """Parse a CA draw statistics PDF. Returns list of dicts with hunt_code, description,
-    tag_quota, pref_quota, random_quota, total_applicants, and per-point-level applicant counts."""
+    tag_quota, pref_quota, random_quota, total_applicants, and per-point-level applicant counts.
+    Each page stands alone; pages= limits the parse to those page numbers."""
     results = []
-    with pdfplumber.open(filepath) as pdf:
+    with pdf_cache.open(filepath, pages=pages) as pdf:
         for page in pdf.pages:
             tables = page.extract_tables()
             if not tables:
@@ -151,19 +139,30 @@ def parse_draw_pdf(filepath):
     return results
 
 
-def aggregate_draw_data(file_groups, raw_dir):
-    """Parse multiple point-range PDFs for a category and aggregate per hunt code.
+def parse_draw_files(file_sets, raw_dir):
+    """Parse every draw PDF named in file_sets ({category: [filename, ...]} dicts)
+    in one parallel pass. Returns dict of filename -> parse_draw_pdf rows."""
+    names = []
+    for file_set in file_sets:
+        for files in file_set.values():
+            for filepath_name in files:
+                if filepath_name in names:
+                    continue
+                if not os.path.exists(os.path.join(raw_dir, filepath_name)):
+                    print(f"  WARNING: {filepath_name} not found, skipping")
+                    continue
+                names.append(filepath_name)
+    paths = [os.path.join(raw_dir, name) for name in names]
+    return dict(zip(names, parse_pool.parse_files(parse_draw_pdf, paths, split_pages=True)))
+
+
+def aggregate_draw_data(file_groups, parsed):
+    """Aggregate the parsed point-range PDFs of a category per hunt code.
     Returns dict of hunt_code -> aggregated data."""
     aggregated = {}
 
     for filepath_name in file_groups:
-        filepath = os.path.join(raw_dir, filepath_name)
-        if not os.path.exists(filepath):
-            print(f"  WARNING: {filepath_name} not found, skipping")
-            continue
-
-        rows = parse_draw_pdf(filepath)
-        for r in rows:
+        for r in parsed.get(filepath_name, []):
             code = r['hunt_code']
             if code not in aggregated:
                 aggregated[code] = {
@@ -195,7 +194,7 @@ def aggregate_draw_data(file_groups, raw_dir):
 def parse_deer_harvest(filepath):
     """Parse deer harvest PDF. Returns dict of hunt_code -> harvest data."""
     results = {}
-    with pdfplumber.open(filepath) as pdf:
+    with pdf_cache.open(filepath) as pdf:
         for page in pdf.pages:
             tables = page.extract_tables()
             if not tables:
@@ -229,7 +228,7 @@ def parse_elk_harvest_text(filepath):
     """Parse elk harvest PDF using text extraction (tables have too many None columns).
     Returns dict of hunt_code -> harvest data."""
     results = {}
-    with pdfplumber.open(filepath) as pdf:
+    with pdf_cache.open(filepath) as pdf:
         for page in pdf.pages:
             text = page.extract_text()
             if not text:
@@ -419,7 +418,7 @@ def derive_gmu_from_hunt(hunt_code, description, species):
 
 
 def main():
-    conn = psycopg2.connect(**DB_CONFIG)
+    conn = connect()
     cur = conn.cursor()
 
     ca_state_id = 11
@@ -430,6 +429,7 @@ def main():
     cur.execute("DELETE FROM hunt_dates WHERE hunt_id IN (SELECT hunt_id FROM hunts WHERE state_id=%s)", (ca_state_id,))
     cur.execute("DELETE FROM harvest_stats WHERE hunt_id IN (SELECT hunt_id FROM hunts WHERE state_id=%s)", (ca_state_id,))
     cur.execute("DELETE FROM draw_results_by_pool WHERE hunt_id IN (SELECT hunt_id FROM hunts WHERE state_id=%s)", (ca_state_id,))
+    cur.execute("DELETE FROM draw_results_by_points WHERE hunt_id IN (SELECT hunt_id FROM hunts WHERE state_id=%s)", (ca_state_id,))
     cur.execute("DELETE FROM hunt_gmus WHERE hunt_id IN (SELECT hunt_id FROM hunts WHERE state_id=%s)", (ca_state_id,))
     cur.execute("DELETE FROM hunts WHERE state_id=%s", (ca_state_id,))
     cur.execute("DELETE FROM gmus WHERE state_id=%s", (ca_state_id,))
@@ -440,26 +440,22 @@ def main():
     species_map = {r[1]: r[0] for r in cur.fetchall()}
 
     # Create CA pools if not exist
-    for pool_code, desc, pct, note in [
+    pool_map = ensure_pools(cur, ca_state_id, [
         ('RES', 'Resident pool', 99.0, 'No NR quota for deer; elk: 1 NR tag/yr statewide'),
         ('NR', 'Nonresident pool', 1.0, 'Elk: 1 NR tag/yr statewide; deer: no separate NR pool'),
-    ]:
-        cur.execute("""
-            INSERT INTO pools (state_id, pool_code, description, allocation_pct, allocation_note)
-            VALUES (%s, %s, %s, %s, %s)
-            ON CONFLICT (state_id, pool_code) DO NOTHING
-        """, (ca_state_id, pool_code, desc, pct, note))
+    ])
     conn.commit()
 
-    cur.execute("SELECT pool_id, pool_code FROM pools WHERE state_id = %s", (ca_state_id,))
-    pool_map = {r[1]: r[0] for r in cur.fetchall()}
     print(f"CA pools: {pool_map}")
 
     # ===== PARSE ALL DRAW PDFs =====
-    print("\nParsing deer draw PDFs...")
+    print("\nParsing draw PDFs...")
+    parsed = parse_draw_files([DEER_DRAW_FILES, ELK_DRAW_FILES], raw_dir)
+
+    print("Aggregating deer draw PDFs...")
     all_deer_hunts = {}
     for category, files in DEER_DRAW_FILES.items():
-        agg = aggregate_draw_data(files, raw_dir)
+        agg = aggregate_draw_data(files, parsed)
         for code, data in agg.items():
             key = (code, category)
             data['category'] = category
@@ -468,10 +464,10 @@ def main():
 
     print(f"  Parsed {len(all_deer_hunts)} deer hunt-category combinations")
 
-    print("Parsing elk draw PDFs...")
+    print("Aggregating elk draw PDFs...")
     all_elk_hunts = {}
     for category, files in ELK_DRAW_FILES.items():
-        agg = aggregate_draw_data(files, raw_dir)
+        agg = aggregate_draw_data(files, parsed)
         for code, data in agg.items():
             key = (code, category)
             data['category'] = category
@@ -610,6 +606,7 @@ def main():
     # CA has no separate R/NR pool for deer draw stats; use RES pool
     res_pool_id = pool_map['RES']
     draw_count = 0
+    point_rows = []
 
     for hunt_key, data in all_hunts.items():
         hunt_id = hunt_id_map.get(hunt_key)
@@ -632,21 +629,32 @@ def main():
         cur.execute("""
             INSERT INTO draw_results_by_pool
                 (hunt_id, draw_year, pool_id, applications, tags_available,
-                 tags_awarded, max_pts_held, min_pts_drawn)
-            VALUES (%s, 2024, %s, %s, %s, %s, %s, %s)
+                 tags_awarded, max_pts_held, min_pts_drawn, random_tags)
+            VALUES (%s, 2024, %s, %s, %s, %s, %s, %s, %s)
             ON CONFLICT (hunt_id, draw_year, pool_id) DO UPDATE SET
                 applications = EXCLUDED.applications,
                 tags_available = EXCLUDED.tags_available,
                 tags_awarded = EXCLUDED.tags_awarded,
                 max_pts_held = EXCLUDED.max_pts_held,
-                min_pts_drawn = EXCLUDED.min_pts_drawn
+                min_pts_drawn = EXCLUDED.min_pts_drawn,
+                random_tags = EXCLUDED.random_tags
         """, (hunt_id, res_pool_id, total_apps, tag_quota, tag_quota,
               max_pts if max_pts else None,
-              min_pts_drawn))
+              min_pts_drawn, data['random_quota']))
         draw_count += 1
 
+        # 1st choice applicants per point level, for the queue odds engine.
+        # "7 > 6" columns (parsed as 6.5) rank between 7 and 6 points; they
+        # are folded into 6 so the levels stay whole points.
+        levels = {}
+        for pt, count in pts.items():
+            levels[int(pt)] = levels.get(int(pt), 0) + count
+        point_rows.extend((hunt_id, 2024, res_pool_id, pt, count, None)
+                          for pt, count in levels.items() if count)
+
+    points_count = upsert_points(cur, point_rows)
     conn.commit()
-    print(f"Inserted {draw_count} draw result rows")
+    print(f"Inserted {draw_count} draw result rows, {points_count} point-level rows")
 
     # ===== INSERT HARVEST STATS =====
     # Deer harvest 2024
@@ -771,6 +779,7 @@ def main():
                    JOIN hunts h ON h.hunt_id = hd.hunt_id WHERE h.state_id = %s""", (ca_state_id,))
     print(f"  Hunt dates:     {cur.fetchone()[0]}")
 
+    finish_load(conn)
     conn.close()
     print("\nCA load complete.")
 
@@ -12,15 +12,12 @@ Sources:
 import os
 import re
 import csv
-import pdfplumber
-import psycopg2
 from collections import defaultdict
 
-BASE_DIR = "/Users/openclaw/Documents/GraysonsDrawOdds"
-DB_CONFIG = {
-    'host': 'localhost', 'port': 5432,
-    'dbname': 'draws', 'user': 'draws', 'password': 'drawspass'
-}
+from loader_utils import BASE_DIR, connect, ensure_pools, finish_load, upsert_points
+import bulk_write
+import manifest
+import pdf_cache
 
 
 def dashed_to_compact(hunt_code):
@@ -44,7 +41,7 @@ def parse_co_draw_recap(filepath):
     current_hunt = None
     hunt_code_re = re.compile(r'^([DE][EMF]\d{3}[A-Z0-9]{2}[ARMSP])\b')
 
-    with pdfplumber.open(filepath) as pdf:
+    with pdf_cache.open(filepath) as pdf:
         total_pages = len(pdf.pages)
         for page_num, page in enumerate(pdf.pages):
             if page_num % 200 == 0:
@@ -117,7 +114,7 @@ def parse_co_draw_recap_simple(filepath):
     current_hunt = None
     hunt_code_re = re.compile(r'^([DE][EMF]\d{3}[A-Z0-9]{2}[ARMSP])\s*$')
 
-    with pdfplumber.open(filepath) as pdf:
+    with pdf_cache.open(filepath) as pdf:
         total_pages = len(pdf.pages)
         for page_num, page in enumerate(pdf.pages):
             if page_num % 200 == 0:
@@ -163,39 +160,47 @@ def parse_co_draw_recap_simple(filepath):
 
 def parse_co_drawn_out_at(filepath):
     """Parse CO drawn-out-at PDF for preference point info.
-    Returns dict: compact_code -> {res_pts, nr_pts}
+    Returns dict: compact_code -> {res_pts, nr_pts, res_final, nr_final}
+    *_pts: adult preference-point level the hunt drew out at (None when it
+    drew out on a later choice, as a leftover, or not at all).
+    *_final: (drawn, applicants) at that level, from "# Drawn at Final Level".
     """
     hunts = {}
     current_hunt = None
     hunt_code_re = re.compile(r'^([DE][EMF]\d{3}[A-Z0-9]{2}[ARMSP])\b')
+    pts_re = re.compile(r'^(\d+)\s+Pref')
+    final_re = re.compile(r'^(\d+)\s+of\s+(\d+)$')
 
-    with pdfplumber.open(filepath) as pdf:
-        for page in pdf.pages:
-            text = page.extract_text()
-            if not text:
-                continue
-            for line in text.split('\n'):
-                line = line.strip()
-                if not line:
-                    continue
+    def cell(row, i):
+        return ' '.join(str(row[i] or '').split()) if i < len(row) else ''
 
-                m = hunt_code_re.match(line)
-                if m:
-                    current_hunt = m.group(1)
-                    if current_hunt not in hunts:
-                        hunts[current_hunt] = {'res_pts': None, 'nr_pts': None}
-
-                if not current_hunt:
-                    continue
+    # Columns: Hunt Code, List, label, Adult Res, Adult NonRes, Youth Res, ...
+    with pdf_cache.open(filepath) as pdf:
+        for page in pdf.pages:
+            for table in page.extract_tables():
+                for row in table:
+                    if len(row) < 5:
+                        continue
+                    m = hunt_code_re.match(cell(row, 0))
+                    if m:
+                        current_hunt = m.group(1)
+                        hunts.setdefault(current_hunt, {'res_pts': None, 'nr_pts': None,
+                                                        'res_final': None, 'nr_final': None})
+                    if not current_hunt:
+                        continue
 
-                # "Drawn Out At X Pref Y Pref" or "Drawn Out At X Pref Points Y Pref Points"
-                if 'Drawn Out At' in line:
-                    pts_matches = re.findall(r'(\d+)\s+Pref', line)
-                    if pts_matches:
-                        # First is Res, second is NR
-                        hunts[current_hunt]['res_pts'] = int(pts_matches[0])
-                        if len(pts_matches) > 1:
-                            hunts[current_hunt]['nr_pts'] = int(pts_matches[1])
+                    label = cell(row, 2)
+                    for key, col in (('res', 3), ('nr', 4)):
+                        value = cell(row, col)
+                        if label == 'Drawn Out At':
+                            pm = pts_re.match(value)
+                            hunts[current_hunt][f'{key}_pts'] = int(pm.group(1)) if pm else None
+                            hunts[current_hunt][f'{key}_final'] = None
+                        elif label == '# Drawn at Final Level':
+                            fm = final_re.match(value)
+                            if fm and hunts[current_hunt][f'{key}_pts'] is not None:
+                                hunts[current_hunt][f'{key}_final'] = (int(fm.group(1)),
+                                                                       int(fm.group(2)))
 
     return hunts
 
@@ -207,7 +212,7 @@ def parse_co_harvest(filepath, species):
     rows = []
     in_table = False
 
-    with pdfplumber.open(filepath) as pdf:
+    with pdf_cache.open(filepath) as pdf:
         for page in pdf.pages:
             text = page.extract_text()
             if not text:
@@ -296,7 +301,12 @@ def parse_co_hunt_code(hunt_code):
 
 
 def main():
-    conn = psycopg2.connect(**DB_CONFIG)
+    conn = connect()
+    load = manifest.Load(conn, 'CO', BASE_DIR, __file__)
+    if not load.changed:
+        print("CO sources unchanged since the last load; nothing to do")
+        conn.close()
+        return
     cur = conn.cursor()
 
     cur.execute("SELECT state_id FROM states WHERE state_code='CO'")
@@ -306,19 +316,12 @@ def main():
     species_map = {r[1]: r[0] for r in cur.fetchall()}
 
     # Create CO pools
-    for pool_code, desc, pct, note in [
+    pool_map = ensure_pools(cur, co_id, [
         ('RES', 'Resident pool', 80.0, '~80% of tags (hybrid draw)'),
         ('NR', 'Nonresident pool', 20.0, '~20% NR cap'),
-    ]:
-        cur.execute("""
-            INSERT INTO pools (state_id, pool_code, description, allocation_pct, allocation_note)
-            VALUES (%s, %s, %s, %s, %s)
-            ON CONFLICT (state_id, pool_code) DO NOTHING
-        """, (co_id, pool_code, desc, pct, note))
+    ])
     conn.commit()
 
-    cur.execute("SELECT pool_id, pool_code FROM pools WHERE state_id = %s", (co_id,))
-    pool_map = {r[1]: r[0] for r in cur.fetchall()}
 
     # ── Load hunt codes from proclamation CSV ────────────────────────────────
     proc_csv = os.path.join(BASE_DIR, 'CO/proclamations/2026/CO_hunt_dates_2026.csv')
@@ -414,7 +417,8 @@ def main():
     print(f"  Inserted {len(hunt_id_map)} hunts")
 
     # ── Parse draw recap PDFs ────────────────────────────────────────────────
-    draw_count = 0
+    draw_rows = []
+    draw_row_paths = []
     draw_sources = [
         ('CO/raw_data/2024_elk_draw_recap.pdf', 2024),
         ('CO/raw_data/2024_deer_draw_recap.pdf', 2024),
@@ -444,23 +448,25 @@ def main():
                 continue
 
             # Insert as combined pool (we don't have R/NR split from recap easily)
-            cur.execute("""
-                INSERT INTO draw_results_by_pool
-                    (hunt_id, draw_year, pool_id, applications, tags_available, tags_awarded)
-                VALUES (%s, %s, %s, %s, %s, %s)
-                ON CONFLICT (hunt_id, draw_year, pool_id) DO UPDATE SET
-                    applications = EXCLUDED.applications,
-                    tags_available = EXCLUDED.tags_available,
-                    tags_awarded = EXCLUDED.tags_awarded
-            """, (hunt_id, year, pool_map['RES'], apps, quota, drawn))
-            draw_count += 1
+            draw_rows.append((hunt_id, year, pool_map['RES'], apps, quota, drawn))
+            draw_row_paths.append(relpath)
             matched += 1
 
         print(f"    Matched to hunts: {matched}")
-        conn.commit()
+
+    draw_columns = ('hunt_id', 'draw_year', 'pool_id', 'applications', 'tags_available',
+                    'tags_awarded')
+    draw_counts = bulk_write.merge(
+        cur, 'draw_results_by_pool', bulk_write.DRAW_POOL_KEY, draw_columns, draw_rows)
+    load.track('draw_results_by_pool', bulk_write.DRAW_POOL_KEY, draw_columns, draw_rows,
+               draw_row_paths)
+    conn.commit()
+    print(f"  Draw results: {draw_counts}")
 
     # ── Parse drawn-out-at for preference points ─────────────────────────────
-    pref_count = 0
+    pref_rows = []
+    point_rows = []
+    point_row_paths = []
     pref_sources = [
         ('CO/raw_data/2024_elk_drawn_out_at.pdf', 2024),
         ('CO/raw_data/2024_deer_drawn_out_at.pdf', 2024),
@@ -483,20 +489,46 @@ def main():
             hunt_id = compact_to_hunt[compact_code]
             res_pts = data.get('res_pts')
             if res_pts is not None:
-                cur.execute("""
-                    UPDATE draw_results_by_pool
-                    SET min_pts_drawn = %s
-                    WHERE hunt_id = %s AND draw_year = %s AND pool_id = %s
-                      AND (min_pts_drawn IS NULL OR min_pts_drawn < %s)
-                """, (res_pts, hunt_id, year, pool_map['RES'], res_pts))
-                pref_count += 1
+                pref_rows.append((hunt_id, year, pool_map['RES'], res_pts))
 
-        conn.commit()
+            # The final level is the only point level CO publishes; everyone
+            # above it drew. The queue odds engine works from this one row.
+            for key, pool_code in (('res', 'RES'), ('nr', 'NR')):
+                final = data.get(f'{key}_final')
+                if final is None:
+                    continue
+                drawn, applicants = final
+                point_rows.append((hunt_id, year, pool_map[pool_code], data[f'{key}_pts'],
+                                   applicants, drawn))
+                point_row_paths.append(relpath)
+
+    # min_pts_drawn only ever rises: keep each row's highest cut-off
+    highest = {}
+    for hunt_id, year, pool_id, pts in pref_rows:
+        k = (hunt_id, year, pool_id)
+        highest[k] = max(pts, highest.get(k, pts))
+    pref_counts = bulk_write.update_rows(
+        cur, 'draw_results_by_pool', bulk_write.DRAW_POOL_KEY,
+        ('hunt_id', 'draw_year', 'pool_id', 'min_pts_drawn'),
+        [k + (pts,) for k, pts in highest.items()],
+        exprs={'min_pts_drawn': 'GREATEST(draw_results_by_pool.min_pts_drawn, '
+                                'EXCLUDED.min_pts_drawn)'})
+    conn.commit()
 
-    print(f"  Updated {pref_count} draw results with pref point data")
+    # Tracked, so a cut-off that moved (or a report removed) leaves nothing
+    # behind at its old level once load.finish() runs
+    points_count = upsert_points(cur, point_rows)
+    load.track('draw_results_by_points', bulk_write.POINTS_KEY,
+               ('hunt_id', 'draw_year', 'pool_id', 'points', 'applications', 'successes'),
+               point_rows, point_row_paths)
+    conn.commit()
+
+    print(f"  Pref point data on draw results: {pref_counts}")
+    print(f"  Inserted {points_count} drawn-out-at point-level rows")
 
     # ── Parse harvest data ───────────────────────────────────────────────────
-    harvest_count = 0
+    harvest_rows = []
+    harvest_row_paths = []
     harvest_sources = [
         ('CO/raw_data/2024_elk_harvest_statelib.pdf', 2024, 'ELK'),
         ('CO/raw_data/2024_deer_harvest_statelib.pdf', 2024, 'MDR'),
@@ -516,6 +548,9 @@ def main():
         if not os.path.exists(filepath):
             print(f"  SKIP harvest (missing): {relpath}")
             continue
+        if not load.needs(filepath):
+            print(f"  {os.path.basename(relpath)}: unchanged")
+            continue
 
         rows = parse_co_harvest(filepath, sp_code)
         print(f"  {os.path.basename(relpath)}: {len(rows)} harvest rows by unit")
@@ -532,47 +567,41 @@ def main():
                 continue
             # Use first matching hunt as representative
             hunt_id = matching[0][1]
-            cur.execute("""
-                INSERT INTO harvest_stats
-                    (hunt_id, harvest_year, success_rate, days_hunted,
-                     licenses_sold, harvest_count)
-                VALUES (%s, %s, %s, %s, %s, %s)
-                ON CONFLICT (hunt_id, harvest_year, access_type) DO UPDATE SET
-                    success_rate = EXCLUDED.success_rate,
-                    days_hunted = EXCLUDED.days_hunted,
-                    licenses_sold = EXCLUDED.licenses_sold,
-                    harvest_count = EXCLUDED.harvest_count
-            """, (hunt_id, year, r['success_rate'], r['days_hunted'],
-                  r['hunters'], r['total_harvest']))
-            harvest_count += 1
-
+            harvest_rows.append((hunt_id, year, 'Public', r['success_rate'],
+                                 r['days_hunted'], r['hunters'], r['total_harvest']))
+            harvest_row_paths.append(relpath)
+
+    harvest_columns = ('hunt_id', 'harvest_year', 'access_type', 'success_rate',
+                       'days_hunted', 'licenses_sold', 'harvest_count')
+    harvest_counts = bulk_write.merge(
+        cur, 'harvest_stats', bulk_write.HARVEST_KEY, harvest_columns, harvest_rows)
+    load.track('harvest_stats', bulk_write.HARVEST_KEY, harvest_columns, harvest_rows,
+               harvest_row_paths)
     conn.commit()
-    print(f"  Inserted {harvest_count} harvest rows")
+    print(f"  Harvest rows: {harvest_counts}")
 
     # ── Load hunt dates ──────────────────────────────────────────────────────
-    dates_loaded = 0
+    date_rows = []
     dates_unmatched = 0
-    for row in load_rows:
-        hc = row['hunt_code'].strip()
-        if hc in hunt_id_map:
-            hunt_id = hunt_id_map[hc]
-            start = row.get('open_date', '').strip()
-            end = row.get('close_date', '').strip()
-            if not start or not end:
-                continue
-            notes = row.get('notes', '').strip()
-            cur.execute("""
-                INSERT INTO hunt_dates (hunt_id, season_year, start_date, end_date, notes)
-                VALUES (%s, 2026, %s, %s, %s)
-                ON CONFLICT (hunt_id, season_year) DO UPDATE SET
-                    start_date = EXCLUDED.start_date,
-                    end_date = EXCLUDED.end_date,
-                    notes = EXCLUDED.notes
-            """, (hunt_id, start, end, notes))
-            dates_loaded += 1
-        else:
-            dates_unmatched += 1
-
+    if load.needs(proc_csv):
+        for row in load_rows:
+            hc = row['hunt_code'].strip()
+            if hc in hunt_id_map:
+                hunt_id = hunt_id_map[hc]
+                start = row.get('open_date', '').strip()
+                end = row.get('close_date', '').strip()
+                if not start or not end:
+                    continue
+                notes = row.get('notes', '').strip()
+                date_rows.append((hunt_id, 2026, start, end, notes))
+            else:
+                dates_unmatched += 1
+
+    date_columns = ('hunt_id', 'season_year', 'start_date', 'end_date', 'notes')
+    date_counts = bulk_write.merge(
+        cur, 'hunt_dates', bulk_write.HUNT_DATES_KEY, date_columns, date_rows)
+    load.track('hunt_dates', bulk_write.HUNT_DATES_KEY, date_columns, date_rows, proc_csv)
+    load.finish()
     conn.commit()
 
     # ── Summary ──────────────────────────────────────────────────────────────
@@ -590,8 +619,9 @@ def main():
     cur.execute("""SELECT COUNT(*) FROM hunt_dates hd
                    JOIN hunts h ON h.hunt_id = hd.hunt_id WHERE h.state_id = %s""", (co_id,))
     print(f"  Hunt dates:   {cur.fetchone()[0]}")
-    print(f"  Dates loaded: {dates_loaded}, unmatched: {dates_unmatched}")
+    print(f"  Dates loaded: {date_counts}; unmatched: {dates_unmatched}")
 
+    finish_load(conn)
     conn.close()
     print("\nCO load complete.")
 
@@ -13,15 +13,11 @@ Note: ID has no draw odds data yet (pure lottery, no points).
 """
 
 import os
-import re
 import csv
-import psycopg2
 
-BASE_DIR = "/Users/openclaw/Documents/GraysonsDrawOdds"
-DB_CONFIG = {
-    'host': 'localhost', 'port': 5432,
-    'dbname': 'draws', 'user': 'draws', 'password': 'drawspass'
-}
+from loader_utils import (BASE_DIR, connect, ensure_pools, finish_load, gmu_sort_key,
+                          safe_float, safe_int)
+
 
 # TakeMethod → weapon_type_id
 WEAPON_MAP = {
@@ -33,34 +29,8 @@ WEAPON_MAP = {
 }
 
 
-def safe_int(val):
-    if val is None or val == '' or val == 'N/A':
-        return None
-    try:
-        return int(float(val))
-    except (ValueError, TypeError):
-        return None
-
-
-def safe_float(val):
-    if val is None or val == '' or val == 'N/A':
-        return None
-    try:
-        return float(val)
-    except (ValueError, TypeError):
-        return None
-
-
-def gmu_sort_key(area_code):
-    """Zero-pad numeric part, append letter suffix."""
-    m = re.match(r'^(\d+)(.*)', str(area_code))
-    if m:
-        return m.group(1).zfill(5) + m.group(2)
-    return str(area_code).zfill(5)
-
-
 def main():
-    conn = psycopg2.connect(**DB_CONFIG)
+    conn = connect()
     cur = conn.cursor()
 
     # Get state_id
@@ -72,15 +42,10 @@ def main():
     species_db = {r[1]: r[0] for r in cur.fetchall()}
 
     # Ensure pools exist for ID (even though no draw data yet)
-    for pool_code, desc, pct, note in [
+    ensure_pools(cur, id_state_id, [
         ('RES', 'Resident pool', 90.0, '90% open random'),
         ('NR', 'Nonresident pool', 10.0, '10% NR reserved'),
-    ]:
-        cur.execute("""
-            INSERT INTO pools (state_id, pool_code, description, allocation_pct, allocation_note)
-            VALUES (%s, %s, %s, %s, %s)
-            ON CONFLICT (state_id, pool_code) DO NOTHING
-        """, (id_state_id, pool_code, desc, pct, note))
+    ])
     conn.commit()
 
     # Source files: (filepath, species_code, species_context)
@@ -113,14 +78,14 @@ def main():
             hunt_code = str(row['Hunt#']).strip()
             take_method = row['TakeMethod'].strip()
             area = str(row['Area']).strip()
-            year = safe_int(row.get('Year'))
+            year = safe_int(row.get('Year'), None)
 
             weapon_type_id = WEAPON_MAP.get(take_method, 1)
 
             # Infer sex from Antlered/Antlerless columns
-            antlered = safe_int(row.get('Antlered'))
-            antlerless = safe_int(row.get('Antlerless'))
-            harvest = safe_int(row.get('Harvest'))
+            antlered = safe_int(row.get('Antlered'), None)
+            antlerless = safe_int(row.get('Antlerless'), None)
+            harvest = safe_int(row.get('Harvest'), None)
 
             if sp_code == 'ELK':
                 if antlerless and antlerless > 0 and (antlered is None or antlered == 0):
@@ -182,7 +147,7 @@ def main():
             """, (hunt_id, gmu_id))
 
             # Insert harvest stats
-            hunters = safe_int(row.get('Hunters'))
+            hunters = safe_int(row.get('Hunters'), None)
             success_pct = safe_float(row.get('Success%'))
             days = safe_float(row.get('Days'))
             success_rate = round(success_pct / 100.0, 4) if success_pct is not None else None
@@ -242,6 +207,7 @@ def main():
     print(f"  Hunt dates:    {cur.fetchone()[0]}")
     print(f"  Dates loaded:  {dates_loaded}, unmatched: {dates_unmatched}")
 
+    finish_load(conn)
     conn.close()
     print("\nID load complete.")
 
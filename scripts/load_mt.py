@@ -18,37 +18,9 @@ No draw_results_by_pool rows are loaded.
 import os
 import re
 import csv
-import pdfplumber
-import psycopg2
-
-BASE_DIR = "/Users/openclaw/Documents/GraysonsDrawOdds"
-DB_CONFIG = {
-    'host': 'localhost', 'port': 5432,
-    'dbname': 'draws', 'user': 'draws', 'password': 'drawspass'
-}
-
-
-def safe_int(val):
-    if val is None:
-        return 0
-    s = str(val).strip().replace(',', '').replace('\n', '')
-    if s in ('', 'N/A', '-', 'UNL', '–'):
-        return 0
-    # Handle ranges like "25-300" or "5-600" — take first number
-    m = re.match(r'^(\d+)', s)
-    return int(m.group(1)) if m else 0
-
-
-def safe_float(val):
-    if val is None:
-        return None
-    s = str(val).strip().replace(',', '')
-    if s in ('', 'N/A', '-'):
-        return None
-    try:
-        return float(s)
-    except ValueError:
-        return None
+
+from loader_utils import BASE_DIR, connect, ensure_pools, finish_load, safe_int
+import pdf_cache
 
 
 def infer_species_code(opportunity, license_type):
@@ -105,7 +77,7 @@ def parse_proclamation_hunts(filepath):
     current_hd = None
     current_species_section = None  # 'DEER' or 'ELK'
 
-    with pdfplumber.open(filepath) as pdf:
+    with pdf_cache.open(filepath) as pdf:
         # Deer/Elk regs start at page 44 (idx 43) through ~page 119 (idx 118)
         # Multi-district and antelope tables continue through ~page 138
         total_pages = len(pdf.pages)
@@ -215,7 +187,7 @@ def parse_elk_counts_pdf(filepath):
     """Parse elk_hunting_districts_2024.pdf for HD→EMU mapping and population data."""
     hd_emu = {}  # hd_num → emu_name
 
-    with pdfplumber.open(filepath) as pdf:
+    with pdf_cache.open(filepath) as pdf:
         for page in pdf.pages:
             tables = page.extract_tables()
             if not tables:
@@ -242,7 +214,7 @@ def parse_region1_harvest(filepath):
     """
     harvests = {}
 
-    with pdfplumber.open(filepath) as pdf:
+    with pdf_cache.open(filepath) as pdf:
         for page in pdf.pages:
             tables = page.extract_tables()
             if not tables:
@@ -345,7 +317,7 @@ def parse_season_date(date_str):
 
 
 def main():
-    conn = psycopg2.connect(**DB_CONFIG)
+    conn = connect()
     cur = conn.cursor()
 
     # Get MT state_id
@@ -358,6 +330,7 @@ def main():
     cur.execute("DELETE FROM hunt_dates WHERE hunt_id IN (SELECT hunt_id FROM hunts WHERE state_id=%s)", (mt_state_id,))
     cur.execute("DELETE FROM harvest_stats WHERE hunt_id IN (SELECT hunt_id FROM hunts WHERE state_id=%s)", (mt_state_id,))
     cur.execute("DELETE FROM draw_results_by_pool WHERE hunt_id IN (SELECT hunt_id FROM hunts WHERE state_id=%s)", (mt_state_id,))
+    cur.execute("DELETE FROM draw_results_by_points WHERE hunt_id IN (SELECT hunt_id FROM hunts WHERE state_id=%s)", (mt_state_id,))
     cur.execute("DELETE FROM hunt_gmus WHERE hunt_id IN (SELECT hunt_id FROM hunts WHERE state_id=%s)", (mt_state_id,))
     cur.execute("DELETE FROM hunts WHERE state_id=%s", (mt_state_id,))
     cur.execute("DELETE FROM gmus WHERE state_id=%s", (mt_state_id,))
@@ -372,18 +345,11 @@ def main():
     bag_limit_map = {r[1]: r[0] for r in cur.fetchall()}
 
     # Create MT pools
-    for pool_code, desc, pct, note in [
+    pool_map = ensure_pools(cur, mt_state_id, [
         ('RES', 'Resident pool', 90.0, '~90% of LE permits'),
         ('NR', 'Nonresident pool', 10.0, '~10% of LE permits'),
-    ]:
-        cur.execute("""
-            INSERT INTO pools (state_id, pool_code, description, allocation_pct, allocation_note)
-            VALUES (%s, %s, %s, %s, %s)
-            ON CONFLICT (state_id, pool_code) DO NOTHING
-        """, (mt_state_id, pool_code, desc, pct, note))
+    ])
 
-    cur.execute("SELECT pool_id, pool_code FROM pools WHERE state_id = %s", (mt_state_id,))
-    pool_map = {r[1]: r[0] for r in cur.fetchall()}
     conn.commit()
     print(f"MT pools: {pool_map}")
 
@@ -630,6 +596,7 @@ def main():
                    JOIN hunts h ON h.hunt_id = hd.hunt_id WHERE h.state_id = %s""", (mt_state_id,))
     print(f"  Hunt dates:     {cur.fetchone()[0]}")
 
+    finish_load(conn)
     conn.close()
     print("\nMT load complete.")
 
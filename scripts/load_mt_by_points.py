@@ -8,12 +8,11 @@ Maps to existing proclamation hunt records (E-XXX-XX, D-XXX-XX).
 
 import os, re, sys
 from collections import defaultdict
-import fitz  # PyMuPDF
-import psycopg2
 
-BASE_DIR = "/Users/openclaw/Documents/GraysonsDrawOdds"
+from loader_utils import BASE_DIR, connect, ensure_pools, finish_load, upsert_points
+import pdf_cache
+
 MT_DIR   = f"{BASE_DIR}/MT/raw_data"
-DB = dict(host='localhost', port=5432, dbname='draws', user='draws', password='drawspass')
 
 LICENSE_TYPES = {
     'ELK B LICENSE', 'ELK PERMIT',
@@ -61,13 +60,13 @@ def parse_by_points_pdf(pdf_path):
       {license_type, district, residency, points, applications, successes}
     Points=0 means zero-preference-point (random) pool.
     """
-    doc = fitz.open(pdf_path)
     lines = []
-    for page in doc:
-        for ln in page.get_text().split('\n'):
-            s = ln.strip()
-            if s and not any(s.startswith(w) for w in SKIP_WORDS):
-                lines.append(s)
+    with pdf_cache.open(pdf_path) as pdf:
+        for page in pdf.pages:
+            for ln in page.get_text().split('\n'):
+                s = ln.strip()
+                if s and not any(s.startswith(w) for w in SKIP_WORDS):
+                    lines.append(s)
 
     records = []
     i = 0
@@ -171,20 +170,8 @@ def aggregate_to_pools(records, draw_year):
     return results
 
 
-def get_or_create_pool(cur, state_id, pool_code, description):
-    cur.execute("SELECT pool_id FROM pools WHERE state_id=%s AND pool_code=%s",
-                (state_id, pool_code))
-    row = cur.fetchone()
-    if row:
-        return row[0]
-    cur.execute("""INSERT INTO pools (state_id, pool_code, description)
-                   VALUES (%s, %s, %s) RETURNING pool_id""",
-                (state_id, pool_code, description))
-    return cur.fetchone()[0]
-
-
 def main():
-    conn = psycopg2.connect(**DB)
+    conn = connect()
     cur  = conn.cursor()
 
     # State ID
@@ -199,9 +186,7 @@ def main():
         'NR_LO':  'Nonresident Landowner',
         'NR':     'Nonresident',
     }
-    pool_map = {}
-    for code, desc in pool_defs.items():
-        pool_map[code] = get_or_create_pool(cur, mt_id, code, desc)
+    pool_map = ensure_pools(cur, mt_id, pool_defs.items())
     conn.commit()
     print(f"Pools: {pool_map}")
 
@@ -212,6 +197,7 @@ def main():
 
     total_loaded = 0
     total_skipped = 0
+    total_points = 0
     missing_hunts = set()
 
     for fname, draw_year in BY_POINTS_FILES:
@@ -263,11 +249,25 @@ def main():
                   row['avg_pts_drawn'], row['min_pts_drawn'], row['max_pts_held']))
             total_loaded += 1
 
+        # Keep the point-level rows too (the bonus-point odds engine's input)
+        point_rows = []
+        for r in raw:
+            prefix = LIC_TO_PREFIX.get(r['license_type'])
+            hunt_id = hunt_lookup.get(f"{prefix}-{r['district']}") if prefix else None
+            pool_id = pool_map.get(RES_TO_POOL.get(r['residency']))
+            if not hunt_id or not pool_id:
+                continue
+            point_rows.append((hunt_id, draw_year, pool_id,
+                               r['points'], r['applications'], r['successes']))
+        total_points += upsert_points(cur, point_rows)
+
         conn.commit()
 
+    finish_load(conn)
     conn.close()
     print(f"\n=== MT BY-POINTS LOAD COMPLETE ===")
     print(f"  Loaded:  {total_loaded}")
+    print(f"  Points:  {total_points}")
     print(f"  Skipped: {total_skipped}")
     if missing_hunts:
         print(f"  Missing hunt codes ({len(missing_hunts)}): {sorted(missing_hunts)[:20]}")
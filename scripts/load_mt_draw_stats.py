@@ -27,13 +27,9 @@ Files expected in MT/raw_data/:
 """
 import csv
 import os
-import psycopg2
 
-BASE_DIR = "/Users/openclaw/Documents/GraysonsDrawOdds"
-DB_CONFIG = {
-    'host': 'localhost', 'port': 5432,
-    'dbname': 'draws', 'user': 'draws', 'password': 'drawspass'
-}
+from loader_utils import BASE_DIR, connect, ensure_pools, finish_load, safe_int
+
 
 FILES = [
     # (filename, species_code)
@@ -47,15 +43,8 @@ FILES = [
     ('MT_deer_2025_2nd.csv', 'MDR'),
 ]
 
-def safe_int(v):
-    try:
-        return int(str(v).strip().replace(',', '').replace('%', ''))
-    except:
-        return 0
-
-
 def main():
-    conn = psycopg2.connect(**DB_CONFIG)
+    conn = connect()
     cur = conn.cursor()
 
     # State / lookup IDs
@@ -74,15 +63,9 @@ def main():
     bag_es = row[0] if row else 5
 
     # Ensure MT has RES and NR pools
-    for pool_code, desc, pct in [('RES', 'Resident pool', 90.0), ('NR', 'Nonresident pool', 10.0)]:
-        cur.execute("""
-            INSERT INTO pools (state_id, pool_code, description, allocation_pct)
-            VALUES (%s, %s, %s, %s)
-            ON CONFLICT (state_id, pool_code) DO NOTHING
-        """, (mt_id, pool_code, desc, pct))
+    pool_map = ensure_pools(cur, mt_id, [('RES', 'Resident pool', 90.0),
+                                         ('NR', 'Nonresident pool', 10.0)])
 
-    cur.execute("SELECT pool_id, pool_code FROM pools WHERE state_id=%s", (mt_id,))
-    pool_map = {r[1]: r[0] for r in cur.fetchall()}
     conn.commit()
     print(f"MT pools: {pool_map}")
 
@@ -221,6 +204,7 @@ def main():
     """, (mt_id,))
     print(f"  New draw-stat GMUs created: {cur.fetchone()[0]}")
 
+    finish_load(conn)
     conn.close()
     print("\nDone.")
 
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Load New Mexico hunts, draw results, harvest stats and hunt dates.
+
+Reads the cleaned NM CSVs in data/ straight into PostgreSQL. Until now NM
+took two steps: the repo-root load_all.py built nm_hunts.db from these CSVs,
+then app/scripts/migrate_nm.py copied that into PostgreSQL.
+
+Sources (data/):
+  hunts_table_2025_units_species.csv                       hunts
+  draw_results_2025_clean.csv                              draw_results, draw_results_by_pool
+  hunt_dates_2024_2026_combined.csv                        hunt_dates
+  harvest_reports_public_with_licenses_2016_2024_cleaned.csv  harvest_stats
+
+The corrected 2024 elk harvest in fix_harvest_2024.py overrides the CSV
+rows for those hunts, as it does in nm_hunts.db.
+"""
+
+import csv
+import os
+import re
+import sys
+
+from loader_utils import (BASE_DIR, connect, ensure_pools, finish_load, gmu_sort_key,
+                          safe_float, safe_int)
+import bulk_write
+
+sys.path.append(BASE_DIR)
+from fix_harvest_2024 import DATA as ELK_HARVEST_2024  # noqa: E402
+
+DATA_DIR = os.path.join(BASE_DIR, 'data')
+HUNTS_CSV = os.path.join(DATA_DIR, 'hunts_table_2025_units_species.csv')
+DRAW_CSV = os.path.join(DATA_DIR, 'draw_results_2025_clean.csv')
+DATES_CSV = os.path.join(DATA_DIR, 'hunt_dates_2024_2026_combined.csv')
+HARVEST_CSV = os.path.join(DATA_DIR, 'harvest_reports_public_with_licenses_2016_2024_cleaned.csv')
+
+# CSV species label -> species_code. NM "Deer" are mule deer in the
+# multi-state schema.
+SPECIES_CODES = {
+    'Elk': 'ELK',
+    'Deer': 'MDR',
+    'Mule deer': 'MDR',
+    'White-tailed deer': 'MDR',
+    'DER': 'MDR',
+    'Pronghorn': 'ANT',
+    'Antelope': 'ANT',
+    'Oryx': 'ORX',
+    'Ibex': 'IBX',
+    'Barbary sheep': 'BBY',
+    'Bighorn sheep': 'BHS',
+    'Rocky Mountain bighorn sheep': 'BHS',
+    'Desert bighorn sheep': 'BHS',
+}
+
+# Middle digit of ELK-1-195: 1=rifle, 2=archery, 3=muzzleloader
+WEAPON_MAP = {'1': 2, '2': 3, '3': 4}
+
+# Unit numbers in a unit_description ("Units 2, 7, 9, 10: youth only");
+# NM GMUs run 2-59, larger numbers are ages, licence counts and the like
+UNIT_RE = re.compile(r'\b(\d+[A-Za-z]?)\b')
+MAX_GMU = 59
+
+
+def read_csv(path):
+    with open(path, newline='') as f:
+        return list(csv.DictReader(f))
+
+
+def unit_codes(desc):
+    return [n for n in UNIT_RE.findall(desc or '')
+            if int(re.match(r'\d+', n).group()) <= MAX_GMU]
+
+
+def main():
+    conn = connect()
+    cur = conn.cursor()
+
+    cur.execute("SELECT state_id FROM states WHERE state_code='NM'")
+    nm_id = cur.fetchone()[0]
+    print(f"NM state_id = {nm_id}")
+
+    cur.execute("SELECT species_id, species_code FROM species")
+    species_map = {r[1]: r[0] for r in cur.fetchall()}
+    cur.execute("SELECT bag_limit_id, bag_code FROM bag_limits")
+    bag_map = {r[1]: r[0] for r in cur.fetchall()}
+
+    pool_map = ensure_pools(cur, nm_id, [
+        ('RES', 'Resident pool', 84.0, '84% of tags'),
+        ('NR', 'Nonresident pool', 6.0, '6% of tags'),
+        ('OUTF', 'Outfitter pool', 10.0, '10% of tags'),
+    ])
+
+    # ── Hunts ────────────────────────────────────────────────────────────────
+    hunt_rows = []
+    missing_species, missing_bags = set(), set()
+    for row in read_csv(HUNTS_CSV):
+        hcode = row['hunt_code'].strip()
+        if not hcode:
+            continue
+        raw_species = row['species'].strip()
+        species_id = species_map.get(SPECIES_CODES.get(raw_species, raw_species))
+        if species_id is None:
+            missing_species.add(raw_species)
+            continue
+        bag = row['bag'].strip()
+        bag_limit_id = bag_map.get(bag) if bag else None
+        if bag and bag_limit_id is None:
+            missing_bags.add(bag)
+        parts = hcode.split('-')
+        weapon_type_id = WEAPON_MAP.get(parts[1]) if len(parts) >= 2 else None
+        hunt_rows.append((nm_id, species_id, hcode, weapon_type_id, bag_limit_id,
+                          row['unit_description'].strip() or None, 1, 'DRAW'))
+
+    hunt_counts = bulk_write.merge(
+        cur, 'hunts', ('state_id', 'hunt_code'),
+        ('state_id', 'species_id', 'hunt_code', 'weapon_type_id', 'bag_limit_id',
+         'unit_description', 'is_active', 'tag_type'),
+        hunt_rows)
+    print(f"Hunts: {hunt_counts}")
+    if missing_species:
+        print(f"  WARNING: unmapped species (rows skipped): {sorted(missing_species)}")
+    if missing_bags:
+        print(f"  WARNING: bag codes not in bag_limits (set to NULL): {sorted(missing_bags)}")
+
+    cur.execute("SELECT hunt_code, hunt_id FROM hunts WHERE state_id = %s", (nm_id,))
+    hunt_id_map = dict(cur.fetchall())
+
+    # ── GMUs and hunt-GMU links, from the unit descriptions ─────────────────
+    hunt_units = {row[2]: unit_codes(row[5]) for row in hunt_rows}
+    gmu_codes = sorted({c for codes in hunt_units.values() for c in codes}, key=gmu_sort_key)
+    gmu_counts = bulk_write.merge(
+        cur, 'gmus', ('state_id', 'gmu_code'), ('state_id', 'gmu_code', 'gmu_sort_key'),
+        [(nm_id, c, gmu_sort_key(c)) for c in gmu_codes], update=())
+    cur.execute("SELECT gmu_code, gmu_id FROM gmus WHERE state_id = %s", (nm_id,))
+    gmu_map = dict(cur.fetchall())
+    link_counts = bulk_write.merge(
+        cur, 'hunt_gmus', ('hunt_id', 'gmu_id'), ('hunt_id', 'gmu_id'),
+        [(hunt_id_map[hcode], gmu_map[c])
+         for hcode, codes in hunt_units.items() for c in codes], update=())
+    print(f"GMUs: {gmu_counts}; hunt-GMU links: {link_counts}")
+
+    # ── Draw results ─────────────────────────────────────────────────────────
+    draw_rows, pool_rows = [], []
+    missing = set()
+    for row in read_csv(DRAW_CSV):
+        hunt_id = hunt_id_map.get(row['hunt_code'].strip())
+        if hunt_id is None:
+            missing.add(row['hunt_code'].strip())
+            continue
+        year = int(row['year'])
+        counts = {k: safe_int(row[k]) for k in row if k not in ('draw_id', 'hunt_code', 'year')}
+        draw_rows.append((hunt_id, year,
+                          counts['resident_applications'], counts['non_resident_applications'],
+                          counts['outfitter_applications'], counts['licenses_total'],
+                          counts['resident_licenses'], counts['non_resident_licenses'],
+                          counts['outfitter_licenses'], counts['resident_results'],
+                          counts['non_resident_results'], counts['outfitter_results']))
+        for pool_code, prefix in (('RES', 'resident'), ('NR', 'non_resident'),
+                                  ('OUTF', 'outfitter')):
+            pool_rows.append((hunt_id, year, pool_map[pool_code],
+                              counts[f'{prefix}_applications'], counts[f'{prefix}_licenses'],
+                              counts[f'{prefix}_results']))
+
+    draw_counts = bulk_write.merge(
+        cur, 'draw_results', ('hunt_id', 'draw_year'),
+        ('hunt_id', 'draw_year', 'resident_applications', 'nonresident_applications',
+         'outfitter_applications', 'licenses_total', 'resident_licenses',
+         'nonresident_licenses', 'outfitter_licenses', 'resident_results',
+         'nonresident_results', 'outfitter_results'),
+        draw_rows)
+    pool_counts = bulk_write.merge(
+        cur, 'draw_results_by_pool', bulk_write.DRAW_POOL_KEY,
+        ('hunt_id', 'draw_year', 'pool_id', 'applications', 'tags_available', 'tags_awarded'),
+        pool_rows)
+    print(f"Draw results: {draw_counts}; by pool: {pool_counts}")
+    if missing:
+        print(f"  WARNING: draw rows for unknown hunt codes: {sorted(missing)}")
+
+    # ── Harvest stats ────────────────────────────────────────────────────────
+    harvest = {}    # (hunt_id, year) -> (success_rate, satisfaction, days, licenses)
+    missing = set()
+    for row in read_csv(HARVEST_CSV):
+        hcode = row['hunt_code'].strip()
+        if not hcode:
+            continue
+        hunt_id = hunt_id_map.get(hcode)
+        if hunt_id is None:
+            missing.add(hcode)
+            continue
+        # A (year, hunt) listed twice keeps its first row
+        harvest.setdefault((hunt_id, int(row['year'])), tuple(
+            safe_float(row[k]) for k in ('success_rate', 'satisfaction', 'days_hunted',
+                                         'licenses_sold')))
+    for hcode, success, satisfaction, days, licenses in ELK_HARVEST_2024:
+        if hcode in hunt_id_map:
+            harvest[(hunt_id_map[hcode], 2024)] = (success, satisfaction, days, licenses)
+
+    harvest_counts = bulk_write.merge(
+        cur, 'harvest_stats', bulk_write.HARVEST_KEY,
+        ('hunt_id', 'harvest_year', 'access_type', 'success_rate', 'satisfaction',
+         'days_hunted', 'licenses_sold'),
+        [(hunt_id, year, 'Public') + values for (hunt_id, year), values in harvest.items()])
+    print(f"Harvest stats: {harvest_counts}")
+    if missing:
+        print(f"  WARNING: {len(missing)} harvest hunt codes not in hunts")
+
+    # ── Hunt dates ───────────────────────────────────────────────────────────
+    date_rows = []
+    missing = set()
+    for row in read_csv(DATES_CSV):
+        hunt_id = hunt_id_map.get(row['hunt_code'].strip())
+        if hunt_id is None:
+            missing.add(row['hunt_code'].strip())
+            continue
+        date_rows.append((hunt_id, int(row['year']), row['start_date'].strip() or None,
+                          row['end_date'].strip() or None, row['hunt_name'].strip()))
+    date_counts = bulk_write.merge(
+        cur, 'hunt_dates', bulk_write.HUNT_DATES_KEY,
+        ('hunt_id', 'season_year', 'start_date', 'end_date', 'hunt_name'), date_rows)
+    print(f"Hunt dates: {date_counts}")
+    if missing:
+        print(f"  WARNING: {len(missing)} hunt date codes not in hunts")
+
+    conn.commit()
+    finish_load(conn)
+    cur.close()
+    conn.close()
+    print("\nNM load complete.")
+
+
+if __name__ == '__main__':
+    main()
@@ -10,13 +10,10 @@ import os
 import re
 import csv
 import openpyxl
-import psycopg2
 
-BASE_DIR = "/Users/openclaw/Documents/GraysonsDrawOdds"
-DB_CONFIG = {
-    'host': 'localhost', 'port': 5432,
-    'dbname': 'draws', 'user': 'draws', 'password': 'drawspass'
-}
+from loader_utils import (BASE_DIR, connect, ensure_pools, finish_load, gmu_sort_key,
+                          safe_float, safe_int)
+
 
 # NV weapon code mapping
 WEAPON_MAP = {
@@ -60,34 +57,8 @@ def parse_sex(hunt_name, species_code):
     return 5  # default either sex
 
 
-def gmu_sort_key(unit_group):
-    """Zero-pad first numeric segment to 5 chars."""
-    m = re.match(r'(\d+)', str(unit_group))
-    if m:
-        return m.group(1).zfill(5) + str(unit_group)[m.end():]
-    return str(unit_group).zfill(5)
-
-
-def safe_int(val):
-    if val is None or val == '' or val == 'N/A':
-        return None
-    try:
-        return int(float(val))
-    except (ValueError, TypeError):
-        return None
-
-
-def safe_float(val):
-    if val is None or val == '' or val == 'N/A':
-        return None
-    try:
-        return float(val)
-    except (ValueError, TypeError):
-        return None
-
-
 def main():
-    conn = psycopg2.connect(**DB_CONFIG)
+    conn = connect()
     cur = conn.cursor()
 
     # Get state_id
@@ -99,18 +70,11 @@ def main():
     species_db = {r[1]: r[0] for r in cur.fetchall()}
 
     # Ensure pools exist for NV
-    for pool_code, desc, pct, note in [
+    pool_map = ensure_pools(cur, nv_state_id, [
         ('RES', 'Resident pool', 90.0, '~90% of tags'),
         ('NR', 'Nonresident pool', 10.0, '~10% of tags'),
-    ]:
-        cur.execute("""
-            INSERT INTO pools (state_id, pool_code, description, allocation_pct, allocation_note)
-            VALUES (%s, %s, %s, %s, %s)
-            ON CONFLICT (state_id, pool_code) DO NOTHING
-        """, (nv_state_id, pool_code, desc, pct, note))
+    ])
 
-    cur.execute("SELECT pool_id, pool_code FROM pools WHERE state_id = %s", (nv_state_id,))
-    pool_map = {r[1]: r[0] for r in cur.fetchall()}
     conn.commit()
 
     # Load Excel
@@ -147,7 +111,7 @@ def main():
         weapon_raw = str(row[col['Weapon']]).strip()
         unit_group = str(row[col['Unit Group']]).strip()
         residency = str(row[col['Residency']]).strip()
-        year = safe_int(row[col['year']]) or 2024
+        year = safe_int(row[col['year']], None) or 2024
 
         weapon_type_id = WEAPON_MAP.get(weapon_raw, 1)
         weapon_label = WEAPON_LABEL.get(weapon_raw, weapon_raw)
@@ -239,9 +203,9 @@ def main():
         """, (hunt_id, gmu_id))
 
         # Draw results
-        apps = safe_int(row[col['Unique\nApps']])
-        demand = safe_int(row[col['Demand']])
-        quota = safe_int(row[col['2024\nQuota']])
+        apps = safe_int(row[col['Unique\nApps']], None)
+        demand = safe_int(row[col['Demand']], None)
+        quota = safe_int(row[col['2024\nQuota']], None)
         draw_rate = safe_float(row[col['Draw\nRate']])
 
         if apps is not None and apps > 0:
@@ -257,8 +221,8 @@ def main():
             total_draw += 1
 
         # Harvest stats
-        hunters_afield = safe_int(row[col['Hunters\nAfield']])
-        successful = safe_int(row[col['Successful\nHunters']])
+        hunters_afield = safe_int(row[col['Hunters\nAfield']], None)
+        successful = safe_int(row[col['Successful\nHunters']], None)
         hunter_success = safe_float(row[col['Hunter\nSuccess']])
         satisfaction = safe_float(row[col['Hunter\nSatisfaction']])
         hunt_days = safe_float(row[col['Hunt\nDays']])
@@ -350,6 +314,7 @@ def main():
     print(f"  Hunt dates:    {cur.fetchone()[0]}")
     print(f"  Dates loaded:  {dates_loaded}, unmatched: {dates_unmatched}")
 
+    finish_load(conn)
     conn.close()
     print("\nNV load complete.")
 
@@ -11,13 +11,9 @@ import os
 import re
 import csv
 import openpyxl
-import psycopg2
 
-BASE_DIR = "/Users/openclaw/Documents/GraysonsDrawOdds"
-DB_CONFIG = {
-    'host': 'localhost', 'port': 5432,
-    'dbname': 'draws', 'user': 'draws', 'password': 'drawspass'
-}
+from loader_utils import BASE_DIR, connect, ensure_pools, finish_load
+
 
 # Weapon-type words to strip when extracting GMU name from Hunt Name
 STRIP_WORDS = [
@@ -138,7 +134,7 @@ def gmu_code_from_hunt(hunt_code):
 
 
 def main():
-    conn = psycopg2.connect(**DB_CONFIG)
+    conn = connect()
     cur = conn.cursor()
 
     # Get state_id
@@ -150,19 +146,10 @@ def main():
     species_map = {r[1]: r[0] for r in cur.fetchall()}
 
     # Ensure pools exist for OR
-    for pool_code, desc, pct, note in [
+    pool_map = ensure_pools(cur, or_state_id, [
         ('RES', 'Resident pool', 95.0, '95% of tags'),
         ('NR', 'Nonresident pool', 5.0, '5% of tags'),
-    ]:
-        cur.execute("""
-            INSERT INTO pools (state_id, pool_code, description, allocation_pct, allocation_note)
-            VALUES (%s, %s, %s, %s, %s)
-            ON CONFLICT (state_id, pool_code) DO NOTHING
-        """, (or_state_id, pool_code, desc, pct, note))
-
-    # Get pool IDs
-    cur.execute("SELECT pool_id, pool_code FROM pools WHERE state_id = %s", (or_state_id,))
-    pool_map = {r[1]: r[0] for r in cur.fetchall()}
+    ])
     conn.commit()
 
     # Define source files: (filepath, year, species_code, file_format)
@@ -313,6 +300,7 @@ def main():
     print(f"  Hunt dates:   {cur.fetchone()[0]}")
     print(f"  Dates loaded: {dates_loaded}, unmatched: {dates_unmatched}")
 
+    finish_load(conn)
     conn.close()
     print("\nOR load complete.")
 
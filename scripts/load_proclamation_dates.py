@@ -14,16 +14,9 @@ import csv
 import os
 import sys
 
-import psycopg2
-
-BASE_DIR = "/Users/openclaw/Documents/GraysonsDrawOdds"
-DB_CONFIG = {
-    'host': 'localhost',
-    'port': 5432,
-    'dbname': 'draws',
-    'user': 'draws',
-    'password': 'drawspass'
-}
+
+from loader_utils import BASE_DIR, connect, finish_load
+
 SEASON_YEAR = 2026
 
 STATES = ['NM', 'AZ', 'CO', 'UT', 'NV', 'MT', 'ID', 'WY', 'OR', 'WA', 'CA']
@@ -112,7 +105,7 @@ def main():
     parser.add_argument('--all', action='store_true', help='Load all states')
     args = parser.parse_args()
 
-    conn = psycopg2.connect(**DB_CONFIG)
+    conn = connect()
 
     all_stats = []
 
@@ -135,6 +128,7 @@ def main():
         parser.print_help()
         sys.exit(1)
 
+    finish_load(conn)
     conn.close()
 
     # Print summary
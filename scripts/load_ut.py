@@ -10,14 +10,12 @@ Sources:
 
 import os
 import re
-import pdfplumber
-import psycopg2
 
-BASE_DIR = "/Users/openclaw/Documents/GraysonsDrawOdds"
-DB_CONFIG = {
-    'host': 'localhost', 'port': 5432,
-    'dbname': 'draws', 'user': 'draws', 'password': 'drawspass'
-}
+from loader_utils import BASE_DIR, connect, ensure_pools, finish_load, safe_int
+import bulk_write
+import manifest
+import pdf_cache
+
 
 # UT hunt code prefixes → (species_code, bag_code)
 HUNT_PREFIX_MAP = {
@@ -100,7 +98,7 @@ def parse_draw_odds_pdf(filepath):
     Each page (except page 1 summary) is one hunt with point-level breakdown.
     """
     hunts = []
-    with pdfplumber.open(filepath) as pdf:
+    with pdf_cache.open(filepath) as pdf:
         for page in pdf.pages:
             text = page.extract_text() or ''
             # Look for hunt header: "Hunt: XX#### HuntName"
@@ -157,22 +155,10 @@ def parse_draw_odds_pdf(filepath):
     return hunts
 
 
-def safe_int(val):
-    if val is None:
-        return 0
-    s = str(val).strip().replace(',', '')
-    if s in ('', 'N/A', '-'):
-        return 0
-    try:
-        return int(s)
-    except ValueError:
-        return 0
-
-
 def parse_harvest_pdf(filepath):
     """Parse a UT harvest report PDF. Returns list of dicts."""
     records = []
-    with pdfplumber.open(filepath) as pdf:
+    with pdf_cache.open(filepath) as pdf:
         for page in pdf.pages:
             text = page.extract_text() or ''
             lines = text.split('\n')
@@ -212,7 +198,7 @@ def parse_harvest_pdf(filepath):
 def parse_antlerless_harvest(filepath):
     """Parse antlerless harvest PDF which has Species column first."""
     records = []
-    with pdfplumber.open(filepath) as pdf:
+    with pdf_cache.open(filepath) as pdf:
         for page in pdf.pages:
             text = page.extract_text() or ''
             for line in text.split('\n'):
@@ -243,7 +229,12 @@ def parse_antlerless_harvest(filepath):
 
 
 def main():
-    conn = psycopg2.connect(**DB_CONFIG)
+    conn = connect()
+    load = manifest.Load(conn, 'UT', BASE_DIR, __file__)
+    if not load.changed:
+        print("UT sources unchanged since the last load; nothing to do")
+        conn.close()
+        return
     cur = conn.cursor()
 
     # Get UT state_id
@@ -260,18 +251,11 @@ def main():
     bag_limit_map = {r[1]: r[0] for r in cur.fetchall()}
 
     # Create UT pools
-    for pool_code, desc, pct, note in [
+    pool_map = ensure_pools(cur, ut_state_id, [
         ('RES', 'Resident pool', 90.0, '~90% of tags'),
         ('NR', 'Nonresident pool', 10.0, '~10% of tags'),
-    ]:
-        cur.execute("""
-            INSERT INTO pools (state_id, pool_code, description, allocation_pct, allocation_note)
-            VALUES (%s, %s, %s, %s, %s)
-            ON CONFLICT (state_id, pool_code) DO NOTHING
-        """, (ut_state_id, pool_code, desc, pct, note))
+    ])
 
-    cur.execute("SELECT pool_id, pool_code FROM pools WHERE state_id = %s", (ut_state_id,))
-    pool_map = {r[1]: r[0] for r in cur.fetchall()}
     conn.commit()
 
     # ===== PARSE DRAW ODDS PDFs =====
@@ -288,7 +272,7 @@ def main():
     ]
 
     all_draw_hunts = {}  # hunt_code → {hunt_name, source_label, ...}
-    draw_results = []    # (hunt_code, year, res_apps, res_permits, nr_apps, nr_permits)
+    draw_results = []    # (hunt_code, year, res_apps, res_permits, nr_apps, nr_permits, relpath)
 
     for relpath, year, source_label in draw_sources:
         filepath = os.path.join(BASE_DIR, relpath)
@@ -304,10 +288,11 @@ def main():
             if code not in all_draw_hunts:
                 all_draw_hunts[code] = h
             draw_results.append((code, year, h['res_apps'], h['res_permits'],
-                                 h['nr_apps'], h['nr_permits']))
+                                 h['nr_apps'], h['nr_permits'], relpath))
 
     # ===== PARSE HARVEST PDFs =====
     harvest_records = []
+    harvest_paths = []   # file of each harvest record
 
     # General season buck deer harvest
     gs_deer_path = os.path.join(BASE_DIR, 'UT/raw_data/2024_gs_buck_deer_hr.pdf')
@@ -316,6 +301,7 @@ def main():
         recs = parse_harvest_pdf(gs_deer_path)
         print(f"  → {len(recs)} records")
         harvest_records.extend(recs)
+        harvest_paths.extend([gs_deer_path] * len(recs))
 
     # LE/OIAL harvest
     le_path = os.path.join(BASE_DIR, 'UT/raw_data/2024_le_oial_all.pdf')
@@ -324,6 +310,7 @@ def main():
         recs = parse_harvest_pdf(le_path)
         print(f"  → {len(recs)} records")
         harvest_records.extend(recs)
+        harvest_paths.extend([le_path] * len(recs))
 
     # Antlerless harvest
     al_path = os.path.join(BASE_DIR, 'UT/raw_data/2024_antlerless_hr.pdf')
@@ -332,6 +319,7 @@ def main():
         recs = parse_antlerless_harvest(al_path)
         print(f"  → {len(recs)} records")
         harvest_records.extend(recs)
+        harvest_paths.extend([al_path] * len(recs))
 
     # Add harvest hunt codes to all_draw_hunts if not already present
     for rec in harvest_records:
@@ -411,9 +399,10 @@ def main():
         print(f"Skipped species prefixes: {skipped_species}")
 
     # ===== INSERT DRAW RESULTS =====
-    draw_count = 0
+    draw_rows = []
+    draw_row_paths = []
     draw_skip = 0
-    for code, year, res_apps, res_permits, nr_apps, nr_permits in draw_results:
+    for code, year, res_apps, res_permits, nr_apps, nr_permits, relpath in draw_results:
         hunt_id = hunt_id_map.get(code)
         if not hunt_id:
             draw_skip += 1
@@ -423,48 +412,41 @@ def main():
                                           ('NR', nr_apps, nr_permits)]:
             if apps == 0 and awarded == 0:
                 continue
-            pool_id = pool_map[pool_code]
-            cur.execute("""
-                INSERT INTO draw_results_by_pool
-                    (hunt_id, draw_year, pool_id, applications, tags_awarded)
-                VALUES (%s, %s, %s, %s, %s)
-                ON CONFLICT (hunt_id, draw_year, pool_id) DO UPDATE SET
-                    applications = EXCLUDED.applications,
-                    tags_awarded = EXCLUDED.tags_awarded
-            """, (hunt_id, year, pool_id, apps, awarded))
-            draw_count += 1
-
+            draw_rows.append((hunt_id, year, pool_map[pool_code], apps, awarded))
+            draw_row_paths.append(relpath)
+
+    draw_columns = ('hunt_id', 'draw_year', 'pool_id', 'applications', 'tags_awarded')
+    draw_counts = bulk_write.merge(
+        cur, 'draw_results_by_pool', bulk_write.DRAW_POOL_KEY, draw_columns, draw_rows)
+    load.track('draw_results_by_pool', bulk_write.DRAW_POOL_KEY, draw_columns, draw_rows,
+               draw_row_paths)
     conn.commit()
-    print(f"Inserted {draw_count} draw result rows (skipped {draw_skip} non-deer/elk)")
+    print(f"Draw result rows: {draw_counts} (skipped {draw_skip} non-deer/elk)")
 
     # ===== INSERT HARVEST STATS =====
-    harvest_count = 0
+    harvest_rows = []
+    harvest_row_paths = []
     harvest_skip = 0
-    for rec in harvest_records:
+    for rec, path in zip(harvest_records, harvest_paths):
         hunt_id = hunt_id_map.get(rec['hunt_code'])
         if not hunt_id:
             harvest_skip += 1
             continue
 
         success_rate = rec['success_pct'] / 100.0 if rec['success_pct'] > 1 else rec['success_pct']
-
-        cur.execute("""
-            INSERT INTO harvest_stats
-                (hunt_id, harvest_year, access_type, success_rate, licenses_sold,
-                 harvest_count, days_hunted)
-            VALUES (%s, 2024, %s, %s, %s, %s, %s)
-            ON CONFLICT (hunt_id, harvest_year, access_type) DO UPDATE SET
-                success_rate = EXCLUDED.success_rate,
-                licenses_sold = EXCLUDED.licenses_sold,
-                harvest_count = EXCLUDED.harvest_count,
-                days_hunted = EXCLUDED.days_hunted
-        """, (hunt_id, 'PUBLIC', success_rate,
-              rec['permits'], rec['harvest'],
-              rec.get('avg_days')))
-        harvest_count += 1
-
+        harvest_rows.append((hunt_id, 2024, 'PUBLIC', success_rate,
+                             rec['permits'], rec['harvest'], rec.get('avg_days')))
+        harvest_row_paths.append(path)
+
+    harvest_columns = ('hunt_id', 'harvest_year', 'access_type', 'success_rate',
+                       'licenses_sold', 'harvest_count', 'days_hunted')
+    harvest_counts = bulk_write.merge(
+        cur, 'harvest_stats', bulk_write.HARVEST_KEY, harvest_columns, harvest_rows)
+    load.track('harvest_stats', bulk_write.HARVEST_KEY, harvest_columns, harvest_rows,
+               harvest_row_paths)
+    load.finish()
     conn.commit()
-    print(f"Inserted {harvest_count} harvest rows (skipped {harvest_skip} non-deer/elk)")
+    print(f"Harvest rows: {harvest_counts} (skipped {harvest_skip} non-deer/elk)")
 
     # ===== FINAL COUNTS =====
     print("\n=== UT LOAD SUMMARY ===")
@@ -484,6 +466,7 @@ def main():
                    JOIN hunts h ON h.hunt_id = hd.hunt_id WHERE h.state_id = %s""", (ut_state_id,))
     print(f"  Hunt dates:     {cur.fetchone()[0]}")
 
+    finish_load(conn)
     conn.close()
     print("\nUT load complete.")
 
@@ -11,48 +11,17 @@ Sources:
 import os
 import re
 import csv
-import psycopg2
-import pdfplumber
 
-BASE_DIR = "/Users/openclaw/Documents/GraysonsDrawOdds"
+from loader_utils import (BASE_DIR, connect, ensure_pools, finish_load, safe_float,
+                          safe_int)
+import bulk_write
+import manifest
+import parse_pool
+import pdf_cache
+
 RAW_DIR = os.path.join(BASE_DIR, "WY", "raw_data")
 PROC_DIR = os.path.join(BASE_DIR, "WY", "proclamations", "2026")
 
-DB_CONFIG = {
-    'host': 'localhost', 'port': 5432,
-    'dbname': 'draws', 'user': 'draws', 'password': 'drawspass'
-}
-
-
-def connect():
-    conn = psycopg2.connect(**DB_CONFIG)
-    conn.autocommit = False
-    return conn
-
-
-def safe_int(val):
-    if val is None:
-        return 0
-    s = str(val).replace(',', '').strip()
-    if not s or s == '-':
-        return 0
-    try:
-        return int(float(s))
-    except ValueError:
-        return 0
-
-
-def safe_float(val):
-    if val is None:
-        return None
-    s = str(val).replace('%', '').replace(',', '').strip()
-    if not s or s == '-':
-        return None
-    try:
-        return float(s)
-    except ValueError:
-        return None
-
 
 def hunt_code_from(area, typ):
     area = str(area).strip().lstrip('0') or '0'
@@ -85,7 +54,7 @@ def parse_prefpoints_pdf(filepath):
     current_area = None
     current_type = None
 
-    with pdfplumber.open(filepath) as pdf:
+    with pdf_cache.open(filepath) as pdf:
         for page in pdf.pages:
             text = page.extract_text(layout=True)
             if not text:
@@ -154,11 +123,12 @@ def parse_prefpoints_pdf(filepath):
     return results
 
 
-def parse_random_pdf(filepath):
-    """Parse random/leftover/cow-calf/doe-fawn demand reports."""
+def parse_random_pdf(filepath, pages=None):
+    """Parse random/leftover/cow-calf/doe-fawn demand reports (one row per
+    line, so pages= can limit the parse to some page numbers)."""
     results = []
 
-    with pdfplumber.open(filepath) as pdf:
+    with pdf_cache.open(filepath, pages=pages) as pdf:
         for page in pdf.pages:
             text = page.extract_text(layout=True)
             if not text:
@@ -191,7 +161,7 @@ def parse_harvest_pdf(filepath, species):
     current_area = None
     in_table = False
 
-    with pdfplumber.open(filepath) as pdf:
+    with pdf_cache.open(filepath) as pdf:
         for page in pdf.pages:
             text = page.extract_text()
             if not text:
@@ -312,6 +282,11 @@ def parse_harvest_pdf(filepath, species):
 
 def main():
     conn = connect()
+    load = manifest.Load(conn, 'WY', BASE_DIR, __file__)
+    if not load.changed:
+        print("WY sources unchanged since the last load; nothing to do")
+        conn.close()
+        return
     cur = conn.cursor()
 
     cur.execute("SELECT state_id FROM states WHERE state_code='WY'")
@@ -323,20 +298,10 @@ def main():
     print(f"WY state_id = {wy_state_id}")
 
     # Ensure WY pools exist
-    cur.execute("SELECT pool_id, pool_code FROM pools WHERE state_id=%s", (wy_state_id,))
-    existing_pools = {r[1]: r[0] for r in cur.fetchall()}
-    if 'RES' not in existing_pools:
-        cur.execute(
-            "INSERT INTO pools (state_id, pool_code, description, allocation_pct, allocation_note) "
-            "VALUES (%s, 'RES', 'Resident pool', 84.0, '~84%% of limited-quota tags') RETURNING pool_id",
-            (wy_state_id,))
-        existing_pools['RES'] = cur.fetchone()[0]
-    if 'NR' not in existing_pools:
-        cur.execute(
-            "INSERT INTO pools (state_id, pool_code, description, allocation_pct, allocation_note) "
-            "VALUES (%s, 'NR', 'Nonresident pool', 16.0, '~16%% elk / ~20%% deer NR allocation') RETURNING pool_id",
-            (wy_state_id,))
-        existing_pools['NR'] = cur.fetchone()[0]
+    existing_pools = ensure_pools(cur, wy_state_id, [
+        ('RES', 'Resident pool', 84.0, '~84% of limited-quota tags'),
+        ('NR', 'Nonresident pool', 16.0, '~16% elk / ~20% deer NR allocation'),
+    ])
     res_pool_id = existing_pools['RES']
     nr_pool_id = existing_pools['NR']
     print(f"Pools: RES={res_pool_id}, NR={nr_pool_id}")
@@ -355,6 +320,7 @@ def main():
                 'res_apps': 0, 'res_quota': 0,
                 'nr_apps': 0, 'nr_quota': 0, 'nr_issued': 0,
                 'max_pts': 0,
+                'source': os.path.join(RAW_DIR, filename),
             }
         if pool == 'RES':
             draw_data[hc]['res_apps'] += apps
@@ -365,15 +331,32 @@ def main():
             draw_data[hc]['nr_issued'] += issued
         draw_data[hc]['max_pts'] = max(draw_data[hc]['max_pts'], max_pts)
 
+    # Parse every demand report up front, in parallel; the merges below
+    # take them in the same order as before
+    pref_files = [fn for fn in ['2025_elk_prefpoints_nonres.pdf', '2025_elk_prefpoints_nonres_special.pdf',
+                                '2025_deer_prefpoints_nonres.pdf', '2025_deer_prefpoints_nonres_special.pdf']
+                  if os.path.exists(os.path.join(RAW_DIR, fn))]
+    random_files = [fn for fn in ['2025_elk_random_res.pdf', '2025_deer_random_res.pdf',
+                                  '2025_elk_cowcalf_res.pdf', '2025_deer_doefawn_res.pdf',
+                                  '2025_elk_random_nonres.pdf', '2025_elk_random_nonres_special.pdf',
+                                  '2025_deer_random_nonres.pdf', '2025_deer_random_nonres_special.pdf',
+                                  '2025_elk_cowcalf_nonres.pdf', '2025_deer_doefawn_nonres.pdf',
+                                  '2025_elk_leftover_res.pdf', '2025_elk_leftover_nonres.pdf',
+                                  '2025_deer_leftover_res.pdf', '2025_deer_leftover_nonres.pdf']
+                    if os.path.exists(os.path.join(RAW_DIR, fn))]
+    parsed = dict(zip(pref_files, parse_pool.parse_files(
+        parse_prefpoints_pdf, [os.path.join(RAW_DIR, fn) for fn in pref_files])))
+    parsed.update(zip(random_files, parse_pool.parse_files(
+        parse_random_pdf, [os.path.join(RAW_DIR, fn) for fn in random_files], split_pages=True)))
+
     # NR Pref Points
     for fn in ['2025_elk_prefpoints_nonres.pdf', '2025_elk_prefpoints_nonres_special.pdf',
                '2025_deer_prefpoints_nonres.pdf', '2025_deer_prefpoints_nonres_special.pdf']:
-        fpath = os.path.join(RAW_DIR, fn)
-        if not os.path.exists(fpath):
+        if fn not in parsed:
             print(f"  SKIP: {fn}")
             continue
-        print(f"  Parsing {fn}...")
-        data = parse_prefpoints_pdf(fpath)
+        print(f"  Merging {fn}...")
+        data = parsed[fn]
         for (area, typ), info in data.items():
             merge_draw(area, typ, info['description'], fn, 'NR',
                        info['total_apps'], info['quota'], info['total_issued'], info['max_pts'])
@@ -381,12 +364,11 @@ def main():
 
     # Resident random
     for fn in ['2025_elk_random_res.pdf', '2025_deer_random_res.pdf']:
-        fpath = os.path.join(RAW_DIR, fn)
-        if not os.path.exists(fpath):
+        if fn not in parsed:
             print(f"  SKIP: {fn}")
             continue
-        print(f"  Parsing {fn}...")
-        data = parse_random_pdf(fpath)
+        print(f"  Merging {fn}...")
+        data = parsed[fn]
         for row in data:
             merge_draw(row['area'], row['type'], row['description'], fn, 'RES',
                        row['first_choice_apps'], row['quota'])
@@ -394,11 +376,10 @@ def main():
 
     # Resident cow/calf and doe/fawn
     for fn in ['2025_elk_cowcalf_res.pdf', '2025_deer_doefawn_res.pdf']:
-        fpath = os.path.join(RAW_DIR, fn)
-        if not os.path.exists(fpath):
+        if fn not in parsed:
             continue
-        print(f"  Parsing {fn}...")
-        data = parse_random_pdf(fpath)
+        print(f"  Merging {fn}...")
+        data = parsed[fn]
         for row in data:
             merge_draw(row['area'], row['type'], row['description'], fn, 'RES',
                        row['first_choice_apps'], row['quota'])
@@ -407,11 +388,10 @@ def main():
     # NR random — fill gaps
     for fn in ['2025_elk_random_nonres.pdf', '2025_elk_random_nonres_special.pdf',
                '2025_deer_random_nonres.pdf', '2025_deer_random_nonres_special.pdf']:
-        fpath = os.path.join(RAW_DIR, fn)
-        if not os.path.exists(fpath):
+        if fn not in parsed:
             continue
-        print(f"  Parsing {fn} (NR random)...")
-        data = parse_random_pdf(fpath)
+        print(f"  Merging {fn} (NR random)...")
+        data = parsed[fn]
         for row in data:
             hc = hunt_code_from(row['area'], row['type'])
             if hc not in draw_data:
@@ -421,11 +401,10 @@ def main():
 
     # NR cow/calf and doe/fawn
     for fn in ['2025_elk_cowcalf_nonres.pdf', '2025_deer_doefawn_nonres.pdf']:
-        fpath = os.path.join(RAW_DIR, fn)
-        if not os.path.exists(fpath):
+        if fn not in parsed:
             continue
-        print(f"  Parsing {fn}...")
-        data = parse_random_pdf(fpath)
+        print(f"  Merging {fn}...")
+        data = parsed[fn]
         for row in data:
             merge_draw(row['area'], row['type'], row['description'], fn, 'NR',
                        row['first_choice_apps'], row['quota'])
@@ -434,11 +413,10 @@ def main():
     # Leftover — just ensure hunt codes exist
     for fn in ['2025_elk_leftover_res.pdf', '2025_elk_leftover_nonres.pdf',
                '2025_deer_leftover_res.pdf', '2025_deer_leftover_nonres.pdf']:
-        fpath = os.path.join(RAW_DIR, fn)
-        if not os.path.exists(fpath):
+        if fn not in parsed:
             continue
         pool = 'RES' if '_res.' in fn else 'NR'
-        data = parse_random_pdf(fpath)
+        data = parsed[fn]
         for row in data:
             hc = hunt_code_from(row['area'], row['type'])
             if hc not in draw_data:
@@ -567,38 +545,40 @@ def main():
             hg_inserted += 1
     print(f"Hunt-GMU links: {hg_inserted} new")
 
-    # Insert draw_results_by_pool
+    # Insert draw_results_by_pool (new rows only; existing ones are kept)
     draw_year = 2025
-    dr_inserted = 0
+    draw_rows = []
+    draw_row_paths = []
     for hc, info in draw_data.items():
         hunt_id = hunt_map.get(hc)
         if not hunt_id:
             continue
 
         if info['res_apps'] > 0 or info['res_quota'] > 0:
-            cur.execute(
-                "INSERT INTO draw_results_by_pool "
-                "(hunt_id, draw_year, pool_id, applications, tags_available) "
-                "VALUES (%s, %s, %s, %s, %s) ON CONFLICT DO NOTHING",
-                (hunt_id, draw_year, res_pool_id,
-                 info['res_apps'], info['res_quota'] if info['res_quota'] > 0 else None))
-            dr_inserted += cur.rowcount
+            draw_rows.append((hunt_id, draw_year, res_pool_id, info['res_apps'],
+                              info['res_quota'] if info['res_quota'] > 0 else None,
+                              None, None))
+            draw_row_paths.append(info['source'])
 
         if info['nr_apps'] > 0 or info['nr_quota'] > 0:
             tags_awarded = info['nr_issued'] if info['nr_issued'] > 0 else None
             max_pts = info['max_pts'] if info['max_pts'] > 0 else None
-            cur.execute(
-                "INSERT INTO draw_results_by_pool "
-                "(hunt_id, draw_year, pool_id, applications, tags_available, tags_awarded, max_pts_held) "
-                "VALUES (%s, %s, %s, %s, %s, %s, %s) ON CONFLICT DO NOTHING",
-                (hunt_id, draw_year, nr_pool_id, info['nr_apps'],
-                 info['nr_quota'] if info['nr_quota'] > 0 else None,
-                 tags_awarded, max_pts))
-            dr_inserted += cur.rowcount
-    print(f"Draw results: {dr_inserted} new rows")
+            draw_rows.append((hunt_id, draw_year, nr_pool_id, info['nr_apps'],
+                              info['nr_quota'] if info['nr_quota'] > 0 else None,
+                              tags_awarded, max_pts))
+            draw_row_paths.append(info['source'])
+    draw_columns = ('hunt_id', 'draw_year', 'pool_id', 'applications', 'tags_available',
+                    'tags_awarded', 'max_pts_held')
+    dr_counts = bulk_write.merge(
+        cur, 'draw_results_by_pool', bulk_write.DRAW_POOL_KEY, draw_columns, draw_rows,
+        update=())
+    load.track('draw_results_by_pool', bulk_write.DRAW_POOL_KEY, draw_columns, draw_rows,
+               draw_row_paths)
+    print(f"Draw results: {dr_counts}")
 
     # Harvest stats
-    hs_inserted = 0
+    hs_rows = []
+    hs_row_paths = []
     for fn, species, harvest_year in [
         ('2025_elk_harvest_report.pdf', 'elk', 2025),
         ('2025_deer_harvest_report.pdf', 'deer', 2025),
@@ -609,6 +589,9 @@ def main():
         if not os.path.exists(fpath):
             print(f"  SKIP harvest: {fn}")
             continue
+        if not load.needs(fpath):
+            print(f"  {fn}: unchanged")
+            continue
         print(f"  Parsing harvest: {fn}...")
         harvest_rows = parse_harvest_pdf(fpath, species)
         print(f"    {len(harvest_rows)} rows extracted")
@@ -636,17 +619,19 @@ def main():
                 continue
 
             success = hr['success_pct'] / 100.0 if hr['success_pct'] else None
-            cur.execute(
-                "INSERT INTO harvest_stats "
-                "(hunt_id, harvest_year, success_rate, harvest_count, licenses_sold) "
-                "VALUES (%s, %s, %s, %s, %s) ON CONFLICT DO NOTHING",
-                (hunt_id, harvest_year, success, hr['harvest_total'], hr['licenses_sold']))
-            hs_inserted += cur.rowcount
-    print(f"Harvest stats: {hs_inserted} new rows")
+            hs_rows.append((hunt_id, harvest_year, 'Public', success, hr['harvest_total'],
+                            hr['licenses_sold']))
+            hs_row_paths.append(fpath)
+    hs_columns = ('hunt_id', 'harvest_year', 'access_type', 'success_rate', 'harvest_count',
+                  'licenses_sold')
+    hs_counts = bulk_write.merge(
+        cur, 'harvest_stats', bulk_write.HARVEST_KEY, hs_columns, hs_rows, update=())
+    load.track('harvest_stats', bulk_write.HARVEST_KEY, hs_columns, hs_rows, hs_row_paths)
+    print(f"Harvest stats: {hs_counts}")
 
     # Hunt dates from CSV
-    hd_inserted = 0
-    if csv_rows:
+    date_rows = []
+    if csv_rows and load.needs(csv_path):
         print(f"  Loading hunt dates ({len(csv_rows)} CSV rows)...")
         for row in csv_rows:
             hc = row['hunt_code'].strip()
@@ -666,14 +651,14 @@ def main():
                 except (ValueError, IndexError):
                     pass
 
-            cur.execute(
-                "INSERT INTO hunt_dates "
-                "(hunt_id, season_year, start_date, end_date, hunt_name, notes) "
-                "VALUES (%s, %s, %s, %s, %s, %s) ON CONFLICT DO NOTHING",
-                (hunt_id, season_year, start_date, end_date, bag, notes))
-            hd_inserted += cur.rowcount
-    print(f"Hunt dates: {hd_inserted} new rows")
+            date_rows.append((hunt_id, season_year, start_date, end_date, bag, notes))
+    date_columns = ('hunt_id', 'season_year', 'start_date', 'end_date', 'hunt_name', 'notes')
+    hd_counts = bulk_write.merge(
+        cur, 'hunt_dates', bulk_write.HUNT_DATES_KEY, date_columns, date_rows, update=())
+    load.track('hunt_dates', bulk_write.HUNT_DATES_KEY, date_columns, date_rows, csv_path)
+    print(f"Hunt dates: {hd_counts}")
 
+    load.finish()
     conn.commit()
     print("\n── Committed. Final WY counts: ──")
 
@@ -687,6 +672,7 @@ def main():
         print(f"  {table}: {cur.fetchone()[0]}")
 
     cur.close()
+    finish_load(conn)
     conn.close()
     print("\nDone.")
 
@@ -18,12 +18,11 @@ Files in WY/raw_data/:
 
 import os, re
 from collections import defaultdict
-import fitz
-import psycopg2
 
-BASE_DIR = "/Users/openclaw/Documents/GraysonsDrawOdds"
+from loader_utils import BASE_DIR, connect, ensure_pools, finish_load, upsert_points
+import pdf_cache
+
 WY_DIR   = f"{BASE_DIR}/WY/raw_data"
-DB = dict(host='localhost', port=5432, dbname='draws', user='draws', password='drawspass')
 DRAW_YEAR = 2025
 
 # (filename, pool_code, description)
@@ -140,18 +139,28 @@ SKIP_RE = re.compile(
 )
 
 
+def _points(pts_raw):
+    """'18' → (18, False); '< 18' → (17, True); '< 0' → (None, False)."""
+    if pts_raw.startswith('<'):
+        pts = int(pts_raw[1:]) - 1
+        return (pts, True) if pts >= 0 else (None, False)
+    return int(pts_raw), False
+
+
 def parse_pref_points_pdf(pdf_path, pool_code):
     """
     Parse WY G&F NR preference point demand report.
-    Returns list of dicts: {area, hunt_type, points, issued, applicants, quota, pool_code}
-    Only includes rows with EXPLICIT (non-< N) point levels.
+    Returns list of dicts: {area, hunt_type, points, issued, applicants, quota, pool_code,
+    below}. The report lumps everyone under the last level the queue reached
+    into one "< N" row; that row comes back at points N - 1 with below=True.
     """
-    doc  = fitz.open(pdf_path)
+    with pdf_cache.open(pdf_path) as pdf:
+        texts = [page.get_text() for page in pdf.pages]
     records = []
     current = None  # {area, hunt_type, quota}
 
-    for page in doc:
-        for raw_line in page.get_text().split('\n'):
+    for text in texts:
+        for raw_line in text.split('\n'):
             line = raw_line.rstrip()
             tokens = line.split()
             if not tokens:
@@ -165,22 +174,24 @@ def parse_pref_points_pdf(pdf_path, pool_code):
                 if parsed:
                     current = {'area': parsed['area'], 'hunt_type': parsed['hunt_type'],
                                'quota': parsed['quota']}
-                    if not parsed['pts_raw'].startswith('<'):
+                    pts, below = _points(parsed['pts_raw'])
+                    if pts is not None:
                         records.append({
                             'area': parsed['area'], 'hunt_type': parsed['hunt_type'],
                             'quota': parsed['quota'],
-                            'points': int(parsed['pts_raw']),
+                            'points': pts,
                             'issued': parsed['issued'],
                             'applicants': parsed['apps'],
                             'pool_code': pool_code,
+                            'below': below,
                         })
                 continue
 
             # Continuation line: starts with whitespace
             if current and line and line[0] == ' ':
                 parsed = _parse_cont_line(tokens)
-                if parsed and not parsed['pts_raw'].startswith('<'):
-                    pts = int(parsed['pts_raw'])
+                pts, below = _points(parsed['pts_raw']) if parsed else (None, False)
+                if pts is not None:
                     records.append({
                         'area': current['area'], 'hunt_type': current['hunt_type'],
                         'quota': current['quota'],
@@ -188,6 +199,7 @@ def parse_pref_points_pdf(pdf_path, pool_code):
                         'issued': parsed['issued'],
                         'applicants': parsed['apps'],
                         'pool_code': pool_code,
+                        'below': below,
                     })
 
     return records
@@ -197,6 +209,8 @@ def aggregate_pref_records(records):
     """Aggregate by (area, hunt_type, pool_code) → draw_results_by_pool fields."""
     groups = defaultdict(list)
     for r in records:
+        if r['below']:
+            continue
         groups[(r['area'], r['hunt_type'], r['pool_code'], r.get('quota', 0))].append(r)
 
     results = []
@@ -234,10 +248,11 @@ def parse_random_pdf(pdf_path, pool_code):
     Columns: Area, Type, Desc, Quota, 1st-choice apps, 2nd-choice apps, 3rd-choice apps
     (No explicit 'drew' column — assume quota filled if oversubscribed.)
     """
-    doc = fitz.open(pdf_path)
+    with pdf_cache.open(pdf_path) as pdf:
+        texts = [page.get_text() for page in pdf.pages]
     records = []
-    for page in doc:
-        for raw_line in page.get_text().split('\n'):
+    for text in texts:
+        for raw_line in text.split('\n'):
             line = raw_line.rstrip()
             tokens = line.split()
             if not tokens:
@@ -272,19 +287,8 @@ def parse_random_pdf(pdf_path, pool_code):
 
 
 # ─── MAIN ──────────────────────────────────────────────────────────────────────
-def get_or_create_pool(cur, state_id, pool_code, description):
-    cur.execute("SELECT pool_id FROM pools WHERE state_id=%s AND pool_code=%s",
-                (state_id, pool_code))
-    row = cur.fetchone()
-    if row:
-        return row[0]
-    cur.execute("INSERT INTO pools (state_id, pool_code, description) VALUES (%s,%s,%s) RETURNING pool_id",
-                (state_id, pool_code, description))
-    return cur.fetchone()[0]
-
-
 def main():
-    conn = psycopg2.connect(**DB)
+    conn = connect()
     cur  = conn.cursor()
 
     cur.execute("SELECT state_id FROM states WHERE state_code='WY'")
@@ -297,9 +301,7 @@ def main():
         if pool_code not in all_pools:
             all_pools[pool_code] = pool_desc
 
-    pool_map = {}
-    for code, desc in all_pools.items():
-        pool_map[code] = get_or_create_pool(cur, wy_id, code, desc)
+    pool_map = ensure_pools(cur, wy_id, all_pools.items())
     conn.commit()
     print(f"WY pools ready: {list(pool_map.keys())}")
 
@@ -344,6 +346,24 @@ def main():
                   row['min_pts_drawn'], row['max_pts_held']))
             total_loaded += 1
 
+    def load_points(records):
+        """Per-point tiers of a preference report → draw_results_by_points."""
+        nonlocal total_points
+        rows = []
+        for r in records:
+            hunt_id = hunt_lookup.get(area_type_to_hunt_code(r['area'], r['hunt_type']))
+            if hunt_id:
+                rows.append((hunt_id, DRAW_YEAR, pool_map[r['pool_code']], r['points'],
+                             r['applicants'], r['issued']))
+        total_points += upsert_points(cur, rows)
+
+    total_points = 0
+    pref_pool_ids = [pool_map[code] for _, code, _ in PREF_POINT_FILES]
+    cur.execute("""
+        DELETE FROM draw_results_by_points
+        WHERE draw_year = %s AND pool_id = ANY(%s)
+    """, (DRAW_YEAR, pref_pool_ids))
+
     # Preference point files
     for fname, pool_code, _ in PREF_POINT_FILES:
         fpath = os.path.join(WY_DIR, fname)
@@ -355,6 +375,7 @@ def main():
         agg  = aggregate_pref_records(raw)
         print(f"  Aggregated pool rows: {len(agg)}")
         load_rows(agg)
+        load_points(raw)
         conn.commit()
 
     # Random / leftover / antlerless files
@@ -368,9 +389,25 @@ def main():
         load_rows(rows)
         conn.commit()
 
+    # The preference reports cover only the 75% queue share. The other 25%
+    # is the random report's quota for the same hunt; the special pools have
+    # no random report, so theirs is a third of the queue quota.
+    cur.execute("""
+        UPDATE draw_results_by_pool p
+        SET random_tags = COALESCE(
+            (SELECT r.tags_available FROM draw_results_by_pool r
+             WHERE r.hunt_id = p.hunt_id AND r.draw_year = p.draw_year
+               AND r.pool_id = %s AND p.pool_id = %s),
+            ROUND(p.tags_available / 3.0))
+        WHERE p.draw_year = %s AND p.pool_id = ANY(%s)
+    """, (pool_map['NR_RANDOM'], pool_map['NR_PREF'], DRAW_YEAR, pref_pool_ids))
+    conn.commit()
+
+    finish_load(conn)
     conn.close()
     print(f"\n=== WY DEMAND REPORT LOAD COMPLETE ===")
     print(f"  Loaded:  {total_loaded}")
+    print(f"  Point-level rows: {total_points}")
     print(f"  Skipped: {total_skipped}")
     if missing:
         print(f"  Missing hunt codes ({len(missing)}): {sorted(missing)[:20]}")
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Shared helpers for the state loaders.
+
+Every loader should call finish_load(conn) once its last commit is done: it
+refreshes the precomputed tables and bumps data_version, so the running app
+knows the tables changed and drops its cached responses.
+
+Loaders open their database connection with connect() and take BASE_DIR,
+safe_int/safe_float, gmu_sort_key and ensure_pools from here. Under
+scripts/load_all.py, connect() hands every loader of a state the same
+connection, whose commit() and close() are deferred to the runner, so the
+state lands as one transaction; finish_load is then run once, after every
+state. timed() adds up the seconds of a load stage for the runner's report.
+"""
+
+import os
+import re
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+import psycopg2
+import psycopg2.errors
+import psycopg2.extensions
+import psycopg2.extras
+
+DB_CONFIG = {
+    'host': os.environ.get('DRAWS_DB_HOST', 'localhost'),
+    'port': os.environ.get('DRAWS_DB_PORT', '5432'),
+    'dbname': os.environ.get('DRAWS_DB_NAME', 'draws'),
+    'user': os.environ.get('DRAWS_DB_USER', 'draws'),
+    'password': os.environ.get('DRAWS_DB_PASS', 'drawspass'),
+}
+
+# Repo root: <STATE>/raw_data, <STATE>/proclamations and data/ live under it
+BASE_DIR = os.environ.get(
+    'DRAWS_BASE_DIR', os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Seconds per load stage ('parse', 'write', 'precompute') in this process
+STAGE_SECONDS = defaultdict(float)
+
+
+@contextmanager
+def timed(stage):
+    """Add the time spent in the block (or decorated function) to
+    STAGE_SECONDS[stage]."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS[stage] += time.perf_counter() - start
+
+
+def safe_int(val, default=0):
+    """int from a report cell: '1,234' -> 1234, '12.0' -> 12, '25-300' -> 25
+    (the leading number). Blanks, '-', 'N/A', 'UNL' and other text give
+    default."""
+    if val is None:
+        return default
+    s = str(val).strip().replace(',', '').replace('%', '').replace('\n', '')
+    try:
+        return int(float(s))
+    except (ValueError, OverflowError):
+        m = re.match(r'-?\d+', s)
+        return int(m.group()) if m else default
+
+
+def safe_float(val, default=None):
+    """float from a report cell ('1,234.5', '37%'); default when it is not a
+    number."""
+    if val is None:
+        return default
+    s = str(val).strip().replace(',', '').replace('%', '')
+    try:
+        return float(s)
+    except ValueError:
+        return default
+
+
+def gmu_sort_key(code):
+    """Sort key for a unit code: the leading number zero-padded to 5 digits,
+    any suffix kept ('2B' -> '00002B')."""
+    m = re.match(r'(\d+)(.*)', str(code))
+    if m:
+        return m.group(1).zfill(5) + m.group(2)
+    return str(code).zfill(5)
+
+
+def ensure_pools(cur, state_id, pools):
+    """Create the state's missing draw pools; returns {pool_code: pool_id}
+    for all of its pools.
+
+    pools: (pool_code, description[, allocation_pct[, allocation_note]])
+    """
+    for pool in pools:
+        pool_code, desc, pct, note = (tuple(pool) + (None, None))[:4]
+        cur.execute("""
+            INSERT INTO pools (state_id, pool_code, description, allocation_pct, allocation_note)
+            VALUES (%s, %s, %s, %s, %s)
+            ON CONFLICT (state_id, pool_code) DO NOTHING
+        """, (state_id, pool_code, desc, pct, note))
+    cur.execute("SELECT pool_id, pool_code FROM pools WHERE state_id = %s", (state_id,))
+    return {r[1]: r[0] for r in cur.fetchall()}
+
+
+class StateConnection(psycopg2.extensions.connection):
+    """A state's shared connection under load_all.py: the loaders' commit()
+    and close() calls do nothing, end_state() commits or rolls back."""
+
+    def commit(self):
+        pass
+
+    def close(self):
+        pass
+
+
+_state_conn = None
+
+
+def connect():
+    """A loader's database connection (the state's shared one under
+    load_all.py)."""
+    if _state_conn is not None:
+        return _state_conn
+    return psycopg2.connect(**DB_CONFIG)
+
+
+def begin_state():
+    """Open the connection every loader of one state shares."""
+    global _state_conn
+    _state_conn = psycopg2.connect(connection_factory=StateConnection, **DB_CONFIG)
+    return _state_conn
+
+
+def end_state(commit):
+    """Commit (or roll back) and close the state's shared connection."""
+    global _state_conn
+    conn, _state_conn = _state_conn, None
+    if conn is None:
+        return
+    if commit:
+        psycopg2.extensions.connection.commit(conn)
+    else:
+        conn.rollback()
+    psycopg2.extensions.connection.close(conn)
+
+
+# Point-level demand rows: (hunt_id, draw_year, pool_id, points,
+# applications, successes)
+POINTS_UPSERT = """
+    INSERT INTO draw_results_by_points
+        (hunt_id, draw_year, pool_id, points, applications, successes)
+    VALUES %s
+    ON CONFLICT (hunt_id, draw_year, pool_id, points) DO UPDATE SET
+        applications = EXCLUDED.applications,
+        successes    = EXCLUDED.successes
+"""
+
+
+def upsert_points(cur, rows, page_size=5000):
+    """Write draw_results_by_points rows in multi-row INSERTs.
+
+    A report can list the same level twice; the last one wins, as it did
+    with one INSERT per row (a single statement may not update a row twice).
+    Returns the number of rows written.
+    """
+    latest = {}
+    for row in rows:
+        latest[row[:4]] = row
+    psycopg2.extras.execute_values(cur, POINTS_UPSERT, list(latest.values()),
+                                   page_size=page_size)
+    return len(latest)
+
+
+def bump_data_version(conn):
+    """Increment the data_version counter in the caller's transaction.
+
+    Returns the new version, or None if the table is missing
+    (scripts/setup_db.py has not been run against this database).
+    """
+    cur = conn.cursor()
+    try:
+        cur.execute("UPDATE data_version SET version = version + 1, updated_at = now() "
+                    "RETURNING version")
+    except psycopg2.errors.UndefinedTable:
+        conn.rollback()
+        print("  WARNING: data_version table missing — run scripts/setup_db.py; "
+              "app caches will not be invalidated")
+        return None
+    row = cur.fetchone()
+    if row is None:
+        cur.execute("INSERT INTO data_version (version) VALUES (1) RETURNING version")
+        row = cur.fetchone()
+    cur.close()
+    return row[0]
+
+
+def finish_load(conn):
+    """Post-load hook: run the precompute stage, bump the data version, commit.
+
+    Under load_all.py it does nothing: the runner finishes once, after every
+    state has committed.
+    """
+    if _state_conn is not None:
+        return None
+    import precompute
+    with timed('precompute'):
+        precompute.run_all(conn)
+    version = bump_data_version(conn)
+    conn.commit()
+    if version is not None:
+        print(f"  data_version -> {version}")
+    return version
@@ -0,0 +1,235 @@
+"""
+Incremental loads driven by the raw-file manifest.
+
+A state's inputs are the files under <STATE>/raw_data and
+<STATE>/proclamations (sources.json included). source_manifest keeps each
+file's hash, size and parse version (a hash of the loader script) as of the
+state's last successful load. A loader opens a Load first and stops there
+when nothing has moved:
+
+    load = manifest.Load(conn, 'AZ', BASE_DIR, __file__)
+    if not load.changed:
+        return
+    ...
+    for path in harvest_files:
+        if not load.needs(path):
+            continue
+        ...
+    counts = bulk_write.merge(cur, 'harvest_stats', HARVEST_KEY, columns, rows)
+    load.track('harvest_stats', HARVEST_KEY, columns, rows, sources)
+    ...
+    load.finish()
+    finish_load(conn)
+
+The decisions are per file. A new, modified or removed file, or an edited
+loader (which counts every file as modified), reruns the loader. Where a
+file's rows stand on their own (a harvest or pass report), the loader skips
+the file unless needs(path) says it moved; files whose rows combine with
+others' are reparsed, from pdf_cache, and their unchanged rows are not
+rewritten (bulk_write). finish() deletes the tracked rows of the previous
+load that came from a modified or removed file and that this load did not
+produce: the rows of a removed file, or of a hunt dropped from a modified
+one. Rows of unchanged files stay, and stay tracked, whether or not the
+loader read the file again. Then it records the manifest and the rows, with
+the file each row came from. A load that adds hunts reads every file again,
+since an unchanged one may hold rows of the new hunts. DRAWS_FULL_LOAD=1
+reruns every file of every state regardless.
+
+Only load_az, load_co, load_ut and load_wy use a Load. The manifest is one per
+state and keyed by file path, so a state's second loader (fix_ut_dates,
+load_wy_demand_reports, MT's) cannot keep one of its own yet. Those and the
+CA, ID, NM, NV and OR loaders rerun in full every time. load_ca and load_mt
+delete the state's rows first and load_wy_demand_reports its point rows; the
+rest never retract a row.
+"""
+
+import json
+import os
+from collections import Counter, defaultdict
+
+import psycopg2.extras
+
+import pdf_cache
+
+SOURCE_DIRS = ('raw_data', 'proclamations')
+FULL_LOAD = os.environ.get('DRAWS_FULL_LOAD', '') not in ('', '0')
+
+
+def state_sources(base_dir, state_code):
+    """Every input file of a state, relative to base_dir, sorted."""
+    paths = []
+    for sub in SOURCE_DIRS:
+        for root, _, files in os.walk(os.path.join(base_dir, state_code, sub)):
+            for name in files:
+                if not name.startswith('.'):
+                    paths.append(os.path.relpath(os.path.join(root, name), base_dir))
+    return sorted(paths)
+
+
+def _key_json(row_key):
+    return json.dumps(row_key, sort_keys=True, default=str)
+
+
+class Load:
+    """One state's load, compared with the manifest of the last one."""
+
+    def __init__(self, conn, state_code, base_dir, loader_file):
+        self.conn = conn
+        self.state_code = state_code
+        self.base_dir = base_dir
+        self.parse_version = pdf_cache.file_sha256(loader_file)[:16]
+        self._produced = {}     # (table, key json) -> source path
+
+        cur = conn.cursor()
+        cur.execute("""
+            SELECT path, sha256, size_bytes, mtime_ns, parse_version
+            FROM source_manifest WHERE state_code = %s
+        """, (state_code,))
+        known = {r[0]: r[1:] for r in cur.fetchall()}
+        self._hunts = self._hunt_codes(cur)
+        self._hunts_added = None
+        cur.close()
+
+        self.files = {}         # path -> (sha256, size, mtime_ns)
+        self.new, self.modified, self.unchanged = [], [], []
+        for path in state_sources(base_dir, state_code):
+            st = os.stat(os.path.join(base_dir, path))
+            old = known.get(path)
+            # Same size and mtime: trust the stored hash rather than re-read
+            if old and (old[1], old[2]) == (st.st_size, st.st_mtime_ns):
+                sha256 = old[0]
+            else:
+                sha256 = pdf_cache.file_sha256(os.path.join(base_dir, path))
+            self.files[path] = (sha256, st.st_size, st.st_mtime_ns)
+            if old is None:
+                self.new.append(path)
+            elif (old[0], old[3]) != (sha256, self.parse_version):
+                self.modified.append(path)
+            else:
+                self.unchanged.append(path)
+        self.removed = sorted(set(known) - set(self.files))
+        self._unchanged = set() if FULL_LOAD else set(self.unchanged)
+        print(f"  {state_code} sources: {len(self.new)} new, {len(self.modified)} modified, "
+              f"{len(self.removed)} removed, {len(self.unchanged)} unchanged")
+
+    @property
+    def changed(self):
+        return FULL_LOAD or bool(self.new or self.modified or self.removed)
+
+    def _hunt_codes(self, cur):
+        cur.execute("""
+            SELECT h.hunt_code FROM hunts h JOIN states s ON s.state_id = h.state_id
+            WHERE s.state_code = %s
+        """, (self.state_code,))
+        return {r[0] for r in cur.fetchall()}
+
+    def needs(self, path):
+        """Whether path (absolute or relative to base_dir) must be read again:
+        it is new or modified since the last load, or this load added hunts,
+        whose rows an unchanged file may hold. Call it once the state's hunts
+        are written."""
+        if FULL_LOAD or self._rel(path) not in self._unchanged:
+            return True
+        if self._hunts_added is None:
+            cur = self.conn.cursor()
+            self._hunts_added = bool(self._hunt_codes(cur) - self._hunts)
+            cur.close()
+            if self._hunts_added:
+                print(f"  New {self.state_code} hunts: rereading the unchanged files")
+        return self._hunts_added
+
+
+    def _rel(self, path):
+        if path is None or not os.path.isabs(path):
+            return path
+        return os.path.relpath(path, self.base_dir)
+
+    def track(self, table, key, columns, rows, sources=None):
+        """Note rows (tuples in `columns` order) as written to table.
+
+        key:     the table's UNIQUE key columns, every one of them in `columns`
+                 (a column left to its table default must be written out)
+        sources: the file the rows came from, or one path per row
+        """
+        columns = list(columns)
+        missing = [c for c in key if c not in columns]
+        if missing:
+            raise ValueError(f"{table}: key columns {missing} not among the tracked columns")
+        idx = [(c, columns.index(c)) for c in key]
+        if sources is None or isinstance(sources, str):
+            sources = [sources] * len(rows)
+        for row, source in zip(rows, sources):
+            row_key = {c: row[i] for c, i in idx}
+            self._produced[(table, _key_json(row_key))] = self._rel(source)
+
+    def _produced_keys(self, table, cols):
+        """This load's keys of table, cut down to the columns cols."""
+        keys = set()
+        for t, key_json in self._produced:
+            if t == table:
+                row_key = json.loads(key_json)
+                if set(cols) <= set(row_key):
+                    keys.add(_key_json({c: row_key[c] for c in cols}))
+        return keys
+
+    def _column_types(self, cur, table):
+        cur.execute("""
+            SELECT attname, format_type(atttypid, atttypmod), NOT attnotnull
+            FROM pg_attribute WHERE attrelid = %s::regclass AND attnum > 0 AND NOT attisdropped
+        """, (table,))
+        return {r[0]: r[1:] for r in cur.fetchall()}
+
+    def finish(self):
+        """Retract rows the last load took from a modified or removed file
+        and this one did not produce, then record the manifest and the rows
+        of this load and of its unchanged files. Does not commit."""
+        cur = self.conn.cursor()
+        cur.execute("SELECT table_name, row_key, path FROM source_rows WHERE state_code = %s",
+                    (self.state_code,))
+        # A key recorded with fewer columns than the table is tracked by now
+        # is matched on those columns only, so it is retracted just when this
+        # load wrote no row under it
+        current = {}                # (table, key columns) -> {key json}
+        stale = defaultdict(list)   # (table, key columns) -> [values]
+        kept = {}                   # (table, key json) -> path, of unchanged files
+        for table, row_key, path in cur.fetchall():
+            cols = tuple(sorted(row_key))
+            if (table, cols) not in current:
+                current[(table, cols)] = self._produced_keys(table, cols)
+            if _key_json(row_key) in current[(table, cols)]:
+                continue
+            if path in self._unchanged:
+                kept[(table, _key_json(row_key))] = path
+            else:
+                stale[(table, cols)].append(tuple(row_key[c] for c in cols))
+        for (table, cols), keys in sorted(stale.items()):
+            # Values come back from JSON: cast each to its column's type, and
+            # match a nullable column NULL-safely
+            types = self._column_types(cur, table)
+            match = ' AND '.join(
+                f"t.{c} {'IS NOT DISTINCT FROM' if types[c][1] else '='} v.{c}::{types[c][0]}"
+                for c in cols)
+            psycopg2.extras.execute_values(
+                cur, f"DELETE FROM {table} t USING (VALUES %s) AS v ({', '.join(cols)}) "
+                     f"WHERE {match}", keys, page_size=5000)
+            print(f"  Retracted {cur.rowcount} {table} rows no longer in the sources")
+        if kept:
+            print(f"  Kept {len(kept)} tracked rows of unchanged files")
+        rows = {**kept, **self._produced}
+
+        cur.execute("DELETE FROM source_rows WHERE state_code = %s", (self.state_code,))
+        psycopg2.extras.execute_values(cur, """
+            INSERT INTO source_rows (state_code, table_name, row_key, path) VALUES %s
+        """, [(self.state_code, table, row_key, path)
+              for (table, row_key), path in rows.items()], page_size=5000)
+
+        produced = Counter(rows.values())
+        cur.execute("DELETE FROM source_manifest WHERE state_code = %s", (self.state_code,))
+        psycopg2.extras.execute_values(cur, """
+            INSERT INTO source_manifest
+                (path, state_code, sha256, size_bytes, mtime_ns, parse_version, rows_produced)
+            VALUES %s
+        """, [(path, self.state_code, sha256, size, mtime_ns, self.parse_version,
+               produced.get(path, 0))
+              for path, (sha256, size, mtime_ns) in self.files.items()])
+        cur.close()
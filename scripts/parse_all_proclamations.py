@@ -11,7 +11,7 @@ import re
 import sys
 from datetime import datetime
 
-import pdfplumber
+import pdf_cache
 
 BASE_DIR = "/Users/openclaw/Documents/GraysonsDrawOdds"
 SEASON_YEAR = 2026
@@ -59,7 +59,7 @@ def parse_wy(species='elk'):
         return []
 
     rows = []
-    with pdfplumber.open(pdf_path) as pdf:
+    with pdf_cache.open(pdf_path) as pdf:
         for page in pdf.pages:
             tables = page.extract_tables()
             for table in tables:
@@ -124,7 +124,7 @@ def parse_nv():
         return []
 
     rows = []
-    with pdfplumber.open(pdf_path) as pdf:
+    with pdf_cache.open(pdf_path) as pdf:
         current_species = None
         for page in pdf.pages:
             text = page.extract_text() or ''
@@ -172,7 +172,7 @@ def parse_nv_text_fallback():
     """Fallback text parser for NV."""
     pdf_path = os.path.join(BASE_DIR, "NV/proclamations/2026/NV_big_game_seasons_2026.pdf")
     rows = []
-    with pdfplumber.open(pdf_path) as pdf:
+    with pdf_cache.open(pdf_path) as pdf:
         for page in pdf.pages:
             text = page.extract_text() or ''
             # NV format: hunt unit groups, weapon type, dates
@@ -208,7 +208,7 @@ def parse_az():
 
     rows = []
     in_elk = False
-    with pdfplumber.open(pdf_path) as pdf:
+    with pdf_cache.open(pdf_path) as pdf:
         for page in pdf.pages:
             text = page.extract_text() or ''
             if 'ELK' in text.upper():
@@ -259,7 +259,7 @@ def parse_generic_tables(state_code, pdf_filename, hunt_code_pattern=None):
         return []
 
     rows = []
-    with pdfplumber.open(pdf_path) as pdf:
+    with pdf_cache.open(pdf_path) as pdf:
         page_count = len(pdf.pages)
         print(f"  [{state_code}] PDF has {page_count} pages")
 
@@ -323,7 +323,7 @@ def parse_mt():
         return []
 
     rows = []
-    with pdfplumber.open(pdf_path) as pdf:
+    with pdf_cache.open(pdf_path) as pdf:
         print(f"  [MT] PDF has {len(pdf.pages)} pages")
         # MT regulations are complex with text-based seasons
         # Extract text and look for HD (hunting district) + date patterns
@@ -387,7 +387,7 @@ def parse_co():
         return []
 
     rows = []
-    with pdfplumber.open(pdf_path) as pdf:
+    with pdf_cache.open(pdf_path) as pdf:
         print(f"  [CO] PDF has {len(pdf.pages)} pages")
         for page_num, page in enumerate(pdf.pages):
             tables = page.extract_tables()
@@ -440,7 +440,7 @@ def parse_ut():
         return []
 
     rows = []
-    with pdfplumber.open(pdf_path) as pdf:
+    with pdf_cache.open(pdf_path) as pdf:
         print(f"  [UT] PDF has {len(pdf.pages)} pages")
         for page_num, page in enumerate(pdf.pages):
             text = page.extract_text() or ''
@@ -489,7 +489,7 @@ def parse_id():
         return []
 
     rows = []
-    with pdfplumber.open(pdf_path) as pdf:
+    with pdf_cache.open(pdf_path) as pdf:
         print(f"  [ID] PDF has {len(pdf.pages)} pages")
         for page_num, page in enumerate(pdf.pages):
             tables = page.extract_tables()
@@ -534,7 +534,7 @@ def parse_or():
         return []
 
     rows = []
-    with pdfplumber.open(pdf_path) as pdf:
+    with pdf_cache.open(pdf_path) as pdf:
         print(f"  [OR] PDF has {len(pdf.pages)} pages")
         for page_num, page in enumerate(pdf.pages):
             tables = page.extract_tables()
@@ -580,7 +580,7 @@ def parse_wa():
         return []
 
     rows = []
-    with pdfplumber.open(pdf_path) as pdf:
+    with pdf_cache.open(pdf_path) as pdf:
         print(f"  [WA] PDF has {len(pdf.pages)} pages")
         for page_num, page in enumerate(pdf.pages):
             tables = page.extract_tables()
@@ -622,7 +622,7 @@ def parse_ca():
         return []
 
     rows = []
-    with pdfplumber.open(pdf_path) as pdf:
+    with pdf_cache.open(pdf_path) as pdf:
         print(f"  [CA] PDF has {len(pdf.pages)} pages")
         for page_num, page in enumerate(pdf.pages):
             tables = page.extract_tables()
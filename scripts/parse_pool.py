@@ -0,0 +1,123 @@
+"""
+Parallel PDF parsing for the loaders.
+
+Each report PDF parses on its own, and pdfplumber is CPU-bound, so
+parse_files() fans a parser out over a process pool, one task per file:
+
+    for path, rows in zip(paths, parse_pool.parse_files(parse_draw_pdf, paths)):
+        ...
+
+Results come back in the order of `paths`, whichever worker finishes first,
+so a load merges them exactly as the old serial loop did. A parser whose pages
+parse independently (no state carried from one page to the next) can also
+take pages=, the 1-based page numbers to read, passed on to pdf_cache.open().
+With split_pages=True a file longer than PAGES_PER_TASK pages is then cut
+into page ranges. Each range runs as its own task, and the ranges are joined
+back in page order: lists are concatenated, dicts updated. parse_jobs()
+is the same with per-file arguments.
+
+Every call prints one line per file (pages, seconds in the worker) and a
+summary. DRAWS_PARSE_WORKERS sets the pool size (default every core; 1
+parses in-process).
+"""
+
+import atexit
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pdf_cache
+from loader_utils import timed
+
+WORKERS = int(os.environ.get("DRAWS_PARSE_WORKERS", "0")) or os.cpu_count() or 1
+PAGES_PER_TASK = 4
+
+_executor = None
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        # spawn, not fork: a loader holds an open database connection that a
+        # forked child must not inherit
+        _executor = ProcessPoolExecutor(
+            max_workers=WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        atexit.register(shutdown)
+    return _executor
+
+
+def shutdown():
+    """Stop the worker processes, if any were started."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True, cancel_futures=True)
+        _executor = None
+
+
+def _run(func, path, args, pages):
+    """One task: (result, seconds) for func(path, *args[, pages=pages])."""
+    start = time.perf_counter()
+    if pages is None:
+        result = func(path, *args)
+    else:
+        result = func(path, *args, pages=pages)
+    return result, time.perf_counter() - start
+
+
+def _join(parts):
+    """One file's page-range results, in page order."""
+    if len(parts) == 1:
+        return parts[0]
+    if isinstance(parts[0], dict):
+        joined = {}
+        for part in parts:
+            joined.update(part)
+        return joined
+    return [row for part in parts for row in part]
+
+
+def parse_files(func, paths, *args, split_pages=False):
+    """[func(path, *args) for path in paths], parsed in parallel.
+
+    split_pages: func takes pages= and returns a list or dict; cut files
+    longer than PAGES_PER_TASK pages into page ranges
+    """
+    return parse_jobs(func, [(path, args) for path in paths], split_pages)
+
+
+@timed('parse')
+def parse_jobs(func, jobs, split_pages=False):
+    """parse_files() with each file's own arguments: [func(path, *args) for
+    path, args in jobs]."""
+    start = time.perf_counter()
+    paths = [path for path, _ in jobs]
+    counts = [pdf_cache.page_count(path) for path in paths]
+    tasks = []          # (file index, pages or None)
+    for i, count in enumerate(counts):
+        if split_pages and count > PAGES_PER_TASK:
+            for first in range(1, count + 1, PAGES_PER_TASK):
+                tasks.append((i, list(range(first, min(first + PAGES_PER_TASK, count + 1)))))
+        else:
+            tasks.append((i, None))
+
+    if WORKERS > 1 and len(tasks) > 1:
+        futures = [_get_executor().submit(_run, func, paths[i], jobs[i][1], pages)
+                   for i, pages in tasks]
+        done = [f.result() for f in futures]
+    else:
+        done = [_run(func, paths[i], jobs[i][1], pages) for i, pages in tasks]
+
+    parts = [[] for _ in paths]
+    seconds = [0.0] * len(paths)
+    for (i, _), (result, secs) in zip(tasks, done):
+        parts[i].append(result)
+        seconds[i] += secs
+
+    for path, count, secs in zip(paths, counts, seconds):
+        print(f"    parsed {os.path.basename(path)}: {count} pages in {secs:.2f}s")
+    wall = time.perf_counter() - start
+    print(f"  {func.__name__}: {len(paths)} files, {sum(counts)} pages, "
+          f"{len(tasks)} tasks in {wall:.2f}s ({sum(seconds):.2f}s parsing, "
+          f"{min(WORKERS, len(tasks)) or 1} workers)")
+    return [_join(p) for p in parts]
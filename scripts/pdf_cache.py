@@ -0,0 +1,200 @@
+"""
+On-disk cache of what pdfplumber and PyMuPDF extract from the raw PDFs.
+
+The files under */raw_data never change once downloaded, yet every loader
+run used to extract every page again. open() is a drop-in for
+pdfplumber.open(). Its pages offer extract_text, extract_tables,
+extract_table and extract_words, and get_text for the loaders that read
+PyMuPDF's (fitz) text layout. Each result is stored in one SQLite file,
+zlib-compressed, keyed by the PDF's SHA-256, the page number, the method
+with its arguments, and the pdfplumber or PyMuPDF version. A re-run reads
+the results back and never opens the PDF:
+
+    with pdf_cache.open(filepath) as pdf:
+        for page in pdf.pages:
+            tables = page.extract_tables()
+
+DRAWS_PDF_CACHE names the cache file (default .pdf_cache.sqlite at the repo
+root); DRAWS_PDF_CACHE=off extracts every page afresh. A file's hash is
+remembered against its path, size and mtime, so unchanged files are not
+re-read to hash them either.
+
+Every write commits at once, so a process parsing a long PDF never holds
+the cache's write lock between pages: the loaders' parse workers and the
+states load_all.py runs side by side all fill the same file.
+"""
+
+import hashlib
+import io
+import json
+import os
+import sqlite3
+import zlib
+
+import pdfplumber
+
+CACHE_PATH = os.environ.get(
+    'DRAWS_PDF_CACHE',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '.pdf_cache.sqlite'))
+
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS files (
+        path        TEXT PRIMARY KEY,
+        size        INTEGER NOT NULL,
+        mtime_ns    INTEGER NOT NULL,
+        sha256      TEXT NOT NULL,
+        pages       INTEGER NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS pages (
+        sha256      TEXT NOT NULL,
+        page        INTEGER NOT NULL,
+        method      TEXT NOT NULL,
+        payload     BLOB NOT NULL,
+        PRIMARY KEY (sha256, page, method)
+    )
+    """,
+]
+
+# Seconds a writer waits for another process's write to finish
+LOCK_TIMEOUT = 60
+
+_db = None
+_db_pid = None
+
+
+def _connect():
+    """This process's cache connection (one per process, so pool workers
+    never share a handle)."""
+    global _db, _db_pid
+    if _db is None or _db_pid != os.getpid():
+        _db = sqlite3.connect(CACHE_PATH, timeout=LOCK_TIMEOUT)
+        _db.execute("PRAGMA journal_mode=WAL")
+        for stmt in SCHEMA:
+            _db.execute(stmt)
+        _db.commit()
+        _db_pid = os.getpid()
+    return _db
+
+
+def file_sha256(filepath):
+    h = hashlib.sha256()
+    with io.open(filepath, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def open(filepath, pages=None):
+    """Cached stand-in for pdfplumber.open(filepath, pages=pages): pages, if
+    given, are the 1-based page numbers to keep."""
+    return CachedPDF(filepath, pages)
+
+
+def page_count(filepath):
+    with open(filepath) as pdf:
+        return len(pdf.pages)
+
+
+class CachedPDF:
+    def __init__(self, filepath, pages=None):
+        self.path = os.path.abspath(filepath)
+        self._pdf = None
+        self._doc = None
+        if CACHE_PATH == 'off':
+            self.sha256 = None
+            self.pages = [CachedPage(self, i) for i in range(len(self._open().pages))
+                          if pages is None or i + 1 in pages]
+            return
+        db = _connect()
+        st = os.stat(self.path)
+        row = db.execute("SELECT sha256, pages FROM files WHERE path = ? AND size = ? "
+                         "AND mtime_ns = ?", (self.path, st.st_size, st.st_mtime_ns)).fetchone()
+        if row:
+            self.sha256, count = row
+        else:
+            self.sha256 = file_sha256(self.path)
+            count = len(self._open().pages)
+            db.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)",
+                       (self.path, st.st_size, st.st_mtime_ns, self.sha256, count))
+            db.commit()
+        self.pages = [CachedPage(self, i) for i in range(count)
+                      if pages is None or i + 1 in pages]
+
+    def _open(self):
+        if self._pdf is None:
+            self._pdf = pdfplumber.open(self.path)
+        return self._pdf
+
+    def _open_fitz(self):
+        if self._doc is None:
+            # Only the get_text loaders need PyMuPDF
+            import fitz
+            self._doc = fitz.open(self.path)
+        return self._doc
+
+    def _run(self, index, method, kwargs):
+        if method == 'get_text':
+            return self._open_fitz()[index].get_text(**kwargs)
+        return getattr(self._open().pages[index], method)(**kwargs)
+
+    def _extract(self, index, method, kwargs):
+        if self.sha256 is None:
+            return self._run(index, method, kwargs)
+        if method == 'get_text':
+            import fitz
+            version = f"fitz {fitz.VersionBind}"
+        else:
+            version = pdfplumber.__version__
+        key = json.dumps([method, kwargs, version], sort_keys=True, default=str)
+        db = _connect()
+        row = db.execute("SELECT payload FROM pages WHERE sha256 = ? AND page = ? AND method = ?",
+                         (self.sha256, index, key)).fetchone()
+        if row:
+            return json.loads(zlib.decompress(row[0]))
+        result = self._run(index, method, kwargs)
+        db.execute("INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?)",
+                   (self.sha256, index, key, zlib.compress(json.dumps(result).encode(), 6)))
+        db.commit()
+        return result
+
+    def close(self):
+        if self._pdf is not None:
+            self._pdf.close()
+            self._pdf = None
+        if self._doc is not None:
+            self._doc.close()
+            self._doc = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class CachedPage:
+    def __init__(self, pdf, index):
+        self._pdf = pdf
+        self._index = index
+        self.page_number = index + 1
+
+    def extract_text(self, **kwargs):
+        return self._pdf._extract(self._index, 'extract_text', kwargs)
+
+    def extract_tables(self, table_settings=None):
+        return self._pdf._extract(self._index, 'extract_tables',
+                                  {'table_settings': table_settings})
+
+    def extract_table(self, table_settings=None):
+        return self._pdf._extract(self._index, 'extract_table',
+                                  {'table_settings': table_settings})
+
+    def extract_words(self, **kwargs):
+        return self._pdf._extract(self._index, 'extract_words', kwargs)
+
+    def get_text(self, option='text'):
+        """PyMuPDF's page.get_text(option), as fitz returns it."""
+        return self._pdf._extract(self._index, 'get_text', {'option': option})
@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""
+Offline precompute stage: derived columns and tables the app reads but never
+writes. Run after any load (loader_utils.finish_load does this automatically)
+or by hand:
+
+    python scripts/precompute.py
+"""
+
+import os
+import sys
+import time
+from collections import defaultdict
+
+import psycopg2
+import psycopg2.extras
+
+from loader_utils import DB_CONFIG
+
+# The draw-odds engines live with the app (app/odds)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+from odds import curves  # noqa: E402
+
+
+# ─── NM season labels ────────────────────────────────────────────────
+# "First Rifle Bull", "Archery Either Sex", ... Hunts sharing the same GMU set,
+# weapon and sex are numbered First/Second/... in start-date order; a lone
+# hunt in its group gets no ordinal.
+SEASON_LABELS_SQL = """
+WITH base AS (
+    SELECT h.hunt_id, h.hunt_code, wt.weapon_code, hd.start_date,
+           array_agg(DISTINCT g.gmu_code ORDER BY g.gmu_code) AS gmu_codes,
+           CASE UPPER(COALESCE(wt.weapon_code, ''))
+               WHEN 'RIFLE'   THEN 'Rifle'
+               WHEN 'ARCHERY' THEN 'Archery'
+               WHEN 'MUZZ'    THEN 'Muzzleloader'
+               WHEN 'ANY'     THEN 'Any Weapon'
+               WHEN 'SRW'     THEN 'Short-Range'
+               WHEN 'SHOTGUN' THEN 'Shotgun'
+               ELSE wt.weapon_code
+           END AS weapon,
+           CASE
+               WHEN UPPER(bl.bag_code) = 'A'
+                    OR LOWER(bl.label) LIKE '%%antlerless%%'  THEN 'Antlerless'
+               WHEN LOWER(bl.label) LIKE '%%cow%%'            THEN 'Cow'
+               WHEN LOWER(bl.label) LIKE '%%either sex%%'
+                    OR UPPER(bl.bag_code) = 'ES'             THEN 'Either Sex'
+               WHEN LOWER(bl.label) LIKE '%%mature bull%%'
+                    OR UPPER(bl.bag_code) = 'MB'             THEN 'Bull'
+               WHEN LOWER(bl.label) LIKE '%%spike%%'          THEN 'Spike'
+               WHEN LOWER(bl.label) LIKE '%%fork%%'           THEN 'Fork Antlered'
+               WHEN LOWER(bl.label) LIKE '%%doe%%'            THEN 'Doe'
+               WHEN LOWER(bl.label) LIKE '%%buck%%'           THEN 'Buck'
+               WHEN LOWER(bl.label) LIKE '%%ram%%'            THEN 'Ram'
+               WHEN LOWER(bl.label) LIKE '%%ewe%%'            THEN 'Ewe'
+               ELSE bl.bag_code
+           END AS sex
+    FROM hunts h
+    JOIN states st ON st.state_id = h.state_id
+    LEFT JOIN weapon_types wt ON wt.weapon_type_id = h.weapon_type_id
+    LEFT JOIN bag_limits bl ON bl.bag_limit_id = h.bag_limit_id
+    LEFT JOIN (
+        SELECT DISTINCT ON (hunt_id) hunt_id, start_date
+        FROM hunt_dates ORDER BY hunt_id, season_year DESC
+    ) hd ON hd.hunt_id = h.hunt_id
+    LEFT JOIN hunt_gmus hg ON hg.hunt_id = h.hunt_id
+    LEFT JOIN gmus g ON g.gmu_id = hg.gmu_id
+    WHERE st.state_code = %(state_code)s AND h.is_active = 1
+    GROUP BY h.hunt_id, h.hunt_code, wt.weapon_code, bl.bag_code, bl.label,
+             hd.start_date
+),
+numbered AS (
+    SELECT hunt_id, weapon, sex,
+           COUNT(*) OVER grp AS group_size,
+           ROW_NUMBER() OVER (grp ORDER BY COALESCE(start_date::text, '9999'),
+                                         hunt_code COLLATE "C") AS idx
+    FROM base
+    WINDOW grp AS (PARTITION BY gmu_codes, weapon_code, sex)
+),
+labels AS (
+    SELECT hunt_id,
+           NULLIF(CONCAT_WS(' ',
+               CASE WHEN group_size > 1 AND idx <= 6 THEN
+                   (ARRAY['First', 'Second', 'Third', 'Fourth', 'Fifth', 'Sixth'])[idx]
+               END,
+               NULLIF(weapon, ''),
+               NULLIF(sex, '')), '') AS season_label
+    FROM numbered
+)
+UPDATE hunts h SET season_label = l.season_label
+FROM labels l
+WHERE h.hunt_id = l.hunt_id
+  AND h.season_label IS DISTINCT FROM l.season_label
+"""
+
+
+def compute_season_labels(conn, state_code='NM'):
+    """Rewrite hunts.season_label for one state in a single UPDATE.
+
+    Returns the number of labels that changed.
+    """
+    cur = conn.cursor()
+    cur.execute(SEASON_LABELS_SQL, {'state_code': state_code})
+    return cur.rowcount
+
+
+# ─── hunt_latest / hunt_latest_draw ──────────────────────────────────
+# One row per hunt with its most recent season dates, most recent Public
+# harvest stats and most recent draw year; plus that draw year's results for
+# each pool. setup_db.py creates both tables from these SELECTs, so column
+# types always match the source tables.
+HUNT_LATEST_SELECT = """
+SELECT h.hunt_id,
+       ld.latest_draw_year,
+       hd.season_year AS dates_season_year,
+       hd.start_date  AS open_date,
+       hd.end_date    AS close_date,
+       hd.hunt_name,
+       hs.harvest_year,
+       hs.success_rate,
+       hs.days_hunted
+FROM hunts h
+LEFT JOIN (
+    SELECT DISTINCT ON (hunt_id) hunt_id, season_year, start_date, end_date, hunt_name
+    FROM hunt_dates
+    ORDER BY hunt_id, season_year DESC
+) hd ON hd.hunt_id = h.hunt_id
+LEFT JOIN (
+    SELECT DISTINCT ON (hunt_id) hunt_id, harvest_year, success_rate, days_hunted
+    FROM harvest_stats
+    WHERE access_type = 'Public'
+    ORDER BY hunt_id, harvest_year DESC
+) hs ON hs.hunt_id = h.hunt_id
+LEFT JOIN (
+    SELECT hunt_id, MAX(draw_year) AS latest_draw_year
+    FROM draw_results_by_pool
+    GROUP BY hunt_id
+) ld ON ld.hunt_id = h.hunt_id
+"""
+
+# "Latest" is per hunt, not per pool: a pool with no row in the hunt's most
+# recent draw year has no row here, matching how results were always compared.
+HUNT_LATEST_DRAW_SELECT = """
+SELECT dr.hunt_id, dr.pool_id, dr.draw_year,
+       dr.applications, dr.tags_available, dr.tags_awarded,
+       dr.avg_pts_drawn, dr.min_pts_drawn
+FROM draw_results_by_pool dr
+JOIN (
+    SELECT hunt_id, MAX(draw_year) AS draw_year
+    FROM draw_results_by_pool
+    GROUP BY hunt_id
+) ld ON ld.hunt_id = dr.hunt_id AND ld.draw_year = dr.draw_year
+"""
+
+
+def refresh_hunt_latest(conn):
+    """Rebuild hunt_latest and hunt_latest_draw. Returns hunt_latest's row count.
+
+    DELETE + INSERT rather than TRUNCATE so readers keep seeing the old rows
+    until the loader commits, instead of blocking on an exclusive lock.
+    """
+    cur = conn.cursor()
+    cur.execute("DELETE FROM hunt_latest_draw")
+    cur.execute("INSERT INTO hunt_latest_draw " + HUNT_LATEST_DRAW_SELECT)
+    cur.execute("DELETE FROM hunt_latest")
+    cur.execute("INSERT INTO hunt_latest " + HUNT_LATEST_SELECT)
+    return cur.rowcount
+
+
+# ─── hunt_rankings ───────────────────────────────────────────────────
+# /api/recommend's candidate set, scored ahead of time: one row per
+# (hunt, pool, draw_year) with usable odds and a Public success rate.
+# Tier thresholds and the score formula must stay in step with
+# app/server.py (NOTE_TEMPLATES). Executed without parameters, so '%' is a
+# plain LIKE wildcard here.
+HUNT_RANKINGS_SELECT = """
+SELECT c.*,
+       (c.draw_odds * 100) * 0.4 + c.success_rate * 0.6 AS score,
+       CASE WHEN c.draw_odds >= 0.25 THEN 'high'
+            WHEN c.draw_odds >= 0.10 THEN 'mid'
+            ELSE 'low' END AS tier
+FROM (
+    SELECT dr.hunt_id, dr.pool_id, dr.draw_year, h.state_id, h.species_id, h.hunt_code,
+           dr.draw_year = hl.latest_draw_year AS is_latest,
+           LOWER(COALESCE(h.unit_description, '')) LIKE '%youth%'
+               OR LOWER(COALESCE(hl.hunt_name, '')) LIKE '%youth%' AS is_youth,
+           LOWER(COALESCE(h.unit_description, '')) LIKE '%mobility%'
+               OR LOWER(COALESCE(hl.hunt_name, '')) LIKE '%mobility%' AS is_mobility,
+           CAST(dr.tags_awarded AS DOUBLE PRECISION) / dr.applications AS draw_odds,
+           hl.success_rate,
+           hl.harvest_year,
+           MOD(ASCII(RIGHT(h.hunt_code, 1)), 3) AS note_variant
+    FROM draw_results_by_pool dr
+    JOIN hunts h ON h.hunt_id = dr.hunt_id AND h.is_active = 1
+    JOIN hunt_latest hl ON hl.hunt_id = dr.hunt_id
+    WHERE dr.applications > 0 AND dr.tags_awarded > 0
+      AND hl.success_rate IS NOT NULL
+) c
+"""
+
+
+def refresh_hunt_rankings(conn):
+    """Rebuild hunt_rankings from draw results and hunt_latest."""
+    cur = conn.cursor()
+    cur.execute("DELETE FROM hunt_rankings")
+    cur.execute("INSERT INTO hunt_rankings " + HUNT_RANKINGS_SELECT)
+    return cur.rowcount
+
+
+# ─── point_forecasts ─────────────────────────────────────────────────
+# Point creep: a least-squares line through each (hunt, pool)'s minimum and
+# average points drawn over every draw year, fitted for all of them at once
+# by Postgres' regr_* aggregates. One draw year gives a flat line. Rows hold
+# the projected cut-offs for the next FORECAST_SEASONS seasons, and how many
+# applications someone starting at 0 points next season needs (one point a
+# year) to hold the projected minimum: the first j with j - 1 >= base +
+# creep * j. NULL when the cut-off climbs a point a year or faster.
+FORECAST_SEASONS = 5
+
+POINT_FORECASTS_SELECT = """
+SELECT f.hunt_id, f.pool_id, f.latest_draw_year, f.years_of_history,
+       CAST(f.creep AS REAL) AS creep_per_year,
+       ARRAY(SELECT CAST(GREATEST(f.base_min + f.creep * k, 0) AS REAL)
+             FROM generate_series(1, {seasons}) k ORDER BY k) AS projected_min_pts,
+       CASE WHEN f.base_avg IS NOT NULL THEN
+           ARRAY(SELECT CAST(GREATEST(f.base_avg + f.avg_creep * k, 0) AS REAL)
+                 FROM generate_series(1, {seasons}) k ORDER BY k)
+       END AS projected_avg_pts,
+       CASE WHEN f.creep < 1 THEN
+           CAST(CEIL((GREATEST(f.base_min, 0) + 1) / (1 - f.creep)) AS INTEGER)
+       END AS years_to_draw
+FROM (
+    SELECT s.*,
+           s.mean_min + s.creep * (s.latest_draw_year - s.mean_year) AS base_min,
+           s.mean_avg + s.avg_creep * (s.latest_draw_year - s.mean_avg_year) AS base_avg
+    FROM (
+        SELECT dr.hunt_id, dr.pool_id,
+               COUNT(*) AS years_of_history,
+               MAX(dr.draw_year) AS latest_draw_year,
+               AVG(dr.draw_year) AS mean_year,
+               AVG(dr.min_pts_drawn) AS mean_min,
+               COALESCE(regr_slope(dr.min_pts_drawn, dr.draw_year), 0) AS creep,
+               regr_avgx(dr.avg_pts_drawn, dr.draw_year) AS mean_avg_year,
+               regr_avgy(dr.avg_pts_drawn, dr.draw_year) AS mean_avg,
+               COALESCE(regr_slope(dr.avg_pts_drawn, dr.draw_year), 0) AS avg_creep
+        FROM draw_results_by_pool dr
+        JOIN hunts h ON h.hunt_id = dr.hunt_id
+        JOIN states st ON st.state_id = h.state_id
+        WHERE st.point_math IS NOT NULL AND dr.min_pts_drawn IS NOT NULL
+        GROUP BY dr.hunt_id, dr.pool_id
+    ) s
+) f
+""".format(seasons=FORECAST_SEASONS)
+
+
+def refresh_point_forecasts(conn):
+    """Rebuild point_forecasts from the full draw_results_by_pool history."""
+    cur = conn.cursor()
+    cur.execute("DELETE FROM point_forecasts")
+    cur.execute("INSERT INTO point_forecasts " + POINT_FORECASTS_SELECT)
+    return cur.rowcount
+
+
+# ─── point_odds ──────────────────────────────────────────────────────
+# Modelled draw odds at every balance from 0 to curves.MAX_POINTS for each
+# (hunt, pool)'s latest year of point-level demand, from the same engines
+# /api/odds_by_points uses; /api/my_odds reads one element per hunt. Each
+# state's pools go through its engine as one batch.
+POINT_ODDS_DEMAND_SQL = """
+SELECT b.hunt_id, b.pool_id, b.draw_year, st.state_code, st.point_math,
+       b.points, b.applications, b.successes, dr.tags_available, dr.random_tags,
+       bp.first_drawn AS bonus_pass_tags, rp.first_drawn AS random_pass_tags
+FROM draw_results_by_points b
+JOIN (
+    SELECT hunt_id, pool_id, MAX(draw_year) AS draw_year
+    FROM draw_results_by_points
+    GROUP BY hunt_id, pool_id
+) ly ON ly.hunt_id = b.hunt_id AND ly.pool_id = b.pool_id AND ly.draw_year = b.draw_year
+JOIN hunts h ON h.hunt_id = b.hunt_id
+JOIN states st ON st.state_id = h.state_id
+LEFT JOIN draw_results_by_pool dr ON dr.hunt_id = b.hunt_id
+    AND dr.draw_year = b.draw_year AND dr.pool_id = b.pool_id
+LEFT JOIN draw_results_by_pass bp ON bp.hunt_id = b.hunt_id
+    AND bp.draw_year = b.draw_year AND bp.pool_id = b.pool_id AND bp.draw_pass = 'bonus'
+LEFT JOIN draw_results_by_pass rp ON rp.hunt_id = b.hunt_id
+    AND rp.draw_year = b.draw_year AND rp.pool_id = b.pool_id AND rp.draw_pass = '1-2'
+ORDER BY st.state_code, b.hunt_id, b.pool_id, b.points
+"""
+
+
+def refresh_point_odds(conn):
+    """Rebuild point_odds: one odds curve per (hunt, pool) with point-level data."""
+    cur = conn.cursor()
+    cur.execute(POINT_ODDS_DEMAND_SQL)
+    cols = [d[0] for d in cur.description]
+    by_state = defaultdict(dict)
+    for row in cur.fetchall():
+        r = dict(zip(cols, row))
+        key = (r['hunt_id'], r['pool_id'], r['draw_year'])
+        by_state[(r['state_code'], r['point_math'])].setdefault(key, []).append(r)
+
+    rows = []
+    for (state_code, point_math), pools in by_state.items():
+        model = curves.draw_model(state_code, point_math)
+        if model is None:
+            continue
+        model, rule = model
+        levels = list(pools.values())
+        demand = [{r['points']: r['applications'] for r in lv} for lv in levels]
+        tags, random_tags = curves.pool_tags(levels, model, point_math)
+        odds, cutoffs = curves.level_curves(model, rule, demand, tags, random_tags,
+                                            curves.MAX_POINTS + 1)
+        for i, (hunt_id, pool_id, draw_year) in enumerate(pools):
+            cutoff = int(cutoffs[i]) if cutoffs is not None and cutoffs[i] >= 0 else None
+            rows.append((hunt_id, pool_id, draw_year, model, cutoff,
+                         [round(float(x), 4) for x in odds[i]]))
+
+    cur.execute("DELETE FROM point_odds")
+    psycopg2.extras.execute_values(cur, """
+        INSERT INTO point_odds (hunt_id, pool_id, draw_year, model, cutoff_points, odds)
+        VALUES %s
+    """, rows, page_size=1000)
+    return len(rows)
+
+
+# ─── Driver ──────────────────────────────────────────────────────────
+# Each stage with the tables (or table.column) it needs beyond the base
+# schema, all created by scripts/setup_db.py
+STAGES = [
+    ('season_labels', compute_season_labels, ('hunts.season_label',)),
+    ('hunt_latest', refresh_hunt_latest, ('hunt_latest', 'hunt_latest_draw')),
+    ('hunt_rankings', refresh_hunt_rankings,    # reads hunt_latest
+     ('hunt_latest', 'hunt_rankings')),
+    ('point_forecasts', refresh_point_forecasts, ('point_forecasts',)),
+    ('point_odds', refresh_point_odds,
+     ('point_odds', 'draw_results_by_points', 'draw_results_by_pass',
+      'draw_results_by_pool.random_tags')),
+]
+
+
+def _missing(conn, names):
+    """The names ('table' or 'table.column') that do not exist."""
+    cur = conn.cursor()
+    missing = []
+    for name in names:
+        table, _, column = name.partition('.')
+        if column:
+            cur.execute("SELECT 1 FROM pg_attribute WHERE attrelid = to_regclass(%s) "
+                        "AND attname = %s AND NOT attisdropped", (table, column))
+            found = cur.fetchone() is not None
+        else:
+            cur.execute("SELECT to_regclass(%s) IS NOT NULL", (table,))
+            found = cur.fetchone()[0]
+        if not found:
+            missing.append(name)
+    cur.close()
+    return missing
+
+
+def run_all(conn):
+    """Run every precompute stage in the caller's transaction.
+
+    The tables are checked first, so a database setup_db.py has not caught
+    up with skips the stages that need them, with a warning, instead of
+    failing the load that called this.
+    """
+    runnable = []
+    for name, stage, needs in STAGES:
+        missing = _missing(conn, needs)
+        if missing:
+            print(f"  WARNING: precompute {name} skipped, {', '.join(missing)} missing — "
+                  "run scripts/setup_db.py")
+        else:
+            runnable.append((name, stage))
+    for name, stage in runnable:
+        t0 = time.perf_counter()
+        n = stage(conn)
+        print(f"  precompute {name}: {n} rows ({time.perf_counter() - t0:.2f}s)")
+
+
+def main():
+    conn = psycopg2.connect(**DB_CONFIG)
+    run_all(conn)
+    conn.commit()
+    conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Create the app-support tables that sit alongside the loaded draw data.
+
+Idempotent: safe to re-run after every deploy. Run this before starting the
+app or any loader against a fresh database. Ends by running the precompute
+stage so new summary tables start out populated.
+"""
+
+import psycopg2
+
+from loader_utils import DB_CONFIG, finish_load
+from precompute import (HUNT_LATEST_DRAW_SELECT, HUNT_LATEST_SELECT, HUNT_RANKINGS_SELECT,
+                        POINT_FORECASTS_SELECT)
+
+DDL = [
+    # Single-row counter bumped by every loader; the app tags cached
+    # responses with it and discards them when it moves.
+    """
+    CREATE TABLE IF NOT EXISTS data_version (
+        version     BIGINT NOT NULL,
+        updated_at  TIMESTAMPTZ NOT NULL DEFAULT now()
+    )
+    """,
+    """
+    INSERT INTO data_version (version)
+    SELECT 1 WHERE NOT EXISTS (SELECT 1 FROM data_version)
+    """,
+    # Written by precompute.compute_season_labels, read by /api/units
+    "ALTER TABLE hunts ADD COLUMN IF NOT EXISTS season_label TEXT",
+    # /api/hunts filters by state/species and pages by hunt_code
+    "CREATE INDEX IF NOT EXISTS hunts_state_species_code "
+    "ON hunts (state_id, species_id, hunt_code)",
+    # Applicants (and successes, where published) at each point level
+    # (load_az.py, load_mt_by_points.py, load_ca.py; load_co.py keeps only
+    # the drawn-out-at level). Read by /api/odds_by_points.
+    """
+    CREATE TABLE IF NOT EXISTS draw_results_by_points (
+        hunt_id         INTEGER NOT NULL,
+        draw_year       INTEGER NOT NULL,
+        pool_id         INTEGER NOT NULL,
+        points          SMALLINT NOT NULL,
+        applications    INTEGER NOT NULL,
+        successes       INTEGER,
+        PRIMARY KEY (hunt_id, draw_year, pool_id, points)
+    )
+    """,
+    # Each pass of a multi-pass draw (load_az.py: the Bonus, 1-2 and 3-4-5
+    # Passes). choice_applications are the choices the pass draws first (1st;
+    # 3rd in the 3-4-5 Pass), other_applications the rest; first_drawn is
+    # 1st choices drawn. Read by the passes engine (app/odds/passes.py).
+    """
+    CREATE TABLE IF NOT EXISTS draw_results_by_pass (
+        hunt_id             INTEGER NOT NULL,
+        draw_year           INTEGER NOT NULL,
+        pool_id             INTEGER NOT NULL,
+        draw_pass           TEXT NOT NULL,
+        tags_available      INTEGER,
+        choice_applications INTEGER,
+        other_applications  INTEGER,
+        first_drawn         INTEGER,
+        tags_issued         INTEGER,
+        PRIMARY KEY (hunt_id, draw_year, pool_id, draw_pass)
+    )
+    """,
+    # Tags drawn at random rather than down the point queue, where the
+    # state publishes the split (CA)
+    "ALTER TABLE draw_results_by_pool ADD COLUMN IF NOT EXISTS random_tags INTEGER",
+    # NM applications take three hunt choices; older seeds said one, which
+    # /api/application_plan enforces
+    "UPDATE states SET choices_per_app = 3 WHERE state_code = 'NM' AND choices_per_app = 1",
+    # Per-hunt "latest" summaries, rebuilt by precompute.refresh_hunt_latest
+    f"CREATE TABLE IF NOT EXISTS hunt_latest AS {HUNT_LATEST_SELECT} WITH NO DATA",
+    "CREATE UNIQUE INDEX IF NOT EXISTS hunt_latest_hunt_id ON hunt_latest (hunt_id)",
+    f"CREATE TABLE IF NOT EXISTS hunt_latest_draw AS {HUNT_LATEST_DRAW_SELECT} WITH NO DATA",
+    "CREATE UNIQUE INDEX IF NOT EXISTS hunt_latest_draw_hunt_pool "
+    "ON hunt_latest_draw (hunt_id, pool_id)",
+    # /api/recommend top-K, rebuilt by precompute.refresh_hunt_rankings.
+    # The partial-index predicates must match the endpoint's WHERE clause.
+    f"CREATE TABLE IF NOT EXISTS hunt_rankings AS {HUNT_RANKINGS_SELECT} WITH NO DATA",
+    "CREATE UNIQUE INDEX IF NOT EXISTS hunt_rankings_key "
+    "ON hunt_rankings (hunt_id, pool_id, draw_year)",
+    "CREATE INDEX IF NOT EXISTS hunt_rankings_latest_top "
+    "ON hunt_rankings (state_id, species_id, pool_id, score DESC, draw_odds DESC) "
+    "WHERE is_latest AND NOT is_youth AND NOT is_mobility",
+    "CREATE INDEX IF NOT EXISTS hunt_rankings_year_top "
+    "ON hunt_rankings (state_id, species_id, pool_id, draw_year, score DESC, draw_odds DESC) "
+    "WHERE NOT is_youth AND NOT is_mobility",
+    # Projected point cut-offs, rebuilt by precompute.refresh_point_forecasts
+    f"CREATE TABLE IF NOT EXISTS point_forecasts AS {POINT_FORECASTS_SELECT} WITH NO DATA",
+    "CREATE UNIQUE INDEX IF NOT EXISTS point_forecasts_hunt_pool "
+    "ON point_forecasts (hunt_id, pool_id)",
+    # Odds at every point balance (odds[p + 1] is p points), rebuilt by
+    # precompute.refresh_point_odds, read by /api/my_odds
+    """
+    CREATE TABLE IF NOT EXISTS point_odds (
+        hunt_id         INTEGER NOT NULL,
+        pool_id         INTEGER NOT NULL,
+        draw_year       INTEGER NOT NULL,
+        model           TEXT NOT NULL,
+        cutoff_points   SMALLINT,
+        odds            REAL[] NOT NULL,
+        PRIMARY KEY (hunt_id, pool_id)
+    )
+    """,
+    # Raw files behind each state's last successful load; a loader whose
+    # files all match skips the run (scripts/manifest.py). path is relative
+    # to the data root, e.g. AZ/raw_data/2025-Fall-Draw-1-2-Pass.pdf
+    """
+    CREATE TABLE IF NOT EXISTS source_manifest (
+        path            TEXT PRIMARY KEY,
+        state_code      TEXT NOT NULL,
+        sha256          TEXT NOT NULL,
+        size_bytes      BIGINT NOT NULL,
+        mtime_ns        BIGINT NOT NULL,
+        parse_version   TEXT NOT NULL,
+        rows_produced   INTEGER NOT NULL DEFAULT 0,
+        loaded_at       TIMESTAMPTZ NOT NULL DEFAULT now()
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS source_manifest_state ON source_manifest (state_code)",
+    # Rows written by each state's last load, by UNIQUE key ({column: value}),
+    # with the file each came from; a reload deletes the ones it no longer
+    # produces
+    """
+    CREATE TABLE IF NOT EXISTS source_rows (
+        state_code      TEXT NOT NULL,
+        table_name      TEXT NOT NULL,
+        row_key         JSONB NOT NULL,
+        path            TEXT,
+        PRIMARY KEY (state_code, table_name, row_key)
+    )
+    """,
+]
+
+
+def main():
+    conn = psycopg2.connect(**DB_CONFIG)
+    cur = conn.cursor()
+    for stmt in DDL:
+        cur.execute(stmt)
+    conn.commit()
+    # Fill any summary table that was just created
+    finish_load(conn)
+    print("Schema ready.")
+    conn.close()
+
+
+if __name__ == '__main__':
+    main()
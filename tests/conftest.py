@@ -0,0 +1,9 @@
+import os
+import sys
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The loaders import each other as top-level modules from scripts/, and the
+# app's modules (server, cache, odds, ...) from app/
+sys.path.insert(0, os.path.join(REPO_DIR, 'scripts'))
+sys.path.insert(0, os.path.join(REPO_DIR, 'app'))
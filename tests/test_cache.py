@@ -0,0 +1,78 @@
+"""app/cache.py: entries live until data_version moves."""
+
+import pytest
+
+import cache
+
+
+class FakeConn:
+    """Answers SELECT max(version) FROM data_version with .version."""
+
+    def __init__(self, version):
+        self.version = version
+        self.queries = 0
+
+    def cursor(self):
+        return self
+
+    def execute(self, sql):
+        self.queries += 1
+
+    def fetchone(self):
+        return (self.version,)
+
+
+@pytest.fixture
+def conn(monkeypatch):
+    monkeypatch.setattr(cache, "_entries", {})
+    monkeypatch.setattr(cache, "_version", cache._UNCHECKED)
+    monkeypatch.setattr(cache, "_checked_at", 0.0)
+    monkeypatch.setattr(cache, "counters", dict.fromkeys(cache.counters, 0))
+    return FakeConn(1)
+
+
+def test_hit_until_the_version_moves(conn, monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: clock[0])
+    loads = []
+
+    def loader():
+        loads.append(conn.version)
+        return f"rows@{conn.version}"
+
+    assert cache.get_or_load(("hunts", "elk"), loader, lambda: conn) == "rows@1"
+    assert cache.get_or_load(("hunts", "elk"), loader, lambda: conn) == "rows@1"
+    assert loads == [1]
+    # Within VERSION_TTL the version is not even re-read
+    assert conn.queries == 1
+
+    # A loader bumps the version: stale until the TTL runs out, then reloaded
+    conn.version = 2
+    assert cache.get_or_load(("hunts", "elk"), loader, lambda: conn) == "rows@1"
+    clock[0] += cache.VERSION_TTL
+    assert cache.get_or_load(("hunts", "elk"), loader, lambda: conn) == "rows@2"
+    assert loads == [1, 2]
+    assert cache.stats() == {"version": 2, "entries": 1, "hits": 2, "misses": 2,
+                             "invalidations": 1, "version_checks": 2}
+
+    # An unchanged version keeps the entries
+    clock[0] += cache.VERSION_TTL
+    assert cache.get_or_load(("hunts", "elk"), loader, lambda: conn) == "rows@2"
+    assert loads == [1, 2]
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_nothing_cached_without_a_data_version(conn):
+    conn.version = None
+    loads = []
+    for _ in range(2):
+        cache.get_or_load("key", lambda: loads.append(1), lambda: conn)
+    assert len(loads) == 2
+    assert cache.stats()["entries"] == 0
+
+
+def test_oldest_entry_evicted_at_max_entries(conn, monkeypatch):
+    monkeypatch.setattr(cache, "MAX_ENTRIES", 2)
+    for key in "abc":
+        cache.get_or_load(key, lambda: key, lambda: conn)
+    assert list(cache._entries) == ["b", "c"]
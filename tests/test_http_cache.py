@@ -0,0 +1,105 @@
+"""http_cache: ETags from the data version, 304s before the view, compression."""
+
+import gzip
+
+import pytest
+from flask import Flask, jsonify
+
+import http_cache
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    state = {"version": 7, "calls": 0}
+
+    @app.route("/api/hunts")
+    def hunts():
+        state["calls"] += 1
+        return jsonify(rows=[{"hunt_code": f"H{i:04d}"} for i in range(200)])
+
+    @app.route("/api/health")
+    def health():
+        return jsonify(ok=True)
+
+    http_cache.init_app(app, lambda: state["version"],
+                        {"hunts": http_cache.RESULTS, "health": http_cache.NO_STORE},
+                        release="test")
+    with app.test_client() as c:
+        yield c, state
+
+
+def test_etag_answers_304_without_running_the_view(client):
+    c, state = client
+    first = c.get("/api/hunts?species=elk")
+    assert first.status_code == 200
+    assert first.headers["Cache-Control"] == http_cache.RESULTS
+    etag = first.headers["ETag"]
+    assert etag.startswith('W/"')
+
+    again = c.get("/api/hunts?species=elk", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.headers["ETag"] == etag
+    assert again.headers["Cache-Control"] == http_cache.RESULTS
+    assert state["calls"] == 1
+
+    # Another query string is another resource
+    other = c.get("/api/hunts?species=deer", headers={"If-None-Match": etag})
+    assert other.status_code == 200
+    assert other.headers["ETag"] != etag
+
+
+def test_data_version_bump_changes_the_etag(client):
+    c, state = client
+    etag = c.get("/api/hunts").headers["ETag"]
+    state["version"] = 8
+    resp = c.get("/api/hunts", headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert resp.headers["ETag"] != etag
+
+
+def test_without_a_version_the_etag_hashes_the_body(client):
+    c, state = client
+    state["version"] = None
+    first = c.get("/api/hunts")
+    etag = first.headers["ETag"]
+    again = c.get("/api/hunts", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    # The view ran both times: only the body could be compared
+    assert state["calls"] == 2
+
+
+def test_no_store_endpoints_get_no_etag(client):
+    c, _ = client
+    resp = c.get("/api/health")
+    assert resp.headers["Cache-Control"] == http_cache.NO_STORE
+    assert "ETag" not in resp.headers
+
+
+def test_gzip_when_asked_and_large_enough(client, monkeypatch):
+    c, _ = client
+    monkeypatch.setattr(http_cache, "brotli", None)
+    plain = c.get("/api/hunts")
+    assert "Content-Encoding" not in plain.headers
+    assert "Accept-Encoding" in plain.headers["Vary"]
+
+    resp = c.get("/api/hunts", headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in resp.headers["Vary"]
+    assert gzip.decompress(resp.get_data()) == plain.get_data()
+
+    # Below COMPRESS_MIN_BYTES the body goes out as is
+    small = c.get("/api/health", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in small.headers
+
+
+def test_brotli_preferred_when_installed(client):
+    brotli = pytest.importorskip("brotli")
+    c, _ = client
+    plain = c.get("/api/hunts").get_data()
+    resp = c.get("/api/hunts", headers={"Accept-Encoding": "gzip, br"})
+    assert resp.headers["Content-Encoding"] == "br"
+    assert brotli.decompress(resp.get_data()) == plain
+
+    resp = c.get("/api/hunts", headers={"Accept-Encoding": "gzip;q=1.0, br;q=0.5"})
+    assert resp.headers["Content-Encoding"] == "gzip"
@@ -0,0 +1,103 @@
+"""/api/hunt_detail against the payload of its old per-part queries."""
+
+import psycopg2
+import pytest
+
+import db
+import server
+
+# The queries /api/hunt_detail ran before it became one statement
+OLD_HUNT_SQL = """
+    SELECT h.hunt_id, h.hunt_code,
+           COALESCE(h.hunt_code_display, h.hunt_code) AS hunt_label,
+           h.unit_description, h.season_type, h.tag_type, h.season_label,
+           wt.weapon_code, bl.bag_code, bl.label AS bag_label,
+           bl.plain_definition AS bag_definition
+    FROM hunts h
+    JOIN states st ON st.state_id = h.state_id
+    LEFT JOIN weapon_types wt ON wt.weapon_type_id = h.weapon_type_id
+    LEFT JOIN bag_limits bl ON bl.bag_limit_id = h.bag_limit_id
+    WHERE st.state_code = %s AND h.hunt_code = %s
+"""
+OLD_PART_SQL = {
+    "draw_history": """
+        SELECT dr.draw_year, p.pool_code, dr.applications, dr.tags_available,
+               dr.tags_awarded, dr.avg_pts_drawn, dr.min_pts_drawn
+        FROM draw_results_by_pool dr
+        JOIN pools p ON p.pool_id = dr.pool_id
+        WHERE dr.hunt_id = %s
+        ORDER BY dr.draw_year DESC, p.pool_code
+    """,
+    "harvest_history": """
+        SELECT harvest_year, access_type, success_rate, satisfaction,
+               days_hunted, licenses_sold
+        FROM harvest_stats
+        WHERE hunt_id = %s
+        ORDER BY harvest_year DESC, access_type
+    """,
+    "season_dates": """
+        SELECT season_year, start_date, end_date, hunt_name
+        FROM hunt_dates WHERE hunt_id = %s
+        ORDER BY season_year DESC
+    """,
+    "point_forecasts": """
+        SELECT p.pool_code, f.latest_draw_year, f.years_of_history,
+               f.creep_per_year, f.projected_min_pts, f.projected_avg_pts,
+               f.years_to_draw
+        FROM point_forecasts f
+        JOIN pools p ON p.pool_id = f.pool_id
+        WHERE f.hunt_id = %s
+        ORDER BY p.pool_code
+    """,
+}
+
+
+@pytest.fixture
+def conn():
+    try:
+        conn = psycopg2.connect(connect_timeout=3, **db.DB_CONFIG)
+    except psycopg2.OperationalError as e:
+        pytest.skip(f"no database: {e}")
+    yield conn
+    conn.close()
+
+
+def _sample_hunts(cur):
+    """A hunt of each state with the most history rows, so every part and
+    column type (dates, reals, arrays) shows up."""
+    cur.execute("""
+        SELECT DISTINCT ON (st.state_code) st.state_code, h.hunt_code
+        FROM hunts h
+        JOIN states st ON st.state_id = h.state_id
+        ORDER BY st.state_code,
+                 (SELECT COUNT(*) FROM draw_results_by_pool WHERE hunt_id = h.hunt_id)
+                 + (SELECT COUNT(*) FROM harvest_stats WHERE hunt_id = h.hunt_id)
+                 + (SELECT COUNT(*) FROM hunt_dates WHERE hunt_id = h.hunt_id)
+                 + (SELECT COUNT(*) FROM point_forecasts WHERE hunt_id = h.hunt_id) DESC,
+                 h.hunt_code
+    """)
+    return cur.fetchall()
+
+
+def _old_detail(cur, state_code, hunt_code):
+    cur.execute(OLD_HUNT_SQL, (state_code, hunt_code))
+    hunt = server.dict_rows(cur)[0]
+    for name, sql in OLD_PART_SQL.items():
+        cur.execute(sql, (hunt["hunt_id"],))
+        hunt[name] = server.dict_rows(cur)
+    return hunt
+
+
+def test_detail_matches_old_payload(conn):
+    cur = conn.cursor()
+    samples = _sample_hunts(cur)
+    if not samples:
+        pytest.skip("no hunts loaded")
+    client = server.app.test_client()
+    for state_code, hunt_code in samples:
+        with server.app.app_context():
+            old = server.jsonify(_old_detail(cur, state_code, hunt_code)).get_data()
+        resp = client.get("/api/hunt_detail",
+                          query_string={"state_code": state_code, "hunt_code": hunt_code})
+        assert resp.status_code == 200
+        assert resp.get_data() == old, (state_code, hunt_code)
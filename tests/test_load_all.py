@@ -0,0 +1,59 @@
+"""Two states' loaders at once, as load_all.py runs them, on one PDF cache."""
+
+import importlib
+import io
+import multiprocessing
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+
+import psycopg2
+import pytest
+
+import loader_utils
+
+STATES = ('CA', 'WY')
+
+
+def _load_and_roll_back(state_code, lock_timeout):
+    """Run a state's loaders in one transaction, as load_all.load_state does,
+    then roll it back. Returns state_code."""
+    import load_all
+    import pdf_cache
+    pdf_cache.LOCK_TIMEOUT = lock_timeout
+    with redirect_stdout(io.StringIO()):
+        loader_utils.begin_state()
+        try:
+            for name in load_all.LOADERS[state_code]:
+                importlib.import_module(name).main()
+        finally:
+            loader_utils.end_state(commit=False)
+    return state_code
+
+
+@pytest.fixture
+def database():
+    try:
+        psycopg2.connect(connect_timeout=3, **loader_utils.DB_CONFIG).close()
+    except psycopg2.OperationalError as e:
+        pytest.skip(f"no database: {e}")
+
+
+def test_two_states_fill_one_pdf_cache(database, tmp_path, monkeypatch):
+    cache_path = tmp_path / 'cache.sqlite'
+    monkeypatch.setenv('DRAWS_PDF_CACHE', str(cache_path))
+    monkeypatch.setenv('DRAWS_FULL_LOAD', '1')
+    monkeypatch.setenv('DRAWS_PARSE_WORKERS', '1')
+
+    # A state that had to wait out the other's parse would hit the short
+    # lock timeout and fail its whole transaction
+    with ProcessPoolExecutor(max_workers=len(STATES),
+                             mp_context=multiprocessing.get_context('spawn')) as pool:
+        futures = [pool.submit(_load_and_roll_back, state, 2) for state in STATES]
+        assert [f.result(timeout=600) for f in futures] == list(STATES)
+
+    db = sqlite3.connect(cache_path)
+    paths = [row[0] for row in db.execute("SELECT path FROM files")]
+    db.close()
+    for state in STATES:
+        assert any(f"/{state}/raw_data/" in path for path in paths), state
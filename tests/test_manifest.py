@@ -0,0 +1,74 @@
+"""manifest.Load against the database: per-file retraction, in a transaction
+that is rolled back."""
+
+import psycopg2
+import pytest
+
+import loader_utils
+import manifest
+
+STATE = 'ZZ'
+KEY = ('k', 'd')
+COLUMNS = ('k', 'd', 'v')
+
+
+@pytest.fixture
+def conn(monkeypatch):
+    try:
+        conn = psycopg2.connect(connect_timeout=3, **loader_utils.DB_CONFIG)
+    except psycopg2.OperationalError as e:
+        pytest.skip(f"no database: {e}")
+    monkeypatch.setattr(manifest, 'FULL_LOAD', False)
+    cur = conn.cursor()
+    # d is part of the key and nullable, as a date key column may be
+    cur.execute("CREATE TEMP TABLE manifest_probe (k INTEGER NOT NULL, d DATE, v TEXT, "
+                "UNIQUE (k, d))")
+    yield conn
+    conn.rollback()
+    conn.close()
+
+
+def _load(conn, base, files):
+    """One load of the probe table: files maps a file under ZZ/raw_data to
+    the rows it holds, and only the files the Load needs are written."""
+    load = manifest.Load(conn, STATE, str(base), __file__)
+    cur = conn.cursor()
+    for name, rows in files.items():
+        path = base / STATE / 'raw_data' / name
+        if not load.needs(str(path)):
+            continue
+        for row in rows:
+            cur.execute("INSERT INTO manifest_probe VALUES (%s, %s, %s) "
+                        "ON CONFLICT DO NOTHING", row)
+        load.track('manifest_probe', KEY, COLUMNS, rows, str(path))
+    load.finish()
+    return load
+
+
+def _rows(conn):
+    cur = conn.cursor()
+    cur.execute("SELECT k, d::text, v FROM manifest_probe ORDER BY k")
+    return cur.fetchall()
+
+
+def test_retracts_per_file(conn, tmp_path):
+    raw = tmp_path / STATE / 'raw_data'
+    raw.mkdir(parents=True)
+    (raw / 'a.csv').write_text('a1')
+    (raw / 'b.csv').write_text('b1')
+    a_rows = [(1, None, 'a'), (2, '2026-09-01', 'a')]
+    b_rows = [(3, None, 'b')]
+    _load(conn, tmp_path, {'a.csv': a_rows, 'b.csv': b_rows})
+    assert _rows(conn) == [(1, None, 'a'), (2, '2026-09-01', 'a'), (3, None, 'b')]
+
+    # a.csv drops its NULL-dated row; b.csv is unchanged and not read
+    (raw / 'a.csv').write_text('a2')
+    load = _load(conn, tmp_path, {'a.csv': a_rows[1:], 'b.csv': b_rows})
+    assert load.modified == [f'{STATE}/raw_data/a.csv']
+    assert _rows(conn) == [(2, '2026-09-01', 'a'), (3, None, 'b')]
+
+    # b.csv's rows stay tracked while it is skipped, so removing it retracts
+    # them; a.csv, unchanged and not read, keeps its row
+    (raw / 'b.csv').unlink()
+    _load(conn, tmp_path, {'a.csv': a_rows[1:]})
+    assert _rows(conn) == [(2, '2026-09-01', 'a')]
@@ -0,0 +1,49 @@
+"""odds/bonus.py at the edges of the point range and of the quota."""
+
+import numpy as np
+import pytest
+from numpy.testing import assert_allclose
+
+from odds import bonus
+
+
+def test_quota_covering_everyone_or_no_one():
+    apps = np.array([[5.0, 3.0, 2.0], [5.0, 3.0, 2.0]])
+    w = bonus.entries(np.arange(3), "squared")
+    odds = bonus.weighted_draw_odds(apps, [10, 0], w)
+    assert_allclose(odds, [[1, 1, 1], [0, 0, 0]])
+
+
+def test_equal_weights_share_the_tags_evenly():
+    apps = np.array([[300.0, 150.0, 50.0]])
+    odds = bonus.weighted_draw_odds(apps, [25], np.ones(3))
+    assert_allclose(odds, 25 / 500)
+
+
+def test_odds_rise_with_points_and_use_up_the_quota():
+    apps = np.array([[566.0, 602.0, 516.0, 0.0, 51.0]])
+    w = bonus.entries(np.arange(5), "linear")
+    odds = bonus.weighted_draw_odds(apps, [12], w)[0]
+    assert np.all(np.diff(odds) > 0)
+    assert (apps[0] * odds).sum() == pytest.approx(12)
+    # The empty level gets what an applicant there would have had:
+    # 1 - exp(-w t), with the cut-off t the other levels imply
+    t = -np.log1p(-odds[0]) / w[0]
+    assert_allclose(odds[3], -np.expm1(-w[3] * t))
+
+
+def test_level_odds_pads_to_the_widest_balance():
+    odds = bonus.level_odds([{0: 10, 2: 5}, {1: 4}], [3, 4], "squared_plus_one", width=4)
+    assert odds.shape == (2, 4)
+    # Four tags for four applicants: everyone draws, at any balance
+    assert_allclose(odds[1], 1.0)
+    assert 0 < odds[0, 0] < odds[0, 1] < odds[0, 2] < odds[0, 3] < 1
+
+
+def test_entry_rules_at_zero_points():
+    assert_allclose([bonus.entries(0, r) for r in ("linear", "squared", "squared_plus_one")],
+                    [1, 1, 1])
+    assert_allclose(bonus.entries([3], "squared_plus_one"), [10])
+    assert bonus.entry_rule("MT", "queue_75_25") == "squared_plus_one"
+    assert bonus.entry_rule("NV", "squared") == "squared"
+    assert bonus.entry_rule("CO", "queue_pure") is None
@@ -0,0 +1,35 @@
+"""odds/choices.py: both ways a draw walks an application's choices."""
+
+import numpy as np
+from numpy.testing import assert_allclose
+
+from odds import choices
+
+
+def test_walk_takes_the_gain_over_earlier_choices():
+    odds = np.array([0.05, 0.4, 0.9])
+    plans = np.array([[0, 1, 2], [2, 1, 0], [2, 0, -1]])
+    by_choice = choices.choice_odds(plans, odds, np.zeros(3), "walk")
+    assert_allclose(by_choice, [[0.05, 0.35, 0.5], [0.9, 0, 0], [0.9, 0, 0]])
+    assert_allclose(by_choice.sum(axis=1), [0.9, 0.9, 0.9])
+
+
+def test_rounds_draw_later_choices_from_the_leftovers():
+    odds = np.array([0.3, 0.5, 0.2])
+    leftover = np.array([0.1, 0.4, 1.0])
+    plans = np.array([[0, 1, 2], [1, -1, -1]])
+    by_choice = choices.choice_odds(plans, odds, leftover, "rounds")
+    assert_allclose(by_choice, [[0.3, 0.4 * 0.7, 1.0 * 0.7 * 0.6], [0.5, 0, 0]])
+
+
+def test_every_ordering_is_scored():
+    plans = choices.orderings(3)
+    assert len(plans) == 6
+    by_choice = choices.choice_odds(plans, np.array([0.2, 0.6, 0.1]), np.zeros(3), "walk")
+    # The application draws with its best hunt's odds whatever the order
+    assert_allclose(by_choice.sum(axis=1), 0.6)
+
+
+def test_leftover_odds_is_the_unclaimed_share():
+    assert_allclose(choices.leftover_odds([276, 4, 10, 0], [137, 4, 30, 5]),
+                    [139 / 276, 0, 0, 0])
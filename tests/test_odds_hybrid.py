@@ -0,0 +1,59 @@
+"""odds/hybrid.py: the queue share, then the random share, at the cut-off."""
+
+import numpy as np
+from numpy.testing import assert_allclose, assert_array_equal
+
+from odds import bonus, hybrid, montecarlo, pad_levels, preference
+
+
+def test_split_tags():
+    pref, rand = hybrid.split_tags([20, 10, 3], "queue_75_25")
+    assert_allclose(pref, [15, 8, 2])
+    assert_allclose(pref + rand, [20, 10, 3])
+    pref, rand = hybrid.split_tags([20], "queue_50_50")
+    assert_allclose([pref[0], rand[0]], [10, 10])
+
+
+def test_even_random_share_is_the_preference_engine():
+    apps = pad_levels([{0: 410, 3: 120, 8: 35, 12: 9}])
+    pref, rand = hybrid.split_tags([60], "queue_75_25")
+    odds, cutoff = hybrid.split_draw_odds(apps, pref, rand)
+    expected, expected_cutoff = preference.queue_draw_odds(apps, pref, rand)
+    assert_allclose(odds, expected)
+    assert_array_equal(cutoff, expected_cutoff)
+    # 45 queue tags: 12 and 8 points fill 44, one of 120 at 3 points
+    assert_array_equal(cutoff, [3])
+    r = 15 / (apps.sum() - 45)
+    assert_allclose(odds[0, [12, 8]], 1)
+    assert_allclose(odds[0, 3], 1 / 120 + (1 - 1 / 120) * r)
+    assert_allclose(odds[0, 0], r)
+
+
+def test_weighted_random_share_above_and_below_the_cut_off():
+    montecarlo._cache.clear()
+    w = bonus.entries(np.arange(13), "squared_plus_one")
+    apps = pad_levels([{0: 410, 3: 120, 8: 35, 12: 9}])
+    odds, cutoff = hybrid.split_draw_odds(apps, [20], [20], w)
+    assert_array_equal(cutoff, [8])
+    # Above the cut-off the queue alone draws them
+    assert odds[0, 12] == 1
+    # At and below it the weighted share adds to the queue's odds
+    q, _ = preference.queue_draw_odds(apps, [20])
+    assert odds[0, 8] > q[0, 8]
+    assert 0 < odds[0, 0] < odds[0, 3] < odds[0, 8] < 1
+    # Large pool: the bonus engine's closed form, so no seed involved
+    rest = apps * (1 - q)
+    r = bonus.weighted_draw_odds(rest, [20], w)
+    assert_allclose(odds, q + (1 - q) * r)
+
+
+def test_small_weighted_pool_is_simulated_and_repeatable():
+    w = bonus.entries(np.arange(4), "squared_plus_one")
+    apps = pad_levels([{0: 30, 1: 10, 3: 4}])
+    montecarlo._cache.clear()
+    first, _ = hybrid.split_draw_odds(apps, [2], [6], w)
+    montecarlo._cache.clear()
+    again, _ = hybrid.split_draw_odds(apps, [2], [6], w)
+    assert_allclose(again, first, rtol=0, atol=0)
+    # Two queue tags go to the four 3-pointers, half of them each
+    assert first[0, 3] > 0.5
@@ -0,0 +1,56 @@
+"""odds/montecarlo.py: a fixed seed gives the same odds on every run."""
+
+import numpy as np
+from numpy.testing import assert_allclose, assert_array_equal
+
+from odds import bonus, montecarlo
+
+APPLICANTS = np.array([[40.0, 25.0, 0.0, 6.0], [12.0, 0.0, 3.0, 1.0]])
+TAGS = np.array([9, 4])
+WEIGHTS = bonus.entries(np.arange(4), "squared_plus_one")
+
+
+def _simulate(seed=0):
+    montecarlo._cache.clear()
+    return bonus.simulate_weighted_draw(APPLICANTS, TAGS, WEIGHTS, seed=seed)
+
+
+def test_same_seed_same_odds():
+    first = _simulate()
+    assert_array_equal(_simulate(), first)
+    assert not np.array_equal(_simulate(seed=1), first)
+
+
+def test_result_does_not_depend_on_workers(monkeypatch):
+    arrays = (APPLICANTS, np.broadcast_to(WEIGHTS, APPLICANTS.shape), TAGS)
+    montecarlo._cache.clear()
+    serial = montecarlo.estimate(bonus._weighted_draw_trials, arrays, workers=1)
+    montecarlo._cache.clear()
+    # Every wave goes out to the process pool
+    monkeypatch.setattr(montecarlo, "PARALLEL_MIN_WORK", 0)
+    try:
+        pooled = montecarlo.estimate(bonus._weighted_draw_trials, arrays, workers=2)
+        assert montecarlo._executor is not None
+    finally:
+        montecarlo.shutdown()
+    assert_array_equal(pooled, serial)
+
+
+def test_repeat_is_served_from_the_cache():
+    first = _simulate()
+    hits = montecarlo.counters["hits"]
+    again = bonus.simulate_weighted_draw(APPLICANTS, TAGS, WEIGHTS)
+    assert montecarlo.counters["hits"] == hits + 1
+    assert_array_equal(again, first)
+    # A copy, so a caller editing its result leaves the cache alone
+    again[:] = 0
+    assert_array_equal(bonus.simulate_weighted_draw(APPLICANTS, TAGS, WEIGHTS), first)
+
+
+def test_simulation_agrees_with_the_closed_form():
+    # Equal weights make the closed form exact
+    flat = np.ones(4)
+    montecarlo._cache.clear()
+    sim = bonus.simulate_weighted_draw(APPLICANTS, TAGS, flat)
+    exact = bonus.weighted_draw_odds(APPLICANTS, TAGS, flat)
+    assert_allclose(sim, exact, atol=4 * montecarlo.TOL)
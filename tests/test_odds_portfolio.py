@@ -0,0 +1,57 @@
+"""odds/portfolio.py against brute force over every plan and every subset."""
+
+import itertools
+
+import numpy as np
+import pytest
+
+from odds import choices, portfolio
+
+
+def _plan_value(plan, odds, leftover, worth, walk):
+    by_choice = choices.choice_odds(np.array([plan]), odds, leftover, walk)[0]
+    return float((by_choice * worth[plan]).sum())
+
+
+def _brute_best_plan(odds, leftover, worth, max_choices, walk):
+    best = 0.0
+    for k in range(1, max_choices + 1):
+        for plan in itertools.permutations(range(len(odds)), k):
+            best = max(best, _plan_value(list(plan), odds, leftover, worth, walk))
+    return best
+
+
+@pytest.mark.parametrize("walk", ["walk", "rounds"])
+@pytest.mark.parametrize("harvest", [False, True])
+def test_best_plan_matches_brute_force(walk, harvest):
+    rng = np.random.default_rng(7)
+    for _ in range(40):
+        n = int(rng.integers(1, 7))
+        max_choices = int(rng.integers(1, 4))
+        # Some hunts with no odds or nothing left over, as real pools have
+        odds = rng.random(n) * (rng.random(n) > 0.2)
+        leftover = rng.random(n) * (rng.random(n) > 0.4)
+        worth = rng.random(n) if harvest else np.ones(n)
+
+        plan, value = portfolio.best_plan(odds, leftover, worth, max_choices, walk)
+        assert value == pytest.approx(_brute_best_plan(odds, leftover, worth, max_choices, walk))
+        assert len(plan) <= max_choices and len(set(plan)) == len(plan)
+        if plan:
+            assert _plan_value(plan, odds, leftover, worth, walk) == pytest.approx(value)
+
+
+def test_knapsack_matches_brute_force():
+    rng = np.random.default_rng(11)
+    for _ in range(40):
+        n = int(rng.integers(1, 8))
+        costs = rng.integers(0, 60, n) + rng.random(n).round(2)
+        values = rng.random(n)
+        budget = int(rng.integers(0, 150))
+
+        picked, total = portfolio.knapsack(costs, values, budget)
+        best = max(sum(values[list(s)])
+                   for k in range(n + 1) for s in itertools.combinations(range(n), k)
+                   if np.ceil(costs[list(s)]).sum() <= budget)
+        assert total == pytest.approx(best)
+        assert np.ceil(costs[picked]).sum() <= budget
+        assert values[picked].sum() == pytest.approx(total)
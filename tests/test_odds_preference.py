@@ -0,0 +1,44 @@
+"""odds/preference.py around the cut-off level."""
+
+import numpy as np
+from numpy.testing import assert_allclose, assert_array_equal
+
+from odds import pad_levels, preference
+
+
+def test_cut_off_row_alone():
+    # CO: drawn out at 5 points, 4 of the 6 at that level drew
+    odds, cutoff = preference.level_odds([{5: 6}], [4], width=8)
+    assert_allclose(odds[0], [0, 0, 0, 0, 0, 4 / 6, 1, 1])
+    assert_array_equal(cutoff, [5])
+
+
+def test_quota_ending_exactly_on_a_level():
+    odds, cutoff = preference.level_odds([{2: 5, 3: 4}], [4], width=5)
+    # Level 3 takes every tag; level 2 gets none, so 3 is the cut-off
+    assert_allclose(odds[0], [0, 0, 0, 1, 1])
+    assert_array_equal(cutoff, [3])
+
+
+def test_random_share_goes_to_everyone_the_queue_missed():
+    apps = pad_levels([{0: 6101, 1: 213, 2: 359, 7: 2}])
+    odds, cutoff = preference.queue_draw_odds(apps, [300], [815])
+    # The queue fills 7 points, then 298 of 359 at 2 points
+    missed = apps.sum() - 300
+    r = 815 / missed
+    assert odds[0, 7] == 1
+    assert_allclose(odds[0, 2], 298 / 359 + (1 - 298 / 359) * r)
+    assert_allclose(odds[0, [0, 1]], r)
+    assert_array_equal(cutoff, [2])
+
+
+def test_quota_larger_than_demand():
+    odds, cutoff = preference.level_odds([{0: 3, 1: 2}], [10], [5])
+    assert_allclose(odds, 1.0)
+    assert_array_equal(cutoff, [0])
+
+
+def test_no_tags():
+    odds, cutoff = preference.level_odds([{0: 3, 1: 2}], [0])
+    assert_allclose(odds, 0.0)
+    assert_array_equal(cutoff, [-1])
@@ -0,0 +1,126 @@
+"""pdf_cache with several processes filling one cache file at once."""
+
+import multiprocessing
+import os
+import queue
+import sqlite3
+
+import pytest
+
+from conftest import REPO_DIR
+
+RAW_DIR = os.path.join(REPO_DIR, 'WY', 'raw_data')
+PDF_A = os.path.join(RAW_DIR, '2025_elk_random_res.pdf')
+PDF_B = os.path.join(RAW_DIR, '2025_deer_random_res.pdf')
+
+
+def _fill(path, results, lock_timeout, wrote=None, wait_for=None):
+    """Extract every page of path into the cache, in a spawned process.
+
+    Sets `wrote` after the first page, then waits for `wait_for` before the
+    rest, with the PDF still open. Puts (path, pages) or (path, error) on
+    results.
+    """
+    import pdf_cache
+    pdf_cache.LOCK_TIMEOUT = lock_timeout
+    try:
+        with pdf_cache.open(path) as pdf:
+            for page in pdf.pages:
+                page.extract_text()
+                if wrote is not None:
+                    wrote.set()
+                    wrote = None
+                    wait_for.wait(30)
+        results.put((path, len(pdf.pages)))
+    except sqlite3.OperationalError as e:
+        results.put((path, str(e)))
+
+
+def page_count(path):
+    import pdfplumber
+    with pdfplumber.open(path) as pdf:
+        return len(pdf.pages)
+
+
+def test_writer_does_not_hold_lock_while_parsing(tmp_path, monkeypatch):
+    cache_path = tmp_path / 'cache.sqlite'
+    monkeypatch.setenv('DRAWS_PDF_CACHE', str(cache_path))
+    ctx = multiprocessing.get_context('spawn')
+    results = ctx.Queue()
+    a_wrote, b_done = ctx.Event(), ctx.Event()
+
+    # A writes one page and then stalls mid-PDF; B must fill its own PDF
+    # meanwhile rather than wait out A's parse
+    a = ctx.Process(target=_fill, args=(PDF_A, results, 60, a_wrote, b_done))
+    b = ctx.Process(target=_fill, args=(PDF_B, results, 2))
+    a.start()
+    try:
+        assert a_wrote.wait(60), 'first process never wrote a page'
+        b.start()
+        try:
+            first = results.get(timeout=60)
+        except queue.Empty:
+            pytest.fail('second process did not finish while the first was parsing')
+        assert first == (PDF_B, page_count(PDF_B))
+    finally:
+        b_done.set()
+        a.join(60)
+        b.join(60)
+    assert results.get(timeout=10) == (PDF_A, page_count(PDF_A))
+
+    db = sqlite3.connect(cache_path)
+    assert db.execute("SELECT COUNT(*) FROM pages").fetchone()[0] == \
+        page_count(PDF_A) + page_count(PDF_B)
+    db.close()
+
+
+def test_concurrent_fills_of_one_file(tmp_path, monkeypatch):
+    monkeypatch.setenv('DRAWS_PDF_CACHE', str(tmp_path / 'cache.sqlite'))
+    ctx = multiprocessing.get_context('spawn')
+    results = ctx.Queue()
+    procs = [ctx.Process(target=_fill, args=(PDF_A, results, 2)) for _ in range(2)]
+    for p in procs:
+        p.start()
+    outcomes = [results.get(timeout=60) for _ in procs]
+    for p in procs:
+        p.join(60)
+    assert outcomes == [(PDF_A, page_count(PDF_A))] * 2
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    """pdf_cache on a fresh cache file, in this process."""
+    import pdf_cache
+    monkeypatch.setattr(pdf_cache, 'CACHE_PATH', str(tmp_path / 'cache.sqlite'))
+    monkeypatch.setattr(pdf_cache, '_db', None)
+    yield pdf_cache
+    if pdf_cache._db is not None:
+        pdf_cache._db.close()
+    monkeypatch.setattr(pdf_cache, '_db', None)
+
+
+def test_get_text_matches_fitz_and_is_cached(cache, monkeypatch):
+    import fitz
+    with fitz.open(PDF_A) as doc:
+        expected = [page.get_text() for page in doc]
+
+    with cache.open(PDF_A) as pdf:
+        assert [page.get_text() for page in pdf.pages] == expected
+
+    # A second read comes from the cache without opening the PDF
+    def no_pdf(self):
+        raise AssertionError('PDF opened on a cache hit')
+    monkeypatch.setattr(cache.CachedPDF, '_open_fitz', no_pdf)
+    monkeypatch.setattr(cache.CachedPDF, '_open', no_pdf)
+    with cache.open(PDF_A) as pdf:
+        assert [page.get_text() for page in pdf.pages] == expected
+
+
+def test_get_text_with_cache_off(cache, monkeypatch):
+    import fitz
+    monkeypatch.setattr(cache, 'CACHE_PATH', 'off')
+    with fitz.open(PDF_B) as doc:
+        expected = [page.get_text() for page in doc]
+    with cache.open(PDF_B) as pdf:
+        assert [page.get_text() for page in pdf.pages] == expected
+    assert cache._db is None